@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark pruned (block-max MaxScore) vs exhaustive BM25 top-k."""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ingestion.chunker import Chunker
+from src.rag.analyzer import Analyzer
+from src.rag.bm25_engine import BM25Engine, top_k_order
+
+
+def build_queries(words, count, rng):
+    """Build game-loop style queries: command, scene and the last two commands.
+
+    Args:
+        words: Corpus words to sample phrases from
+        count: Number of queries
+        rng: Random generator
+
+    Returns:
+        List of query strings
+    """
+    def phrase(low, high):
+        start = rng.randrange(max(1, len(words) - high))
+        return " ".join(words[start:start + rng.randint(low, high)])
+
+    return [
+        " ".join([phrase(4, 12), "Scene: " + phrase(12, 30), phrase(4, 12), phrase(4, 12)])
+        for _ in range(count)
+    ]
+
+
+def time_per_query(func, queries, repeat):
+    """Run ``func`` over all queries ``repeat`` times and return per-query latencies in ms."""
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def benchmark_corpus(path, args):
+    """Benchmark one corpus file and print a result row."""
+    text = path.read_text(encoding="utf-8")
+    chunks = Chunker().chunk(
+        text, strategy="sliding_window", chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap
+    )
+    analyzer = Analyzer()
+    engine = BM25Engine.from_tokenized(analyzer.analyze_batch([c.text for c in chunks]), analyzer=analyzer)
+
+    rng = random.Random(args.seed)
+    queries = [analyzer.analyze(q) for q in build_queries(text.split(), args.queries, rng)]
+
+    def exhaustive(tokens):
+        candidates, scores = engine.score_candidates(tokens)
+        positive = scores > 0
+        candidates, scores = candidates[positive], scores[positive]
+        order = top_k_order(scores, args.top_k)
+        return candidates[order], scores[order]
+
+    def pruned(tokens):
+        return engine.get_top_k_pruned(tokens, args.top_k)
+
+    # Warm up lazily built impact and block-max arrays, and check equivalence
+    evaluated = total = 0
+    for tokens in queries:
+        stats = {}
+        expected_ids, expected_scores = exhaustive(tokens)
+        ids, scores = engine.get_top_k_pruned(tokens, args.top_k, stats=stats)
+        if ids.tolist() != expected_ids.tolist() or not np.allclose(scores, expected_scores):
+            raise AssertionError(f"Pruned top-k differs from exhaustive top-k on {path.name}")
+        evaluated += stats.get("postings_evaluated", 0)
+        total += stats.get("postings_total", 0)
+
+    exhaustive_ms = time_per_query(exhaustive, queries, args.repeat)
+    pruned_ms = time_per_query(pruned, queries, args.repeat)
+
+    print(f"{path.name:<24} {engine.corpus_size:>7} {np.mean([len(q) for q in queries]):>6.1f} "
+          f"{exhaustive_ms.mean():>9.3f} {np.percentile(exhaustive_ms, 95):>9.3f} "
+          f"{pruned_ms.mean():>9.3f} {np.percentile(pruned_ms, 95):>9.3f} "
+          f"{exhaustive_ms.mean() / pruned_ms.mean():>7.2f}x {evaluated / max(total, 1):>9.1%}")
+
+
+def main():
+    """Main entry point for the benchmark script."""
+    parser = argparse.ArgumentParser(description="Benchmark pruned vs exhaustive BM25 top-k")
+    parser.add_argument("--data-dir", type=str, default="data/test_data", help="Directory with corpora")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per corpus")
+    parser.add_argument("--top-k", type=int, default=20, help="Results per query (hybrid asks for 2x top_k)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Chunk size")
+    parser.add_argument("--chunk-overlap", type=int, default=50, help="Chunk overlap")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for query sampling")
+    args = parser.parse_args()
+
+    corpora = sorted(p for p in Path(args.data_dir).iterdir() if p.suffix in (".txt", ".md"))
+    if not corpora:
+        print(f"No corpora found in {args.data_dir}")
+        sys.exit(1)
+
+    print(f"{'corpus':<24} {'chunks':>7} {'terms':>6} {'exh ms':>9} {'exh p95':>9} "
+          f"{'prune ms':>9} {'prune p95':>9} {'speedup':>8} {'postings':>9}")
+    for path in corpora:
+        benchmark_corpus(path, args)
+
+
+if __name__ == "__main__":
+    main()
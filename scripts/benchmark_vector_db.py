@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Benchmark Chroma vector search recall and latency on synthetic embeddings."""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from chromadb.api.client import SharedSystemClient
+
+from src.rag.vector_db.base import VectorDocument
+from src.rag.vector_db.chroma_provider import ChromaVectorDB
+from src.rag.vector_db.numpy_provider import NumpyVectorDB
+
+COLLECTION = "benchmark"
+
+
+def random_unit_vectors(count, dimension, rng, centers=None, spread=0.5):
+    """Draw normalized float32 vectors, like sentence-transformer outputs.
+
+    Text embeddings are clustered by topic, so vectors are drawn around
+    random centers; uniformly random vectors are a worst case for HNSW.
+
+    Args:
+        count: Number of vectors
+        dimension: Vector dimension
+        rng: NumPy random generator
+        centers: Optional cluster centers (uniformly random vectors if None)
+        spread: Noise scale around the centers
+
+    Returns:
+        Float32 array of shape (count, dimension)
+    """
+    vectors = rng.standard_normal((count, dimension)).astype(np.float32)
+    if centers is not None:
+        chosen = centers[rng.integers(len(centers), size=count)]
+        vectors = chosen + spread * vectors / np.sqrt(dimension)
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def time_per_query(func, queries, repeat):
+    """Run ``func`` over all queries ``repeat`` times and return per-query latencies in ms."""
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def build_collection(db, embeddings):
+    """Create the benchmark collection and add one document per embedding."""
+    db.create_collection(COLLECTION, embedding_dimension=embeddings.shape[1])
+    db.add_documents(COLLECTION, (
+        VectorDocument(id=f"doc_{i}", text=f"document {i}", embedding=embedding, metadata={"i": i})
+        for i, embedding in enumerate(embeddings)
+    ))
+
+
+def benchmark_handle_cache(db, queries, args):
+    """Compare cached-handle search with looking the collection up per query.
+
+    Clearing the handle cache before each search repeats what every search
+    did before handles were cached: list all collections, fetch the handle,
+    then query.
+    """
+    def uncached(query):
+        db._collections.clear()
+        db.search(COLLECTION, query, top_k=args.top_k)
+
+    def cached(query):
+        db.search(COLLECTION, query, top_k=args.top_k)
+
+    for query in queries[:10]:  # warm up
+        uncached(query)
+        cached(query)
+
+    uncached_ms = time_per_query(uncached, queries, args.repeat)
+    cached_ms = time_per_query(cached, queries, args.repeat)
+
+    print(f"{'variant':<10} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, latencies in (("lookup", uncached_ms), ("cached", cached_ms)):
+        print(f"{name:<10} {latencies.mean():>9.3f} {np.percentile(latencies, 50):>9.3f} "
+              f"{np.percentile(latencies, 99):>9.3f}")
+    print(f"saving per query: {uncached_ms.mean() - cached_ms.mean():.3f} ms "
+          f"({1 - cached_ms.mean() / uncached_ms.mean():.1%})")
+
+
+def benchmark_search_ef(config, exact, queries, args):
+    """Report recall@k against exact search and latency for each search ``ef``.
+
+    The database is reopened for every value: the embedded Chroma client
+    reads ``ef`` when it loads the index.
+
+    Args:
+        config: Chroma provider configuration of the benchmark database
+        exact: NumPy provider with the same documents and metric
+        queries: Query embeddings
+        args: Parsed command line arguments
+    """
+    expected = [
+        {r.document_id for r in exact.search(COLLECTION, query, top_k=args.top_k)}
+        for query in queries
+    ]
+
+    print(f"{'ef':>6} {'recall@k':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for search_ef in args.ef:
+        SharedSystemClient.clear_system_cache()
+        db = ChromaVectorDB({**config, "hnsw_search_ef": search_ef})
+        found = [
+            {r.document_id for r in db.search(COLLECTION, query, top_k=args.top_k)}
+            for query in queries
+        ]
+        recall = np.mean([len(f & e) / len(e) for f, e in zip(found, expected)])
+        latencies = time_per_query(lambda q: db.search(COLLECTION, q, top_k=args.top_k), queries, args.repeat)
+        print(f"{search_ef:>6} {recall:>9.3f} {np.percentile(latencies, 50):>9.3f} "
+              f"{np.percentile(latencies, 99):>9.3f}")
+        db.close()
+
+
+def main():
+    """Main entry point for the benchmark script."""
+    parser = argparse.ArgumentParser(description="Benchmark Chroma vector search latency")
+    parser.add_argument("--documents", type=int, default=20000, help="Documents in the collection")
+    parser.add_argument("--dimension", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--top-k", type=int, default=20, help="Results per query (hybrid asks for 2x top_k)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    parser.add_argument("--collections", type=int, default=10, help="Extra collections in the database")
+    parser.add_argument("--space", type=str, default="cosine", choices=["cosine", "l2", "ip"], help="HNSW space")
+    parser.add_argument("--m", type=int, default=16, help="HNSW graph degree")
+    parser.add_argument("--construction-ef", type=int, default=100, help="HNSW ef while building")
+    parser.add_argument("--ef", type=int, nargs="+", default=[10, 20, 50, 100, 200], help="Search ef values to sweep")
+    parser.add_argument("--clusters", type=int, default=100, help="Topic clusters (0 for uniform vectors)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    centers = random_unit_vectors(args.clusters, args.dimension, rng) if args.clusters else None
+    embeddings = random_unit_vectors(args.documents, args.dimension, rng, centers)
+    queries = random_unit_vectors(args.queries, args.dimension, rng, centers)
+
+    with tempfile.TemporaryDirectory() as persist_directory:
+        config = {
+            "persist_directory": persist_directory,
+            "hnsw_space": args.space,
+            "hnsw_m": args.m,
+            "hnsw_construction_ef": args.construction_ef,
+        }
+        db = ChromaVectorDB(config)
+        # Listing cost grows with the number of collections
+        for i in range(args.collections):
+            db.create_collection(f"other_{i}", embedding_dimension=args.dimension)
+        build_collection(db, embeddings)
+        print(f"{args.documents} documents, dimension {args.dimension}, "
+              f"{args.collections + 1} collections, top_k {args.top_k}")
+        benchmark_handle_cache(db, queries, args)
+        db.close()
+
+        exact = NumpyVectorDB({"in_memory": True, "metric": args.space})
+        build_collection(exact, embeddings)
+        print(f"\nHNSW {args.space}, M {args.m}, construction_ef {args.construction_ef} "
+              f"vs exact NumPy search")
+        benchmark_search_ef(config, exact, queries, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""Evaluate hybrid fusion settings offline: nDCG, recall and latency per configuration.
+
+Labels are JSON lines ``{"query": ..., "source": ..., "start": ..., "end": ...}``
+marking the character span of a corpus file in ``--data-dir`` that answers
+the query. Chunks are judged by how much of that span they contain, so the
+labels stay valid when chunking settings change. ``--write-labels`` seeds
+such a file from the corpora; hand-written queries can be appended to it.
+
+BM25 and vector results are computed once per query at the deepest
+candidate depth. Every fusion configuration is then evaluated by a
+``HybridRetriever`` reading those results, spread over worker processes,
+which also record the candidate depths each configuration asked the legs
+for (one per round in adaptive mode). The legs are then timed at exactly
+those depths, so each configuration reports its own leg latency next to
+its nDCG and recall.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.base_agent import RetrievalResult
+from src.ingestion.chunker import Chunker
+from src.ingestion.embedder import Embedder
+from src.rag.analyzer import Analyzer
+from src.rag.bm25_engine import BM25Engine, top_k_order
+from src.rag.hybrid_retriever import HybridRetriever, DEFAULT_DEPTH_FACTOR
+
+SENTENCE = re.compile(r"[^.!?]+[.!?]")
+WORD = re.compile(r"[A-Za-z']+")
+
+
+def seed_labels(corpora, count, rng):
+    """Build keyword queries from random corpus sentences.
+
+    Each query keeps a subset of a sentence's longer words in order, and its
+    label is the sentence's span. These queries favour lexical matching;
+    add paraphrased queries by hand for a balanced set.
+
+    Args:
+        corpora: Corpus paths
+        count: Queries per corpus
+        rng: Random generator
+
+    Returns:
+        List of label dictionaries
+    """
+    labels = []
+    for path in corpora:
+        text = path.read_text(encoding="utf-8")
+        sentences = [
+            m for m in SENTENCE.finditer(text)
+            if 10 <= len(m.group().split()) <= 40
+        ]
+        for match in rng.sample(sentences, min(count, len(sentences))):
+            words = [w for w in WORD.findall(match.group()) if len(w) > 3]
+            keep = sorted(rng.sample(range(len(words)), min(len(words), max(3, len(words) // 2), 8)))
+            labels.append({
+                "query": " ".join(words[i] for i in keep),
+                "source": path.name,
+                "start": match.start(),
+                "end": match.end(),
+            })
+    return labels
+
+
+def relevance(spans, start, end):
+    """Share of the labeled span contained in each chunk."""
+    overlap = np.minimum(spans[:, 1], end) - np.maximum(spans[:, 0], start)
+    return np.clip(overlap, 0, None) / max(end - start, 1)
+
+
+def coverage(spans, start, end):
+    """Share of the labeled span covered by the union of chunk spans."""
+    covered = np.zeros(max(end - start, 1), dtype=bool)
+    for chunk_start, chunk_end in spans:
+        covered[max(chunk_start, start) - start:max(min(chunk_end, end) - start, 0)] = True
+    return covered.mean()
+
+
+def ndcg(gains, ideal):
+    """nDCG of the ranked gains against the ideal gains (same length or longer)."""
+    discounts = 1 / np.log2(np.arange(2, len(gains) + 2))
+    best = np.sort(ideal)[::-1][:len(gains)]
+    ideal_dcg = (best * discounts[:len(best)]).sum()
+    return (gains * discounts).sum() / ideal_dcg if ideal_dcg > 0 else 0.0
+
+
+def time_per_query(func, queries, repeat):
+    """Run ``func`` over all queries ``repeat`` times and return per-query latencies in ms."""
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+class CachedLeg:
+    """Retriever returning precomputed results truncated to the requested depth.
+
+    Requested depths are recorded per query in ``depths`` (one entry per call).
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.depths = {}
+
+    def retrieve(self, query, top_k=10, filters=None):
+        self.depths.setdefault(query, []).append(top_k)
+        return self.results[query][:top_k]
+
+    def retrieve_many(self, queries, top_k=10, filters=None):
+        return [self.retrieve(query, top_k) for query in queries]
+
+
+def compute_legs(corpora, labels, args):
+    """Run both legs for every labeled query at the deepest candidate depth.
+
+    Args:
+        corpora: Corpus paths
+        labels: Label dictionaries
+        args: Parsed command line arguments
+
+    Returns:
+        Tuple of (bm25 results, vector results, chunk spans, legs), keyed by
+        query key; ``legs`` maps a query key to its (query, bm25 leg, vector leg)
+        where each leg is called as ``leg(query, depth)``
+    """
+    depth = int(max(args.top_k) * max(DEFAULT_DEPTH_FACTOR, args.max_depth_factor))
+    embedder = Embedder(args.model)
+    analyzer = Analyzer()
+    bm25_results, vector_results, spans, legs = {}, {}, {}, {}
+
+    for path in corpora:
+        keyed = [(f"{i}:{label['query']}", label) for i, label in enumerate(labels) if label["source"] == path.name]
+        if not keyed:
+            continue
+        chunks = Chunker().chunk(
+            path.read_text(encoding="utf-8"), strategy="sliding_window",
+            chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap
+        )
+        texts = [chunk.text for chunk in chunks]
+        ids = [f"{path.name}:{chunk.id}" for chunk in chunks]
+        spans.update((chunk_id, (c.start_pos, c.end_pos)) for chunk_id, c in zip(ids, chunks))
+        engine = BM25Engine.from_tokenized(analyzer.analyze_batch(texts), analyzer=analyzer)
+        embeddings = embedder.embed_array(texts)
+        print(f"{path.name}: {len(chunks)} chunks, {len(keyed)} queries")
+
+        def bm25_leg(query, depth, engine=engine, texts=texts, ids=ids):
+            docs, scores = engine.get_top_k(analyzer.analyze(query), depth)
+            return [RetrievalResult(texts[d], float(s), ids[d]) for d, s in zip(docs, scores)]
+
+        def vector_leg(query, depth, embeddings=embeddings, texts=texts, ids=ids):
+            scores = embeddings @ embedder.embed_array([query])[0]
+            order = top_k_order(scores, depth)
+            return [RetrievalResult(texts[d], float(scores[d]), ids[d]) for d in order]
+
+        for key, label in keyed:
+            bm25_results[key] = bm25_leg(label["query"], depth)
+            vector_results[key] = vector_leg(label["query"], depth)
+            legs[key] = (label["query"], bm25_leg, vector_leg)
+
+    return bm25_results, vector_results, spans, legs
+
+
+def time_legs(legs, results, repeat):
+    """Median per-query leg latency of each configuration at the depths it used.
+
+    Legs run concurrently, so a round waits for the slower leg; adaptive
+    configurations pay for every round. Each (query, depth) is timed once
+    and shared by the configurations that requested it.
+
+    Args:
+        legs: Legs per query key, as returned by ``compute_legs``
+        results: Evaluation results carrying ``leg_depths``
+        repeat: Timing repetitions
+
+    Returns:
+        List with the median leg latency in ms of each result
+    """
+    timed = {}
+
+    def round_ms(key, depth):
+        if (key, depth) not in timed:
+            query, bm25_leg, vector_leg = legs[key]
+            timed[key, depth] = max(
+                np.median(time_per_query(lambda q: bm25_leg(q, depth), [query], repeat)),
+                np.median(time_per_query(lambda q: vector_leg(q, depth), [query], repeat))
+            )
+        return timed[key, depth]
+
+    return [
+        float(np.median([
+            sum(round_ms(key, depth) for depth in depths)
+            for key, depths in result["leg_depths"].items()
+        ]))
+        for result in results
+    ]
+
+
+def build_configurations(args):
+    """Fusion settings to sweep, one dictionary of HybridRetriever arguments each."""
+    fusions = [{"fusion_strategy": "rrf", "rrf_k": k} for k in args.rrf_k]
+    fusions += [
+        {"fusion_strategy": "weighted", "bm25_weight": w, "vector_weight": round(1 - w, 6)}
+        for w in args.bm25_weights
+    ]
+    depths = [{}]
+    if args.adaptive:
+        depths.append({"adaptive_depth": True, "max_depth_factor": args.max_depth_factor})
+    return [
+        {**fusion, **depth, "top_k": top_k}
+        for top_k, fusion, depth in itertools.product(args.top_k, fusions, depths)
+    ]
+
+
+_state = {}
+
+
+def _init_worker(bm25_results, vector_results, spans, labels, repeat):
+    """Keep the shared evaluation data in the worker process."""
+    by_source = {}
+    for chunk_id, span in spans.items():
+        by_source.setdefault(chunk_id.split(":", 1)[0], []).append(span)
+    _state.update(
+        bm25=CachedLeg(bm25_results), vector=CachedLeg(vector_results),
+        spans=spans, source_spans={source: np.array(s) for source, s in by_source.items()},
+        labels=labels, repeat=repeat
+    )
+
+
+def evaluate(configuration):
+    """Evaluate one fusion configuration over all labeled queries.
+
+    Args:
+        configuration: HybridRetriever arguments plus ``top_k``
+
+    Returns:
+        Configuration with mean nDCG@k, recall@k, fusion latency, candidate depth
+        and the leg depths requested per query key (``leg_depths``)
+    """
+    settings = dict(configuration)
+    top_k = settings.pop("top_k")
+    _state["bm25"].depths.clear()
+    _state["vector"].depths.clear()
+    retriever = HybridRetriever(_state["bm25"], _state["vector"], concurrent_legs=False, **settings)
+    spans, labels = _state["spans"], _state["labels"]
+
+    ndcgs, recalls = [], []
+    for key, label in labels.items():
+        found = [spans[r.chunk_id] for r in retriever.retrieve(key, top_k=top_k)]
+        gains = relevance(np.array(found).reshape(-1, 2), label["start"], label["end"])
+        ideal = relevance(_state["source_spans"][label["source"]], label["start"], label["end"])
+        ndcgs.append(ndcg(gains, ideal))
+        recalls.append(coverage(found, label["start"], label["end"]))
+    depth = retriever.depth_stats()["mean_depth"]
+    leg_depths = {key: list(depths) for key, depths in _state["bm25"].depths.items()}
+    fusion_ms = time_per_query(lambda key: retriever.retrieve(key, top_k=top_k), list(labels), _state["repeat"])
+    retriever.close()
+    return {**configuration, "ndcg": float(np.mean(ndcgs)), "recall": float(np.mean(recalls)),
+            "fusion_ms": float(np.median(fusion_ms)), "mean_depth": depth, "leg_depths": leg_depths}
+
+
+def describe(result):
+    """Short label of a configuration."""
+    if result["fusion_strategy"] == "rrf":
+        name = f"rrf k={result['rrf_k']}"
+    else:
+        name = f"weighted bm25={result['bm25_weight']:.2f}"
+    return name + (" adaptive" if result.get("adaptive_depth") else "")
+
+
+def main():
+    """Main entry point for the evaluation script."""
+    parser = argparse.ArgumentParser(description="Sweep hybrid fusion settings against labeled queries")
+    parser.add_argument("--data-dir", type=str, default="data/test_data", help="Directory with corpora")
+    parser.add_argument("--labels", type=str, default="data/test_data/fusion_labels.jsonl",
+                        help="Labeled queries (JSON lines)")
+    parser.add_argument("--write-labels", action="store_true", help="Seed the labels file from the corpora and exit")
+    parser.add_argument("--queries", type=int, default=50, help="Seeded queries per corpus")
+    parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2", help="Embedding model")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Chunk size")
+    parser.add_argument("--chunk-overlap", type=int, default=50, help="Chunk overlap")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[3, 5, 10], help="Result counts to evaluate")
+    parser.add_argument("--rrf-k", type=int, nargs="+", default=[10, 30, 60, 100], help="RRF constants")
+    parser.add_argument("--bm25-weights", type=float, nargs="+", default=[0.2, 0.35, 0.5, 0.65, 0.8],
+                        help="BM25 weights for weighted fusion (vector weight is 1 - w)")
+    parser.add_argument("--adaptive", action="store_true", help="Also evaluate adaptive candidate depth")
+    parser.add_argument("--max-depth-factor", type=float, default=4.0, help="Adaptive depth limit")
+    parser.add_argument("--recall-tolerance", type=float, default=0.01,
+                        help="Recall loss accepted when picking the smallest top_k")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Evaluation processes")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    parser.add_argument("--output", type=str, default=None, help="Write all results as JSON")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for seeded queries")
+    args = parser.parse_args()
+
+    corpora = sorted(p for p in Path(args.data_dir).iterdir() if p.suffix in (".txt", ".md"))
+    if not corpora:
+        print(f"No corpora found in {args.data_dir}")
+        sys.exit(1)
+
+    labels_path = Path(args.labels)
+    if args.write_labels:
+        labels = seed_labels(corpora, args.queries, random.Random(args.seed))
+        labels_path.write_text("".join(json.dumps(label) + "\n" for label in labels), encoding="utf-8")
+        print(f"Wrote {len(labels)} labeled queries to {labels_path}")
+        return
+    if not labels_path.exists():
+        print(f"No labels at {labels_path}; seed them with --write-labels")
+        sys.exit(1)
+    labels = [json.loads(line) for line in labels_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    bm25_results, vector_results, spans, legs = compute_legs(corpora, labels, args)
+    keyed = {f"{i}:{label['query']}": label for i, label in enumerate(labels) if f"{i}:{label['query']}" in legs}
+    configurations = build_configurations(args)
+    print(f"{len(keyed)} queries, {len(configurations)} configurations, {args.workers} workers")
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(bm25_results, vector_results, spans, keyed, args.repeat)
+    ) as executor:
+        results = list(executor.map(evaluate, configurations))
+
+    for result, legs_ms in zip(results, time_legs(legs, results, args.repeat)):
+        del result["leg_depths"]
+        result["legs_ms"] = legs_ms
+
+    print(f"\n{'top_k':>5} {'configuration':<28} {'nDCG':>6} {'recall':>7} {'legs ms':>8} {'fuse ms':>8} {'depth':>6}")
+    for result in sorted(results, key=lambda r: (r["top_k"], -r["ndcg"])):
+        print(f"{result['top_k']:>5} {describe(result):<28} {result['ndcg']:>6.3f} {result['recall']:>7.3f} "
+              f"{result['legs_ms']:>8.3f} {result['fusion_ms']:>8.3f} {result['mean_depth']:>6.1f}")
+
+    print("\nBest per top_k:")
+    for top_k in args.top_k:
+        best = max((r for r in results if r["top_k"] == top_k), key=lambda r: r["ndcg"])
+        print(f"{top_k:>5} {describe(best):<28} nDCG {best['ndcg']:.3f} recall {best['recall']:.3f} "
+              f"legs {best['legs_ms']:.2f} ms")
+
+    reference = max(r["recall"] for r in results if r["top_k"] == max(args.top_k))
+    smallest = min(
+        (r for r in results if r["recall"] >= reference - args.recall_tolerance),
+        key=lambda r: (r["top_k"], -r["ndcg"])
+    )
+    print(f"\nSmallest top_k within {args.recall_tolerance:.3f} of the best recall at top_k {max(args.top_k)} "
+          f"({reference:.3f}): {smallest['top_k']} with {describe(smallest)} (recall {smallest['recall']:.3f})")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
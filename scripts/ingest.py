@@ -15,6 +15,7 @@ from src.ingestion.chunker import Chunker
 from src.ingestion.bm25_indexer import BM25Indexer
 from src.ingestion.embedder import Embedder
 from src.ingestion.metadata_store import MetadataStore
+from src.rag.analyzer import Analyzer
 from src.rag.vector_db.factory import VectorDBFactory
 from src.utils.logging import setup_logging, get_logger
 
@@ -41,6 +42,11 @@ def main():
         action="store_true",
         help="Overwrite existing indices"
     )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Add the corpus to existing indices instead of rebuilding them"
+    )
     parser.add_argument(
         "--chunk-size",
         type=int,
@@ -72,15 +78,23 @@ def main():
         chunker = Chunker()
         
         # Initialize BM25 indexer
-        bm25_indexer = BM25Indexer()
+        bm25_indexer = BM25Indexer(
+            analyzer=Analyzer.from_config(config.ingestion.bm25_analyzer),
+            compressed=config.ingestion.bm25_compressed,
+            store_positions=config.ingestion.bm25_positions
+        )
         
         # Initialize embedder
         embedder = Embedder(
-            model_name=config.ingestion.embedding_model
+            model_name=config.ingestion.embedding_model,
+            backend=config.ingestion.embedding_backend,
+            quantization=config.ingestion.embedding_quantization,
+            onnx_dir=config.ingestion.embedding_onnx_dir,
+            embedding_cache_path=config.ingestion.embedding_cache_path
         )
         
         # Initialize vector DB
-        vector_db_config = config.vector_db.chroma if config.vector_db.provider == "chroma" else config.vector_db.pinecone
+        vector_db_config = config.vector_db.get_provider_config()
         vector_db = VectorDBFactory.create(
             provider=config.vector_db.provider,
             config=vector_db_config
@@ -95,27 +109,40 @@ def main():
             bm25_indexer=bm25_indexer,
             embedder=embedder,
             vector_db=vector_db,
-            metadata_store=metadata_store
+            metadata_store=metadata_store,
+            embedding_workers=config.ingestion.embedding_workers,
+            embedding_batch_size=config.ingestion.embedding_batch_size,
+            embedding_stream_size=config.ingestion.embedding_stream_size
         )
         
         # Run ingestion
         chunk_size = args.chunk_size or config.ingestion.chunk_size
         chunk_overlap = args.chunk_overlap or config.ingestion.chunk_overlap
         
-        result = pipeline.ingest(
-            corpus_path=args.corpus,
-            collection_name=config.vector_db.chroma.get("collection_name", "corpus_embeddings"),
-            overwrite=args.overwrite,
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
+        collection_name = config.vector_db.get_collection_name()
+        if args.append:
+            result = pipeline.append(
+                corpus_path=args.corpus,
+                collection_name=collection_name,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap
+            )
+        else:
+            result = pipeline.ingest(
+                corpus_path=args.corpus,
+                collection_name=collection_name,
+                overwrite=args.overwrite,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap
+            )
         
         # Print results
         logger.info("Ingestion complete", **{
             "total_chunks": result.total_chunks,
             "duration_seconds": result.duration_seconds,
             "embedding_model": result.embedding_model,
-            "embedding_dimension": result.embedding_dimension
+            "embedding_dimension": result.embedding_dimension,
+            "embedding_chunks_per_second": result.statistics.get("embedding_chunks_per_second")
         })
         print(f"Ingestion complete: {result.total_chunks} chunks processed in {result.duration_seconds:.2f}s")
         
@@ -144,7 +144,8 @@ class NPCManagerAgent(BaseAgent):
         Returns:
             List of retrieval results
         """
-        query = f"{npc_name} character personality speaking style dialogue"
+        # Quoted so BM25 boosts chunks containing the full name as a phrase
+        query = f'"{npc_name}" character personality speaking style dialogue'
 
         return self.retrieval_manager.retrieve(
             query=query,
@@ -163,7 +164,7 @@ class NPCManagerAgent(BaseAgent):
         Returns:
             List of retrieval results
         """
-        query = f"{npc_name} dialogue conversation {context.player_command}"
+        query = f'"{npc_name}" dialogue conversation {context.player_command}'
 
         return self.retrieval_manager.retrieve(
             query=query,
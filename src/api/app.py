@@ -17,6 +17,8 @@ from src.core.retrieval_manager import RetrievalManager
 from src.core.session_manager import SessionManager
 from src.core.orchestrator import GameOrchestrator
 from src.core.game_loop import GameLoop
+from src.ingestion.embedding_dispatcher import EmbeddingDispatcher
+from src.rag.bm25_engine import resolve_bm25_index_path
 from src.agents.narrator import NarratorAgent
 from src.agents.scene_planner import ScenePlannerAgent
 from src.agents.npc_manager import NPCManagerAgent
@@ -78,12 +80,14 @@ async def lifespan(app: FastAPI):
         # Load or auto-initialize indices
         try:
             bm25_path = Path(_app_config.ingestion.bm25_index_path)
+            # Indices from before the .bm25 format keep loading until re-ingestion
+            bm25_load_path = Path(resolve_bm25_index_path(str(bm25_path)))
             metadata_path = Path(_app_config.ingestion.chunk_metadata_path)
             corpus_path = Path(_app_config.ingestion.corpus_path)
             collection_name = _app_config.vector_db.get_collection_name()
 
             # Check if indices exist
-            indices_exist = bm25_path.exists() and metadata_path.exists()
+            indices_exist = bm25_load_path.exists() and metadata_path.exists()
 
             # Check if vector DB collection exists
             vector_db_exists = False
@@ -98,7 +102,7 @@ async def lifespan(app: FastAPI):
             if not indices_exist or not vector_db_exists:
                 logger.warning(
                     "Indices not found - running auto-initialization",
-                    bm25_exists=bm25_path.exists(),
+                    bm25_exists=bm25_load_path.exists(),
                     metadata_exists=metadata_path.exists(),
                     vector_db_exists=vector_db_exists
                 )
@@ -119,24 +123,31 @@ async def lifespan(app: FastAPI):
                 from ..ingestion.bm25_indexer import BM25Indexer
                 from ..ingestion.embedder import Embedder
                 from ..ingestion.metadata_store import MetadataStore
+                from ..rag.analyzer import Analyzer
                 from ..rag.vector_db.factory import VectorDBFactory
 
                 # Initialize ingestion components
                 chunker = Chunker()
-                bm25_indexer = BM25Indexer()
+                bm25_indexer = BM25Indexer(
+                    analyzer=Analyzer.from_config(_app_config.ingestion.bm25_analyzer),
+                    compressed=_app_config.ingestion.bm25_compressed,
+                    store_positions=_app_config.ingestion.bm25_positions
+                )
                 metadata_store = MetadataStore()
-                embedder = Embedder(model_name=_app_config.ingestion.embedding_model)
+                embedder = Embedder(
+                    model_name=_app_config.ingestion.embedding_model,
+                    backend=_app_config.ingestion.embedding_backend,
+                    quantization=_app_config.ingestion.embedding_quantization,
+                    onnx_dir=_app_config.ingestion.embedding_onnx_dir,
+                    embedding_cache_path=_app_config.ingestion.embedding_cache_path
+                )
 
                 # Get vector DB from retrieval manager
                 if _retrieval_manager.hybrid_retriever:
                     vector_db = _retrieval_manager.hybrid_retriever.vector_retriever.vector_db
                 else:
                     # Fallback: create new vector DB
-                    vector_db_config = (
-                        _app_config.vector_db.chroma
-                        if _app_config.vector_db.provider == "chroma"
-                        else _app_config.vector_db.pinecone
-                    )
+                    vector_db_config = _app_config.vector_db.get_provider_config()
                     vector_db = VectorDBFactory.create(
                         _app_config.vector_db.provider, vector_db_config
                     )
@@ -148,6 +159,9 @@ async def lifespan(app: FastAPI):
                     embedder=embedder,
                     vector_db=vector_db,
                     metadata_store=metadata_store,
+                    embedding_workers=_app_config.ingestion.embedding_workers,
+                    embedding_batch_size=_app_config.ingestion.embedding_batch_size,
+                    embedding_stream_size=_app_config.ingestion.embedding_stream_size,
                 )
 
                 # Run ingestion with explicit paths from config
@@ -168,10 +182,11 @@ async def lifespan(app: FastAPI):
                 )
 
             # Now load the indices
-            if bm25_path.exists() and metadata_path.exists():
+            bm25_load_path = Path(resolve_bm25_index_path(str(bm25_path)))
+            if bm25_load_path.exists() and metadata_path.exists():
                 logger.info("Loading indices")
                 _retrieval_manager.load_indices(
-                    str(bm25_path), str(metadata_path), collection_name
+                    str(bm25_load_path), str(metadata_path), collection_name
                 )
                 logger.info("Indices loaded successfully")
             else:
@@ -229,6 +244,7 @@ async def lifespan(app: FastAPI):
 
         # Set dependencies in endpoints
         game.set_game_dependencies(_session_manager, _game_loop)
+        ingestion.set_ingestion_dependencies(_retrieval_manager, _app_config)
         status.set_status_dependencies(
             _session_manager,
             _orchestrator,
@@ -257,6 +273,10 @@ async def lifespan(app: FastAPI):
                     logger.info("Vector DB connections closed")
                 except Exception as e:
                     logger.warning(f"Error closing vector DB: {e}")
+                embedder = _retrieval_manager.hybrid_retriever.vector_retriever.embedder
+                if isinstance(embedder, EmbeddingDispatcher):
+                    embedder.close()
+                _retrieval_manager.hybrid_retriever.close()
 
         # Cleanup sessions
         if _session_manager:
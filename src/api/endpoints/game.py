@@ -2,6 +2,7 @@
 
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
 
 from ..schemas.game_schemas import (
@@ -42,6 +43,16 @@ def progress_callback(progress: TurnProgress):
     _turn_progress[progress.session_id] = progress
 
 
+def _execute_turn(session, player_command: str, initial_context):
+    """Run a turn while holding the session's turn lock."""
+    with session.turn_lock:
+        return _game_loop.execute_turn(
+            session=session,
+            player_command=player_command,
+            initial_context=initial_context,
+        )
+
+
 @router.post("/new_game", response_model=NewGameResponse)
 async def new_game(request: NewGameRequest):
     """
@@ -110,8 +121,10 @@ async def process_turn(request: TurnRequest):
         if len(session.turns) == 0:
             initial_context = session.state.get("initial_context")
 
-        # Execute turn through game loop
-        result = _game_loop.execute_turn(
+        # Execute turn through game loop in a worker thread, so turns of
+        # concurrent sessions overlap (and their query embeddings batch)
+        result = await run_in_threadpool(
+            _execute_turn,
             session=session,
             player_command=request.player_command,
             initial_context=initial_context,
@@ -1,22 +1,69 @@
 """Ingestion API endpoint."""
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from dataclasses import asdict
 from typing import Dict, Any
 import time
-from ..schemas.ingestion import IngestionRequest, IngestionResponse
+from ..schemas.ingestion import IngestionRequest, IngestionResponse, AppendRequest
 from ...ingestion.pipeline import IngestionPipeline
 from ...ingestion.chunker import Chunker
 from ...ingestion.bm25_indexer import BM25Indexer
 from ...ingestion.embedder import Embedder
+from ...ingestion.embedding_dispatcher import EmbeddingDispatcher
 from ...ingestion.metadata_store import MetadataStore
+from ...rag.analyzer import Analyzer
 from ...rag.vector_db.factory import VectorDBFactory
 from ...core.config import AppConfig
+from ...core.retrieval_manager import RetrievalManager
 from ...utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/ingest", tags=["ingestion"])
 
+# Global dependencies (will be initialized in app startup)
+_retrieval_manager: RetrievalManager = None
+_app_config: AppConfig = None
+
+
+def set_ingestion_dependencies(retrieval_manager: RetrievalManager, app_config: AppConfig) -> None:
+    """Set the dependencies of the append endpoint.
+
+    Args:
+        retrieval_manager: Live retrieval manager
+        app_config: Application configuration
+    """
+    global _retrieval_manager, _app_config
+    _retrieval_manager = retrieval_manager
+    _app_config = app_config
+
+
+def _live_pipeline() -> IngestionPipeline:
+    """Build an ingestion pipeline writing to the live vector DB with the live embedder.
+
+    The live embedder is created with ``ingestion.embedding_cache_path``, so
+    appended chunks reuse cached embeddings like offline ingestion does.
+    """
+    vector_retriever = _retrieval_manager.hybrid_retriever.vector_retriever
+    embedder = vector_retriever.embedder
+    if isinstance(embedder, EmbeddingDispatcher):
+        embedder = embedder.embedder
+    return IngestionPipeline(
+        chunker=Chunker(),
+        bm25_indexer=BM25Indexer(
+            analyzer=Analyzer.from_config(_app_config.ingestion.bm25_analyzer),
+            compressed=_app_config.ingestion.bm25_compressed,
+            store_positions=_app_config.ingestion.bm25_positions
+        ),
+        embedder=embedder,
+        vector_db=vector_retriever.vector_db,
+        metadata_store=MetadataStore(),
+        embedding_workers=_app_config.ingestion.embedding_workers,
+        embedding_batch_size=_app_config.ingestion.embedding_batch_size,
+        embedding_stream_size=_app_config.ingestion.embedding_stream_size,
+    )
+
 
 @router.post("/", response_model=IngestionResponse)
 async def ingest(
@@ -60,3 +107,36 @@ async def ingest(
         logger.error("Ingestion failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/append", response_model=IngestionResponse)
+async def append(request: AppendRequest):
+    """Append a corpus to the live indices; new chunks are searchable immediately.
+
+    Args:
+        request: Append request
+
+    Returns:
+        IngestionResponse with the appended chunks
+    """
+    logger.info("Append request received", corpus_path=request.corpus_path)
+    if _retrieval_manager is None or _retrieval_manager.hybrid_retriever is None or _app_config is None:
+        raise HTTPException(status_code=503, detail="Retrieval not initialized")
+
+    try:
+        # Chunking and embedding a corpus takes seconds; keep the event loop serving queries
+        result = await run_in_threadpool(
+            _retrieval_manager.append_corpus,
+            _live_pipeline(),
+            request.corpus_path,
+            collection_name=_app_config.vector_db.get_collection_name(),
+            chunk_size=request.chunk_size,
+            chunk_overlap=request.chunk_overlap,
+            bm25_index_path=_app_config.ingestion.bm25_index_path,
+            metadata_path=_app_config.ingestion.chunk_metadata_path,
+        )
+        return IngestionResponse(status="success", result=asdict(result))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error("Append failed", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
@@ -75,6 +75,10 @@ async def search(request: SearchRequest):
                 score=r.score,
                 bm25_score=r.metadata.get("bm25_score") if r.metadata else None,
                 vector_score=r.metadata.get("vector_score") if r.metadata else None,
+                bm25_score_normalized=r.metadata.get("bm25_score_normalized") if r.metadata else None,
+                vector_score_normalized=r.metadata.get("vector_score_normalized") if r.metadata else None,
+                bm25_rank=r.metadata.get("bm25_rank") if r.metadata else None,
+                vector_rank=r.metadata.get("vector_rank") if r.metadata else None,
                 metadata=r.metadata or {}
             )
             for r in results
@@ -166,12 +166,22 @@ async def get_corpus_status():
 
         # Check BM25 index status
         bm25_status = ConnectionStatus.UNKNOWN
+        bm25_index_bytes = None
+        bm25_compressed = None
         if _retrieval_manager and hasattr(_retrieval_manager, 'hybrid_retriever'):
             if _retrieval_manager.hybrid_retriever and _retrieval_manager.hybrid_retriever.bm25_retriever:
                 bm25_retriever = _retrieval_manager.hybrid_retriever.bm25_retriever
                 if bm25_retriever.is_loaded():
                     bm25_status = ConnectionStatus.CONNECTED
 
+                    # Index footprint, for sizing hosts that load many corpora
+                    bm25_index = getattr(bm25_retriever, "index", None)
+                    index_bytes = getattr(bm25_index, "nbytes", None)
+                    if isinstance(index_bytes, int):
+                        bm25_index_bytes = index_bytes
+                        compressed = getattr(bm25_index, "compressed", None)
+                        bm25_compressed = compressed if isinstance(compressed, bool) else None
+
                     # Extract loaded corpus info from metadata
                     metadata = getattr(bm25_retriever, "metadata", None)
                     if metadata and isinstance(metadata, dict) and len(metadata) > 0:
@@ -239,6 +249,8 @@ async def get_corpus_status():
             loaded_corpora=loaded_corpora,
             total_chunks=total_chunks,
             bm25_status=bm25_status,
+            bm25_index_bytes=bm25_index_bytes,
+            bm25_compressed=bm25_compressed,
             vector_db_status=vector_db_status,
             vector_db_provider=vector_db_provider,
             collection_name=collection_name,
@@ -375,6 +387,26 @@ async def get_retrieval_status():
             # Calculate hit rate if we track it
             # For now, just count cached queries
 
+        # Get query-embedding cache and candidate depth stats
+        query_cache_stats = {}
+        depth_stats = {}
+        rerank_stats = {}
+        if hasattr(_retrieval_manager, 'hybrid_retriever') and _retrieval_manager.hybrid_retriever:
+            vector_retriever = _retrieval_manager.hybrid_retriever.vector_retriever
+            if vector_retriever and hasattr(vector_retriever, 'query_cache_stats'):
+                stats = vector_retriever.query_cache_stats()
+                if isinstance(stats, dict):
+                    query_cache_stats = stats
+            if hasattr(_retrieval_manager.hybrid_retriever, 'depth_stats'):
+                stats = _retrieval_manager.hybrid_retriever.depth_stats()
+                if isinstance(stats, dict):
+                    depth_stats = stats
+            reranker = getattr(_retrieval_manager.hybrid_retriever, 'reranker', None)
+            if reranker is not None and hasattr(reranker, 'stats'):
+                stats = reranker.stats()
+                if isinstance(stats, dict):
+                    rerank_stats = stats
+
         return RetrievalStatusResponse(
             hybrid_retrieval_enabled=True,
             bm25_status=bm25_status,
@@ -385,6 +417,15 @@ async def get_retrieval_status():
             cache_hit_rate=cache_hit_rate,
             cached_queries=cached_queries,
             total_retrievals=total_retrievals,
+            query_embedding_cache_hits=query_cache_stats.get("hits", 0),
+            query_embedding_cache_misses=query_cache_stats.get("misses", 0),
+            query_embedding_cache_size=query_cache_stats.get("size", 0),
+            hybrid_queries=depth_stats.get("queries", 0),
+            candidate_depth_mean=depth_stats.get("mean_depth", 0.0),
+            candidate_depth_expanded_queries=depth_stats.get("expanded_queries", 0),
+            reranker_enabled=bool(rerank_stats),
+            rerank_mean_latency_ms=rerank_stats.get("mean_latency_ms", 0.0),
+            rerank_budget_exceeded=rerank_stats.get("budget_exceeded", 0),
         )
 
     except Exception as e:
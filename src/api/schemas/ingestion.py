@@ -20,6 +20,13 @@ class IngestionRequest(BaseModel):
     overwrite: bool = Field(default=False, description="Overwrite existing collection")
 
 
+class AppendRequest(BaseModel):
+    """Request schema for appending a corpus to the live indices."""
+    corpus_path: str = Field(..., description="Path to corpus file")
+    chunk_size: int = Field(default=500, ge=100, le=2000, description="Chunk size in characters")
+    chunk_overlap: int = Field(default=50, ge=0, le=500, description="Chunk overlap in characters")
+
+
 class IngestionResponse(BaseModel):
     """Response schema for ingestion endpoint."""
     status: str = Field(..., description="Status: success or error")
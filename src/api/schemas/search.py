@@ -21,6 +21,10 @@ class SearchResult(BaseModel):
     score: float
     bm25_score: Optional[float] = None
     vector_score: Optional[float] = None
+    bm25_score_normalized: Optional[float] = None
+    vector_score_normalized: Optional[float] = None
+    bm25_rank: Optional[int] = None
+    vector_rank: Optional[int] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
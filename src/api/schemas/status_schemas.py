@@ -59,6 +59,14 @@ class CorpusStatusResponse(BaseModel):
         ...,
         description="BM25 index status"
     )
+    bm25_index_bytes: Optional[int] = Field(
+        None,
+        description="Size of the loaded BM25 index (postings, statistics, vocabulary) in bytes"
+    )
+    bm25_compressed: Optional[bool] = Field(
+        None,
+        description="Whether the BM25 index uses compressed postings"
+    )
     vector_db_status: ConnectionStatus = Field(
         ...,
         description="Vector database connection status"
@@ -165,3 +173,39 @@ class RetrievalStatusResponse(BaseModel):
         default=0,
         description="Total retrievals since startup"
     )
+    query_embedding_cache_hits: int = Field(
+        default=0,
+        description="Query embeddings served from the LRU cache"
+    )
+    query_embedding_cache_misses: int = Field(
+        default=0,
+        description="Query embeddings computed by the embedding model"
+    )
+    query_embedding_cache_size: int = Field(
+        default=0,
+        description="Query embeddings currently cached"
+    )
+    hybrid_queries: int = Field(
+        default=0,
+        description="Hybrid queries answered since startup"
+    )
+    candidate_depth_mean: float = Field(
+        default=0.0,
+        description="Mean candidates fetched per retrieval leg and query"
+    )
+    candidate_depth_expanded_queries: int = Field(
+        default=0,
+        description="Queries whose candidate depth was expanded (adaptive mode)"
+    )
+    reranker_enabled: bool = Field(
+        default=False,
+        description="Whether fused results are reranked by a cross-encoder"
+    )
+    rerank_mean_latency_ms: float = Field(
+        default=0.0,
+        description="Mean reranking time per query"
+    )
+    rerank_budget_exceeded: int = Field(
+        default=0,
+        description="Queries whose reranking stopped at the latency budget"
+    )
@@ -73,6 +73,24 @@ class RetrievalConfig:
     fusion_strategy: Literal["rrf", "weighted"] = "rrf"
     rrf_k: int = 60  # For Reciprocal Rank Fusion
     query_rewriter_enabled: bool = True
+    bm25_phrase_boost: float = 0.5  # Score multiplier per quoted phrase found in a chunk (0 disables)
+    bm25_phrase_slop: int = 0  # Allowed displacement of phrase terms (0 = exact phrase)
+    query_embedding_cache_size: int = 1024  # LRU entries of query embeddings (0 disables)
+    embedding_batch_max_size: int = 32  # Max concurrent queries embedded in one model call
+    embedding_batch_max_wait_ms: float = 2.0  # Wait for concurrent queries before embedding (0 disables batching)
+    hybrid_concurrent_legs: bool = True  # Run BM25 and vector search concurrently
+    bm25_leg_timeout_ms: Optional[float] = 2000.0  # Drop the BM25 leg after this long (None waits)
+    vector_leg_timeout_ms: Optional[float] = 2000.0  # Drop the vector leg after this long (None waits)
+    adaptive_candidate_depth: bool = False  # Fetch few candidates per leg, expand while the legs disagree
+    candidate_depth_initial_factor: float = 1.0  # First depth per leg as a multiple of top_k (adaptive)
+    candidate_depth_max_factor: float = 4.0  # Largest depth per leg as a multiple of top_k (adaptive)
+    candidate_overlap_threshold: float = 0.5  # Share of fused top-k found by both legs that stops expansion
+    reranker_enabled: bool = False  # Rerank fused results with a local cross-encoder
+    reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    reranker_candidates: int = 30  # Fused results scored by the cross-encoder per query
+    reranker_batch_size: int = 32  # Query/chunk pairs per cross-encoder call
+    reranker_max_latency_ms: Optional[float] = 150.0  # Per-query scoring budget; batches are sized to fit it (None scores all)
+    reranker_cache_size: int = 4096  # LRU entries of (query, chunk id) scores (0 disables)
 
 
 @dataclass
@@ -91,19 +109,35 @@ class IngestionConfig:
     chunk_size: int = 500
     chunk_overlap: int = 50
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
-    bm25_index_path: str = "data/indices/bm25_index.pkl"
+    embedding_backend: str = "torch"  # torch or onnx (ONNX Runtime on CPU, needs optimum[onnxruntime])
+    embedding_quantization: Optional[str] = None  # int8 preset for onnx: arm64, avx2, avx512, avx512_vnni
+    embedding_onnx_dir: str = "data/models/onnx"  # Where quantized ONNX exports are kept
+    embedding_workers: int = 1  # Embedding worker processes during ingestion (1 = in-process)
+    embedding_batch_size: Optional[int] = None  # None adapts the batch size to chunk length
+    embedding_cache_path: Optional[str] = "data/indices/embedding_cache.sqlite"  # Chunk embeddings by text hash (None disables)
+    embedding_stream_size: int = 1024  # Chunks embedded per slice streamed into the vector DB
+    bm25_index_path: str = "data/indices/bm25_index.bm25"
     vector_index_path: str = "data/indices/vector_index"
     chunk_metadata_path: str = "data/indices/chunks.json"
+    bm25_analyzer: Dict[str, Any] = field(default_factory=dict)  # Analyzer settings, see src/rag/analyzer.py
+    bm25_compressed: bool = False  # Varint doc ids + 8-bit quantized impacts (smaller, approximate scores)
+    bm25_positions: bool = True  # Store token positions for phrase matching
 
 
 @dataclass
 class VectorDBConfig:
     """Configuration for vector database."""
-    provider: str = "chroma"  # chroma, pinecone, etc.
+    provider: str = "chroma"  # chroma, pinecone, numpy, etc.
     chroma: Dict[str, Any] = field(default_factory=lambda: {
         "persist_directory": "data/vector_db",
         "collection_name": "corpus_embeddings",
-        "in_memory": False
+        "in_memory": False,
+        "batch_size": 1000,
+        "writer_thread": False,
+        "hnsw_space": "cosine",
+        "hnsw_m": 16,
+        "hnsw_construction_ef": 100,
+        "hnsw_search_ef": 100
     })
     pinecone: Dict[str, Any] = field(default_factory=lambda: {
         "api_key": None,
@@ -111,6 +145,28 @@ class VectorDBConfig:
         "index_name": "ma-rag-rpg-index",
         "dimension": 384
     })
+    numpy: Dict[str, Any] = field(default_factory=lambda: {
+        "persist_directory": "data/vector_db_numpy",
+        "collection_name": "corpus_embeddings",
+        "in_memory": False,
+        "metric": "cosine",
+        "dtype": "float32",
+        "mmap": True
+    })
+
+    def get_provider_config(self) -> Dict[str, Any]:
+        """Get the provider-specific configuration.
+
+        Raises:
+            ValueError: If provider is not supported
+        """
+        if self.provider == "chroma":
+            return self.chroma
+        elif self.provider == "pinecone":
+            return self.pinecone
+        elif self.provider == "numpy":
+            return self.numpy
+        raise ValueError(f"Unsupported vector DB provider: {self.provider}")
 
     def get_collection_name(self) -> str:
         """Get the collection name based on provider."""
@@ -118,6 +174,8 @@ class VectorDBConfig:
             return self.chroma.get("collection_name", "corpus_embeddings")
         elif self.provider == "pinecone":
             return self.pinecone.get("index_name", "ma-rag-rpg-index")
+        elif self.provider == "numpy":
+            return self.numpy.get("collection_name", "corpus_embeddings")
         return "unknown"
 
 
@@ -311,6 +369,24 @@ class AppConfig:
             fusion_strategy=retrieval_dict.get("fusion_strategy", "rrf"),
             rrf_k=retrieval_dict.get("rrf_k", 60),
             query_rewriter_enabled=retrieval_dict.get("query_rewriter_enabled", True),
+            bm25_phrase_boost=retrieval_dict.get("bm25_phrase_boost", 0.5),
+            bm25_phrase_slop=retrieval_dict.get("bm25_phrase_slop", 0),
+            query_embedding_cache_size=retrieval_dict.get("query_embedding_cache_size", 1024),
+            embedding_batch_max_size=retrieval_dict.get("embedding_batch_max_size", 32),
+            embedding_batch_max_wait_ms=retrieval_dict.get("embedding_batch_max_wait_ms", 2.0),
+            hybrid_concurrent_legs=retrieval_dict.get("hybrid_concurrent_legs", True),
+            bm25_leg_timeout_ms=retrieval_dict.get("bm25_leg_timeout_ms", 2000.0),
+            vector_leg_timeout_ms=retrieval_dict.get("vector_leg_timeout_ms", 2000.0),
+            adaptive_candidate_depth=retrieval_dict.get("adaptive_candidate_depth", False),
+            candidate_depth_initial_factor=retrieval_dict.get("candidate_depth_initial_factor", 1.0),
+            candidate_depth_max_factor=retrieval_dict.get("candidate_depth_max_factor", 4.0),
+            candidate_overlap_threshold=retrieval_dict.get("candidate_overlap_threshold", 0.5),
+            reranker_enabled=retrieval_dict.get("reranker_enabled", False),
+            reranker_model=retrieval_dict.get("reranker_model", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+            reranker_candidates=retrieval_dict.get("reranker_candidates", 30),
+            reranker_batch_size=retrieval_dict.get("reranker_batch_size", 32),
+            reranker_max_latency_ms=retrieval_dict.get("reranker_max_latency_ms", 150.0),
+            reranker_cache_size=retrieval_dict.get("reranker_cache_size", 4096),
         )
         
         # Build session config
@@ -329,9 +405,19 @@ class AppConfig:
             chunk_size=ingestion_dict.get("chunk_size", 500),
             chunk_overlap=ingestion_dict.get("chunk_overlap", 50),
             embedding_model=ingestion_dict.get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2"),
-            bm25_index_path=ingestion_dict.get("bm25_index_path", "data/indices/bm25_index.pkl"),
+            embedding_backend=ingestion_dict.get("embedding_backend", "torch"),
+            embedding_quantization=ingestion_dict.get("embedding_quantization"),
+            embedding_onnx_dir=ingestion_dict.get("embedding_onnx_dir", "data/models/onnx"),
+            embedding_workers=ingestion_dict.get("embedding_workers", 1),
+            embedding_batch_size=ingestion_dict.get("embedding_batch_size"),
+            embedding_cache_path=ingestion_dict.get("embedding_cache_path", "data/indices/embedding_cache.sqlite"),
+            embedding_stream_size=ingestion_dict.get("embedding_stream_size", 1024),
+            bm25_index_path=ingestion_dict.get("bm25_index_path", "data/indices/bm25_index.bm25"),
             vector_index_path=ingestion_dict.get("vector_index_path", "data/indices/vector_index"),
             chunk_metadata_path=ingestion_dict.get("chunk_metadata_path", "data/indices/chunks.json"),
+            bm25_analyzer=ingestion_dict.get("bm25_analyzer", {}),
+            bm25_compressed=ingestion_dict.get("bm25_compressed", False),
+            bm25_positions=ingestion_dict.get("bm25_positions", True),
         )
         
         # Build vector DB config
@@ -341,13 +427,27 @@ class AppConfig:
             chroma=vector_db_dict.get("chroma", {
                 "persist_directory": "data/vector_db",
                 "collection_name": "corpus_embeddings",
-                "in_memory": False
+                "in_memory": False,
+                "batch_size": 1000,
+                "writer_thread": False,
+                "hnsw_space": "cosine",
+                "hnsw_m": 16,
+                "hnsw_construction_ef": 100,
+                "hnsw_search_ef": 100
             }),
             pinecone=vector_db_dict.get("pinecone", {
                 "api_key": os.getenv("PINECONE_API_KEY"),
                 "environment": "us-west1-gcp",
                 "index_name": "ma-rag-rpg-index",
                 "dimension": 384
+            }),
+            numpy=vector_db_dict.get("numpy", {
+                "persist_directory": "data/vector_db_numpy",
+                "collection_name": "corpus_embeddings",
+                "in_memory": False,
+                "metric": "cosine",
+                "dtype": "float32",
+                "mmap": True
             })
         )
         
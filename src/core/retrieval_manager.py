@@ -1,17 +1,22 @@
 """Retrieval manager coordinates retrieval for agents."""
 
-from typing import List, Optional, Dict, Any
+import threading
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 from pathlib import Path
 from .base_agent import RetrievalResult
 from ..rag.base_retriever import BaseRetriever
 from ..rag.query_rewriter import QueryRewriter
 from ..rag.bm25_retriever import BM25Retriever
+from ..rag.bm25_engine import resolve_bm25_index_path
 from ..rag.vector_retriever import VectorRetriever
 from ..rag.hybrid_retriever import HybridRetriever
 from ..rag.vector_db.factory import VectorDBFactory
 from ..utils.logging import get_logger
 from ..utils.debug_logging import debug_log_method
 
+if TYPE_CHECKING:
+    from ..ingestion.pipeline import IngestionPipeline, IngestionResult
+
 logger = get_logger(__name__)
 
 
@@ -36,6 +41,7 @@ class RetrievalManager:
         self.logger = get_logger(__name__)
         # Cache for retrieval results per query
         self._cache: Dict[str, List[RetrievalResult]] = {}
+        self._append_lock = threading.Lock()
 
     @classmethod
     def from_config(cls, config: "AppConfig") -> "RetrievalManager":
@@ -52,22 +58,36 @@ class RetrievalManager:
         from .config import AppConfig
 
         # Initialize BM25 retriever with lazy loading
-        bm25_retriever = BM25Retriever(lazy_load=True)
+        bm25_retriever = BM25Retriever(
+            lazy_load=True,
+            phrase_boost=config.retrieval.bm25_phrase_boost,
+            phrase_slop=config.retrieval.bm25_phrase_slop
+        )
 
         # Initialize vector retriever
         # Get provider-specific config
-        if config.vector_db.provider == "chroma":
-            vector_db_config = config.vector_db.chroma
-        elif config.vector_db.provider == "pinecone":
-            vector_db_config = config.vector_db.pinecone
-        else:
-            raise ValueError(f"Unsupported vector DB provider: {config.vector_db.provider}")
+        vector_db_config = config.vector_db.get_provider_config()
 
         vector_db = VectorDBFactory.create(config.vector_db.provider, vector_db_config)
 
         # Initialize embedder
         from ..ingestion.embedder import Embedder
-        embedder = Embedder(model_name=config.ingestion.embedding_model)
+        embedder = Embedder(
+            model_name=config.ingestion.embedding_model,
+            backend=config.ingestion.embedding_backend,
+            quantization=config.ingestion.embedding_quantization,
+            onnx_dir=config.ingestion.embedding_onnx_dir,
+            # Live appends (POST /ingest/append) embed chunks with this embedder
+            embedding_cache_path=config.ingestion.embedding_cache_path
+        )
+        if config.retrieval.embedding_batch_max_wait_ms > 0:
+            # Coalesce concurrent query embeddings into batched model calls
+            from ..ingestion.embedding_dispatcher import EmbeddingDispatcher
+            embedder = EmbeddingDispatcher(
+                embedder,
+                max_batch_size=config.retrieval.embedding_batch_max_size,
+                max_wait_ms=config.retrieval.embedding_batch_max_wait_ms
+            )
 
         # Get collection name
         collection_name = config.vector_db.get_collection_name()
@@ -75,9 +95,21 @@ class RetrievalManager:
         vector_retriever = VectorRetriever(
             vector_db=vector_db,
             collection_name=collection_name,
-            embedder=embedder
+            embedder=embedder,
+            query_cache_size=config.retrieval.query_embedding_cache_size
         )
 
+        # Initialize optional cross-encoder reranker
+        reranker = None
+        if config.retrieval.reranker_enabled:
+            from ..rag.reranker import CrossEncoderReranker
+            reranker = CrossEncoderReranker(
+                model_name=config.retrieval.reranker_model,
+                batch_size=config.retrieval.reranker_batch_size,
+                max_latency_ms=config.retrieval.reranker_max_latency_ms,
+                cache_size=config.retrieval.reranker_cache_size
+            )
+
         # Initialize hybrid retriever
         hybrid_retriever = HybridRetriever(
             bm25_retriever=bm25_retriever,
@@ -85,7 +117,16 @@ class RetrievalManager:
             fusion_strategy=config.retrieval.fusion_strategy,
             bm25_weight=config.retrieval.bm25_weight,
             vector_weight=config.retrieval.vector_weight,
-            rrf_k=config.retrieval.rrf_k
+            rrf_k=config.retrieval.rrf_k,
+            concurrent_legs=config.retrieval.hybrid_concurrent_legs,
+            bm25_timeout_ms=config.retrieval.bm25_leg_timeout_ms,
+            vector_timeout_ms=config.retrieval.vector_leg_timeout_ms,
+            adaptive_depth=config.retrieval.adaptive_candidate_depth,
+            initial_depth_factor=config.retrieval.candidate_depth_initial_factor,
+            max_depth_factor=config.retrieval.candidate_depth_max_factor,
+            overlap_threshold=config.retrieval.candidate_overlap_threshold,
+            reranker=reranker,
+            rerank_candidates=config.retrieval.reranker_candidates
         )
 
         # Initialize query rewriter if enabled
@@ -113,6 +154,7 @@ class RetrievalManager:
             raise ValueError("HybridRetriever not initialized")
 
         # Load BM25 index
+        bm25_index_path = resolve_bm25_index_path(bm25_index_path)
         if Path(bm25_index_path).exists() and Path(metadata_path).exists():
             self.hybrid_retriever.bm25_retriever.load_index(
                 bm25_index_path,
@@ -181,6 +223,64 @@ class RetrievalManager:
             self.logger.error("Retrieval failed", error=str(e), query=query[:50])
             return []
     
+    @debug_log_method
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        agent_name: Optional[str] = None,
+        use_cache: bool = True,
+        rewrite_query: bool = True,
+    ) -> List[List[RetrievalResult]]:
+        """
+        Retrieve relevant chunks for several queries in one call.
+
+        Queries are rewritten and looked up in the cache individually; the
+        remaining ones are sent to the retriever as a single batch.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            agent_name: Optional agent name for logging
+            use_cache: Whether to use cached results
+            rewrite_query: Whether to rewrite queries before retrieval
+
+        Returns:
+            One list of RetrievalResult objects per query
+        """
+        if rewrite_query and self.query_rewriter:
+            queries = [self.query_rewriter.rewrite(query) for query in queries]
+        
+        cache_keys = [
+            f"{agent_name}:{query}:{top_k}" if agent_name else f"{query}:{top_k}"
+            for query in queries
+        ]
+        results: List[Optional[List[RetrievalResult]]] = [
+            self._cache.get(key) if use_cache else None for key in cache_keys
+        ]
+        
+        pending = [i for i, cached in enumerate(results) if cached is None]
+        if pending:
+            try:
+                batches = self.retriever.retrieve_many([queries[i] for i in pending], top_k)
+            except Exception as e:
+                self.logger.error("Batch retrieval failed", error=str(e), query_count=len(pending))
+                batches = [[] for _ in pending]
+            else:
+                if use_cache:
+                    for i, batch in zip(pending, batches):
+                        self._cache[cache_keys[i]] = batch
+            for i, batch in zip(pending, batches):
+                results[i] = batch
+        
+        self.logger.debug(
+            "Batch retrieval completed",
+            query_count=len(queries),
+            cached_count=len(queries) - len(pending),
+            agent=agent_name,
+        )
+        return results
+    
     def rewrite_query(self, query: str) -> str:
         """Rewrite query for better retrieval.
         
@@ -194,6 +294,43 @@ class RetrievalManager:
             return self.query_rewriter.rewrite(query)
         return query
     
+    @debug_log_method
+    def append_corpus(
+        self,
+        pipeline: "IngestionPipeline",
+        corpus_path: str,
+        **append_kwargs: Any
+    ) -> "IngestionResult":
+        """Append a corpus and make it searchable without a restart.
+
+        The pipeline must write to the vector DB this manager searches; the
+        new chunks are added to the live BM25 index as a segment and cached
+        results are dropped. Appends are serialized.
+
+        Args:
+            pipeline: Ingestion pipeline sharing this manager's vector DB
+            corpus_path: Path to the new corpus text file
+            **append_kwargs: Further ``IngestionPipeline.append`` arguments
+
+        Returns:
+            IngestionResult for the appended chunks
+
+        Raises:
+            ValueError: If no hybrid retriever is configured
+        """
+        if not self.hybrid_retriever:
+            raise ValueError("HybridRetriever not initialized")
+        with self._append_lock:
+            result = pipeline.append(
+                corpus_path=corpus_path,
+                bm25_retriever=self.hybrid_retriever.bm25_retriever,
+                **append_kwargs
+            )
+            self.clear_cache()
+        self.logger.info("Corpus appended to live indices", corpus_path=corpus_path,
+                         appended_chunks=result.total_chunks)
+        return result
+
     def clear_cache(self) -> None:
         """Clear the retrieval cache."""
         self._cache.clear()
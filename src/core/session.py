@@ -1,5 +1,6 @@
 """Game session management with sliding window memory."""
 
+import threading
 import time
 import tiktoken
 from dataclasses import dataclass, field
@@ -36,6 +37,11 @@ class GameSession:
     wins: int = 0  # Player wins (agent disqualified)
     losses: int = 0  # Player losses (user disqualified)
 
+    # Serializes turns of this session; dropped together with the session
+    turn_lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
     def __post_init__(self):
         """Initialize session state."""
         if "current_scene" not in self.state:
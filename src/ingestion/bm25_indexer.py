@@ -1,9 +1,11 @@
 """BM25 index building and management."""
 
-from typing import List
-import pickle
+from typing import List, Optional, Union
 from pathlib import Path
-from rank_bm25 import BM25Okapi
+from ..rag.analyzer import Analyzer
+from ..rag.bm25_engine import BM25Engine, load_bm25_index
+from ..rag.bm25_compressed import CompressedBM25Engine
+from ..rag.bm25_segments import SegmentedBM25Index
 from ..utils.logging import get_logger
 from ..utils.debug_logging import debug_log_method
 
@@ -13,71 +15,127 @@ logger = get_logger(__name__)
 class BM25Indexer:
     """Build and manage BM25 index."""
     
-    def __init__(self):
-        """Initialize BM25 indexer."""
+    def __init__(
+        self,
+        analyzer: Optional[Analyzer] = None,
+        compressed: bool = False,
+        store_positions: bool = True
+    ):
+        """Initialize BM25 indexer.
+
+        Args:
+            analyzer: Text analyzer for chunks and queries (default: Analyzer())
+            compressed: Save indices with compressed postings
+            store_positions: Store token positions for phrase matching
+        """
+        self.analyzer = analyzer or Analyzer()
+        self.compressed = compressed
+        self.store_positions = store_positions
         self.index = None
     
     @debug_log_method
-    def build_index(self, chunks: List[str]) -> BM25Okapi:
+    def build_index(self, chunks: List[str]) -> BM25Engine:
         """Build BM25 index from chunks.
 
         Args:
             chunks: List of chunk texts
 
         Returns:
-            BM25Okapi index object
+            BM25Engine inverted index
         """
         logger.info("Building BM25 index", chunk_count=len(chunks))
         
         if not chunks:
             raise ValueError("Cannot build BM25 index from empty chunk list")
         
-        # Tokenize chunks (simple whitespace tokenization)
-        tokenized_chunks = [chunk.lower().split() for chunk in chunks]
+        # Analyze all chunks in one batch; the analyzer is stored with the index
+        tokenized_chunks = self.analyzer.analyze_batch(chunks)
         
-        # Build BM25 index
-        self.index = BM25Okapi(tokenized_chunks)
-        logger.info("BM25 index built successfully", chunk_count=len(chunks))
+        # Build inverted BM25 index
+        self.index = BM25Engine.from_tokenized(
+            tokenized_chunks, analyzer=self.analyzer, store_positions=self.store_positions
+        )
+        logger.info("BM25 index built successfully",
+                   chunk_count=len(chunks),
+                   vocabulary_size=self.index.vocabulary_size)
         
         return self.index
     
     @debug_log_method
-    def save_index(self, index: BM25Okapi, path: str) -> None:
+    def append_to_index(
+        self,
+        index: Union[BM25Engine, CompressedBM25Engine, SegmentedBM25Index],
+        chunks: List[str]
+    ) -> SegmentedBM25Index:
+        """Append chunks to an existing index without rebuilding it.
+
+        New chunks are analyzed with the index's own analyzer and get the
+        document ids following the existing ones.
+
+        Args:
+            index: Existing BM25 index
+            chunks: List of new chunk texts
+
+        Returns:
+            Segmented index covering old and new chunks
+        """
+        logger.info("Appending to BM25 index", chunk_count=len(chunks))
+        
+        segmented = index if isinstance(index, SegmentedBM25Index) else SegmentedBM25Index(index)
+        segmented.add_documents(chunks)
+        
+        self.index = segmented
+        logger.info("BM25 index appended successfully",
+                   chunk_count=segmented.corpus_size,
+                   vocabulary_size=segmented.vocabulary_size)
+        
+        return segmented
+    
+    @debug_log_method
+    def save_index(
+        self,
+        index: Union[BM25Engine, CompressedBM25Engine, SegmentedBM25Index],
+        path: str
+    ) -> None:
         """Save index to disk.
 
         Args:
             index: BM25 index to save
             path: File path to save to
         """
-        logger.info("Saving BM25 index", path=path)
+        logger.info("Saving BM25 index", path=path, compressed=self.compressed)
         
         # Create directory if needed
         path_obj = Path(path)
         path_obj.parent.mkdir(parents=True, exist_ok=True)
         
-        # Save index using pickle
-        with open(path, "wb") as f:
-            pickle.dump(index, f)
+        if isinstance(index, SegmentedBM25Index):
+            index = index.merge()
+        if self.compressed and isinstance(index, BM25Engine):
+            index = CompressedBM25Engine.from_engine(index)
+        elif not self.compressed and isinstance(index, CompressedBM25Engine):
+            index = index.decompress()
+        
+        # Save index in the flat, memory-mappable format
+        index.save(path)
         
-        logger.info("BM25 index saved successfully", path=path)
+        logger.info("BM25 index saved successfully", path=path, index_bytes=index.nbytes)
     
-    def load_index(self, path: str) -> BM25Okapi:
+    def load_index(self, path: str) -> Union[BM25Engine, CompressedBM25Engine]:
         """Load index from disk.
         
         Args:
             path: File path to load from
             
         Returns:
-            BM25Okapi index object
+            BM25Engine (or CompressedBM25Engine) index object
         """
         logger.info("Loading BM25 index", path=path)
         
         if not Path(path).exists():
             raise FileNotFoundError(f"BM25 index file not found: {path}")
         
-        # Load index from pickle file
-        with open(path, "rb") as f:
-            index = pickle.load(f)
+        index = load_bm25_index(path)
         
         self.index = index
         logger.info("BM25 index loaded successfully", path=path)
@@ -1,41 +1,160 @@
 """Embedding generation for text chunks."""
 
-from typing import List, Optional
+import math
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import numpy as np
 from sentence_transformers import SentenceTransformer
+from .embedding_cache import EmbeddingCache
 from ..utils.logging import get_logger
 from ..utils.debug_logging import debug_log_method
 
 logger = get_logger(__name__)
 
 
+# Approximate token budget of one embedding batch (texts x padded tokens)
+BATCH_TOKEN_BUDGET = 8192
+MIN_BATCH_SIZE = 8
+MAX_BATCH_SIZE = 256
+
+SUPPORTED_BACKENDS = ("torch", "onnx")
+# Dynamic int8 quantization presets of sentence-transformers' ONNX export
+SUPPORTED_QUANTIZATIONS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+
+def adaptive_batch_size(
+    texts: List[str],
+    max_seq_length: int = 256,
+    token_budget: int = BATCH_TOKEN_BUDGET
+) -> int:
+    """Pick a batch size that keeps padded batches near a token budget.
+
+    Short texts (NPC queries, small chunks) get large batches and long
+    chunks smaller ones, so memory per batch stays roughly constant.
+    Tokens are estimated at four characters each, capped at the model's
+    maximum sequence length.
+
+    Args:
+        texts: Texts to embed
+        max_seq_length: Model's maximum sequence length in tokens
+        token_budget: Approximate tokens per batch
+
+    Returns:
+        Batch size between MIN_BATCH_SIZE and MAX_BATCH_SIZE
+    """
+    if not texts:
+        return MIN_BATCH_SIZE
+    average_chars = sum(len(text) for text in texts) / len(texts)
+    tokens = min(max(average_chars / 4.0, 1.0), max_seq_length)
+    return int(min(MAX_BATCH_SIZE, max(MIN_BATCH_SIZE, token_budget // tokens)))
+
+
 class Embedder:
     """Generate embeddings for text."""
     
-    def __init__(self, model_name: str, cache_dir: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Optional[str] = None,
+        backend: str = "torch",
+        quantization: Optional[str] = None,
+        onnx_dir: str = "data/models/onnx",
+        embedding_cache_path: Optional[str] = None
+    ):
         """Initialize embedder with model.
         
         Args:
             model_name: Name of embedding model
             cache_dir: Optional cache directory for models
+            backend: "torch" (PyTorch) or "onnx" (ONNX Runtime on CPU)
+            quantization: Optional int8 dynamic quantization preset for the
+                ONNX backend ("arm64", "avx2", "avx512" or "avx512_vnni")
+            onnx_dir: Directory where quantized ONNX exports are kept
+            embedding_cache_path: Optional SQLite file caching document embeddings by text hash
+
+        Raises:
+            ValueError: If backend or quantization is not supported
         """
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Unsupported embedding backend: {backend}. Supported: {SUPPORTED_BACKENDS}")
+        if quantization is not None:
+            if backend != "onnx":
+                raise ValueError("Embedding quantization requires the onnx backend")
+            if quantization not in SUPPORTED_QUANTIZATIONS:
+                raise ValueError(
+                    f"Unsupported embedding quantization: {quantization}. Supported: {SUPPORTED_QUANTIZATIONS}"
+                )
         self.model_name = model_name
         self.cache_dir = cache_dir
+        self.backend = backend
+        self.quantization = quantization
+        self.onnx_dir = onnx_dir
+        self.cache = EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
         self.model = None
         self._initialize_model()
     
+    @property
+    def cache_key(self) -> str:
+        """Identity of the produced vectors: model, backend and quantization."""
+        return "|".join([self.model_name, self.backend, self.quantization or ""])
+    
     def _initialize_model(self) -> None:
         """Initialize the embedding model."""
-        logger.info("Initializing embedder", model=self.model_name, cache_dir=self.cache_dir)
+        logger.info("Initializing embedder", model=self.model_name, cache_dir=self.cache_dir,
+                   backend=self.backend, quantization=self.quantization)
         try:
-            self.model = SentenceTransformer(
-                self.model_name,
-                cache_folder=self.cache_dir
-            )
-            logger.info("Embedder initialized successfully", model=self.model_name)
+            if self.backend == "onnx":
+                self.model = self._load_onnx_model()
+            else:
+                self.model = SentenceTransformer(
+                    self.model_name,
+                    cache_folder=self.cache_dir
+                )
+            logger.info("Embedder initialized successfully", model=self.model_name, backend=self.backend)
         except Exception as e:
             logger.error("Failed to initialize embedder", error=str(e), model=self.model_name)
             raise
     
+    def _load_onnx_model(self) -> SentenceTransformer:
+        """Load the model on ONNX Runtime, exporting and quantizing it if needed.
+
+        Without quantization, sentence-transformers loads the repository's
+        ``onnx/model.onnx`` or exports one on the fly. With quantization, the
+        int8 model is exported once under ``onnx_dir`` and reused afterwards.
+        Requires ``optimum[onnxruntime]``.
+        """
+        if self.quantization is None:
+            return SentenceTransformer(
+                self.model_name,
+                cache_folder=self.cache_dir,
+                backend="onnx",
+                device="cpu"
+            )
+        
+        from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+        
+        export_dir = Path(self.onnx_dir) / self.model_name.replace("/", "__")
+        file_name = f"onnx/model_qint8_{self.quantization}.onnx"
+        if not (export_dir / file_name).exists():
+            logger.info("Exporting quantized ONNX model", model=self.model_name,
+                       quantization=self.quantization, export_dir=str(export_dir))
+            model = SentenceTransformer(
+                self.model_name,
+                cache_folder=self.cache_dir,
+                backend="onnx",
+                device="cpu"
+            )
+            model.save(str(export_dir))
+            export_dynamic_quantized_onnx_model(model, self.quantization, str(export_dir))
+        
+        return SentenceTransformer(
+            str(export_dir),
+            backend="onnx",
+            device="cpu",
+            model_kwargs={"file_name": file_name}
+        )
+    
     @debug_log_method
     def embed(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for texts.
@@ -46,16 +165,7 @@ class Embedder:
         Returns:
             List of embedding vectors
         """
-        if not texts:
-            return []
-
-        logger.debug("Generating embeddings", text_count=len(texts))
-        try:
-            embeddings = self.model.encode(texts, convert_to_numpy=False, show_progress_bar=False)
-            return [emb.tolist() if hasattr(emb, 'tolist') else list(emb) for emb in embeddings]
-        except Exception as e:
-            logger.error("Failed to generate embeddings", error=str(e))
-            raise
+        return self.embed_array(texts).tolist()
     
     def embed_batch(
         self,
@@ -71,21 +181,205 @@ class Embedder:
         Returns:
             List of embedding vectors
         """
-        if not texts:
-            return []
+        return self.embed_documents(texts, batch_size=batch_size).tolist()
+    
+    @debug_log_method
+    def embed_documents(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        workers: int = 1,
+        stats: Optional[Dict[str, int]] = None
+    ) -> np.ndarray:
+        """Embed corpus chunks, reusing cached embeddings of unchanged texts.
+
+        Texts found in the persistent embedding cache are not re-embedded;
+        the rest are embedded (with worker processes if ``workers > 1``) and
+        added to the cache.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Batch size for processing
+            workers: Number of worker processes
+            stats: Optional dict receiving ``cache_hits`` and ``cache_misses``
+
+        Returns:
+            C-contiguous float32 array of shape (len(texts), dimension)
+        """
+        if stats is not None:
+            stats.update(cache_hits=0, cache_misses=0)
+        return self._embed_cached(
+            texts, lambda missing: self.embed_parallel(missing, workers=workers, batch_size=batch_size), stats
+        )
+    
+    def iter_embed_documents(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        workers: int = 1,
+        slice_size: int = 1024,
+        stats: Optional[Dict[str, int]] = None
+    ) -> Iterator[np.ndarray]:
+        """Embed corpus chunks slice by slice, like ``embed_documents``.
+
+        Only one slice of embeddings is held at a time, so callers can write
+        each slice to the vector DB before the next is computed. With
+        ``workers > 1`` the process pool is started once for all slices.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Batch size for processing
+            workers: Number of worker processes
+            slice_size: Texts per yielded slice
+            stats: Optional dict receiving ``cache_hits`` and ``cache_misses`` (summed over slices)
+
+        Yields:
+            Float32 arrays with the embeddings of consecutive slices of ``texts``
+        """
+        slice_size = max(1, slice_size)
+        if stats is not None:
+            stats.update(cache_hits=0, cache_misses=0)
+        pool = None
+        if workers > 1 and len(texts) >= workers * batch_size:
+            pool = self._start_pool(workers)
+        try:
+            for start in range(0, len(texts), slice_size):
+                yield self._embed_cached(
+                    texts[start:start + slice_size],
+                    lambda missing: self._encode(missing, batch_size, pool),
+                    stats
+                )
+        finally:
+            if pool is not None:
+                self.model.stop_multi_process_pool(pool)
+    
+    def _embed_cached(
+        self,
+        texts: List[str],
+        compute: Callable[[List[str]], np.ndarray],
+        stats: Optional[Dict[str, int]]
+    ) -> np.ndarray:
+        """Serve texts from the embedding cache and ``compute`` the rest."""
+        if self.cache is None or not texts:
+            missing = list(range(len(texts)))
+            cached = []
+        else:
+            cached = self.cache.get_many(self.cache_key, texts, self.dimension)
+            missing = [i for i, vector in enumerate(cached) if vector is None]
+            logger.debug("Embedding cache lookup", text_count=len(texts), misses=len(missing))
+        if stats is not None:
+            stats["cache_hits"] += len(texts) - len(missing)
+            stats["cache_misses"] += len(missing)
+        
+        if len(missing) == len(texts):
+            embeddings = compute(texts)
+            if self.cache is not None and texts:
+                self.cache.put_many(self.cache_key, texts, embeddings)
+            return embeddings
         
-        logger.debug("Generating embeddings in batches", text_count=len(texts), batch_size=batch_size)
-        all_embeddings = []
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                embeddings[i] = vector
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = compute(missing_texts)
+            embeddings[missing] = computed
+            self.cache.put_many(self.cache_key, missing_texts, computed)
+        return embeddings
+    
+    @debug_log_method
+    def embed_array(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Generate embeddings as one float32 matrix.
+
+        The array-native path: sentence-transformers batches internally and
+        its output is returned without converting each vector to Python
+        floats. Rows can be passed to vector DB providers as they are.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Batch size for processing
+
+        Returns:
+            C-contiguous float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        logger.debug("Generating embeddings", text_count=len(texts), batch_size=batch_size)
+        try:
+            embeddings = self.model.encode(
+                texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+            )
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
+        except Exception as e:
+            logger.error("Failed to generate embeddings", error=str(e))
+            raise
+    
+    @debug_log_method
+    def embed_parallel(self, texts: List[str], workers: int, batch_size: int = 32) -> np.ndarray:
+        """Generate embeddings with a pool of CPU worker processes.
+
+        Uses sentence-transformers' multi-process pool: each worker receives
+        the model once, then encodes chunks of the input. Torch threads are
+        split between workers to avoid oversubscribing cores. Falls back to
+        ``embed_array`` when there is too little work to amortize starting
+        the pool.
+
+        Args:
+            texts: List of texts to embed
+            workers: Number of worker processes
+            batch_size: Batch size within each worker
+
+        Returns:
+            C-contiguous float32 array of shape (len(texts), dimension)
+        """
+        if workers <= 1 or len(texts) < workers * batch_size:
+            return self.embed_array(texts, batch_size=batch_size)
+
+        pool = self._start_pool(workers)
+        try:
+            return self._encode(texts, batch_size, pool)
+        finally:
+            self.model.stop_multi_process_pool(pool)
+    
+    def _start_pool(self, workers: int) -> Dict[str, Any]:
+        """Start a multi-process pool of CPU workers."""
+        logger.info("Starting embedding worker processes", workers=workers)
+        # Workers are spawned processes and read the thread count at import
+        threads = str(max(1, (os.cpu_count() or workers) // workers))
+        previous = os.environ.get("OMP_NUM_THREADS")
+        os.environ["OMP_NUM_THREADS"] = threads
+        try:
+            return self.model.start_multi_process_pool(target_devices=["cpu"] * workers)
+        finally:
+            if previous is None:
+                os.environ.pop("OMP_NUM_THREADS", None)
+            else:
+                os.environ["OMP_NUM_THREADS"] = previous
+    
+    def _encode(self, texts: List[str], batch_size: int, pool: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Embed texts in-process, or on the worker pool if one is given."""
+        if pool is None or not texts:
+            return self.embed_array(texts, batch_size=batch_size)
         
+        workers = len(pool["processes"])
+        logger.debug("Generating embeddings with worker processes",
+                    text_count=len(texts), workers=workers, batch_size=batch_size)
         try:
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                embeddings = self.model.encode(batch, convert_to_numpy=False, show_progress_bar=False)
-                batch_embeddings = [emb.tolist() if hasattr(emb, 'tolist') else list(emb) for emb in embeddings]
-                all_embeddings.extend(batch_embeddings)
-            return all_embeddings
+            # Several chunks per worker keep them busy until the end
+            chunk_size = max(batch_size, math.ceil(len(texts) / (workers * 4)))
+            embeddings = self.model.encode(
+                texts,
+                pool=pool,
+                batch_size=batch_size,
+                chunk_size=chunk_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
         except Exception as e:
-            logger.error("Failed to generate batch embeddings", error=str(e))
+            logger.error("Failed to generate embeddings with worker processes", error=str(e))
             raise
     
     @property
@@ -95,4 +389,9 @@ class Embedder:
             # Default dimension for all-MiniLM-L6-v2
             return 384
         return self.model.get_sentence_embedding_dimension()
+    
+    @property
+    def max_seq_length(self) -> int:
+        """Get maximum input length in tokens (256 when the model does not say)."""
+        return getattr(self.model, "max_seq_length", None) or 256
 
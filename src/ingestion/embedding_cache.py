@@ -0,0 +1,121 @@
+"""Persistent content-addressed cache of chunk embeddings."""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# SQLite's default limit on host parameters is 999
+_LOOKUP_BATCH = 500
+
+
+def text_hash(text: str) -> bytes:
+    """SHA-256 digest of a text, the content address of its embedding."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """SQLite key/value store of embeddings keyed by (model, text hash).
+
+    Re-ingesting a corpus after changing BM25 settings or chunking re-creates
+    many identical chunk texts; their embeddings are read back from here
+    instead of running the model again. Values are raw float32 bytes, so a
+    lookup costs one indexed read and a ``np.frombuffer``. The model key
+    should identify everything that changes the vectors (name, backend,
+    quantization).
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the cache file.
+
+        Args:
+            path: Path of the SQLite database
+        """
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, "
+            "text_hash BLOB NOT NULL, "
+            "embedding BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash)"
+            ") WITHOUT ROWID"
+        )
+        self._connection.commit()
+        self.hits = 0
+        self.misses = 0
+        logger.info("Embedding cache opened", path=path)
+
+    def get_many(self, model: str, texts: List[str], dimension: int) -> List[Optional[np.ndarray]]:
+        """Look up embeddings of texts.
+
+        Args:
+            model: Model key
+            texts: Texts to look up
+            dimension: Expected embedding dimension (other sizes count as misses)
+
+        Returns:
+            One float32 vector per text, or None where the text is not cached
+        """
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), _LOOKUP_BATCH):
+                batch = unique[start:start + _LOOKUP_BATCH]
+                rows = self._connection.execute(
+                    f"SELECT text_hash, embedding FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch]
+                ).fetchall()
+                found.update(rows)
+
+        results: List[Optional[np.ndarray]] = []
+        for digest in hashes:
+            blob = found.get(digest)
+            vector = np.frombuffer(blob, dtype=np.float32) if blob is not None else None
+            results.append(vector if vector is not None and vector.shape[0] == dimension else None)
+
+        hits = sum(vector is not None for vector in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model: str, texts: List[str], embeddings: np.ndarray) -> None:
+        """Store embeddings of texts in one transaction.
+
+        Args:
+            model: Model key
+            texts: Embedded texts
+            embeddings: Float32 array with one row per text
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        rows = [
+            (model, text_hash(text), embeddings[i].tobytes())
+            for i, text in enumerate(texts)
+        ]
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, embedding) VALUES (?, ?, ?)",
+                    rows
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+        logger.info("Embedding cache closed", path=self.path, hits=self.hits, misses=self.misses)
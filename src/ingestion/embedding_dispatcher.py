@@ -0,0 +1,212 @@
+"""Micro-batching dispatcher that coalesces concurrent embedding requests."""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+import numpy as np
+from .embedder import Embedder
+from ..utils.logging import get_logger
+from ..utils.debug_logging import debug_log_method
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+@dataclass
+class _EmbeddingRequest:
+    """Texts of one caller and the future its embeddings are delivered to."""
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+
+
+class EmbeddingDispatcher:
+    """Coalesce concurrent embedding requests into batched model calls.
+
+    Callers on any thread (``embed_array``) or event loop
+    (``embed_array_async``) enqueue their texts; a single worker thread takes
+    the first waiting request, collects further requests for up to
+    ``max_wait_ms`` or until ``max_batch_size`` texts are gathered, embeds
+    them with one ``Embedder.embed_array`` call and hands each caller its
+    rows. The dispatcher exposes the embedding interface used by
+    ``VectorRetriever``, so it can wrap an ``Embedder`` transparently.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS
+    ):
+        """Initialize dispatcher.
+
+        Args:
+            embedder: Embedder that computes the batched embeddings
+            max_batch_size: Maximum texts per model call (a single larger request is not split)
+            max_wait_ms: How long the first request of a batch waits for company
+        """
+        self.embedder = embedder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Optional[_EmbeddingRequest]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batch_count = 0
+        self.request_count = 0
+        self.text_count = 0
+
+    @property
+    def model_name(self) -> str:
+        """Name of the wrapped embedding model."""
+        return self.embedder.model_name
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension of the wrapped model."""
+        return self.embedder.dimension
+
+    def submit(self, texts: List[str]) -> Future:
+        """Enqueue texts for embedding.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Future resolving to a float32 array with one row per text
+
+        Raises:
+            RuntimeError: If the dispatcher is closed
+        """
+        request = _EmbeddingRequest(list(texts))
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Embedding dispatcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-dispatcher", daemon=True
+                )
+                self._worker.start()
+            self._queue.put(request)
+        return request.future
+
+    @debug_log_method
+    def embed_array(self, texts: List[str], batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> np.ndarray:
+        """Generate embeddings, batched with concurrent callers.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Accepted for interface compatibility; batching is set by ``max_batch_size``
+
+        Returns:
+            Float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return self.submit(texts).result()
+
+    async def embed_array_async(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings from a coroutine without blocking the event loop.
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            Float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings as lists (compatibility with ``Embedder.embed``).
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        return self.embed_array(texts).tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get batching counters.
+
+        Returns:
+            Dictionary with request, batch and text counts and the mean batch size
+        """
+        return {
+            "requests": self.request_count,
+            "batches": self.batch_count,
+            "texts": self.text_count,
+            "mean_batch_size": self.text_count / self.batch_count if self.batch_count else 0.0,
+        }
+
+    def close(self) -> None:
+        """Finish queued requests and stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            self._queue.put(None)
+        if worker is not None:
+            worker.join()
+        logger.info("Embedding dispatcher closed", **self.stats())
+
+    def _run(self) -> None:
+        """Worker loop: gather requests into batches and embed them."""
+        carry: Optional[_EmbeddingRequest] = None
+        stopping = False
+        while not stopping:
+            request = carry if carry is not None else self._queue.get()
+            carry = None
+            if request is None:
+                break
+
+            batch = [request]
+            size = len(request.texts)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    following = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if following is None:
+                    stopping = True
+                    break
+                if size + len(following.texts) > self.max_batch_size:
+                    # Starts the next batch
+                    carry = following
+                    break
+                batch.append(following)
+                size += len(following.texts)
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[_EmbeddingRequest]) -> None:
+        """Embed one batch and resolve each request's future with its rows."""
+        texts = [text for request in batch for text in request.texts]
+        try:
+            embeddings = self.embedder.embed_array(texts, batch_size=self.max_batch_size)
+        except Exception as e:
+            logger.error("Batched embedding failed", error=str(e), batch_size=len(texts))
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        self.batch_count += 1
+        self.request_count += len(batch)
+        self.text_count += len(texts)
+        logger.debug("Embedding batch dispatched", requests=len(batch), texts=len(texts))
+
+        offset = 0
+        for request in batch:
+            request.future.set_result(embeddings[offset:offset + len(request.texts)])
+            offset += len(request.texts)
@@ -3,6 +3,7 @@
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 import json
+import os
 from pathlib import Path
 from ..utils.logging import get_logger
 from ..utils.debug_logging import debug_log_method
@@ -46,9 +47,11 @@ class MetadataStore:
         # Convert chunks to dict format
         metadata_dict = {chunk.chunk_id: asdict(chunk) for chunk in chunks}
         
-        # Save as JSON
-        with open(path, "w") as f:
+        # Save as JSON through a temporary file, so readers never see a partial file
+        temp_path = path_obj.with_name(path_obj.name + ".tmp")
+        with open(temp_path, "w") as f:
             json.dump(metadata_dict, f, indent=2)
+        os.replace(temp_path, path_obj)
         
         logger.info("Chunk metadata saved successfully", path=path, chunk_count=len(chunks))
     
@@ -1,13 +1,15 @@
 """Ingestion pipeline orchestrator."""
 
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, replace
+from typing import Dict, Any, Optional, List, Iterator
 import time
 from pathlib import Path
 from .chunker import Chunker, Chunk
 from .bm25_indexer import BM25Indexer
-from .embedder import Embedder
+from .embedder import Embedder, adaptive_batch_size
 from .metadata_store import MetadataStore, ChunkMetadata
+from ..rag.bm25_retriever import BM25Retriever
+from ..rag.bm25_engine import resolve_bm25_index_path
 from ..rag.vector_db.base import BaseVectorDB, VectorDocument
 from ..utils.logging import get_logger
 from ..utils.debug_logging import debug_log_method
@@ -37,7 +39,10 @@ class IngestionPipeline:
         bm25_indexer: BM25Indexer,
         embedder: Embedder,
         vector_db: BaseVectorDB,
-        metadata_store: MetadataStore
+        metadata_store: MetadataStore,
+        embedding_workers: int = 1,
+        embedding_batch_size: Optional[int] = None,
+        embedding_stream_size: int = 1024
     ):
         """Initialize pipeline with components.
         
@@ -47,12 +52,20 @@ class IngestionPipeline:
             embedder: Embedder instance
             vector_db: Vector DB instance
             metadata_store: MetadataStore instance
+            embedding_workers: Embedding worker processes (1 embeds in-process)
+            embedding_batch_size: Embedding batch size (None adapts it to chunk length)
+            embedding_stream_size: Chunks embedded per slice handed to the vector DB
         """
         self.chunker = chunker
         self.bm25_indexer = bm25_indexer
         self.embedder = embedder
         self.vector_db = vector_db
         self.metadata_store = metadata_store
+        self.embedding_workers = max(1, embedding_workers)
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_stream_size = max(1, embedding_stream_size)
+        # Throughput of the last embedding stage, reported in statistics
+        self._embedding_stats: Dict[str, Any] = {}
 
     @debug_log_method
     def ingest(
@@ -88,28 +101,8 @@ class IngestionPipeline:
         indices_base = Path(indices_dir) if indices_dir else Path("data/indices")
         indices_base.mkdir(parents=True, exist_ok=True)
         
-        # 1. Load corpus text
-        corpus_path_obj = Path(corpus_path)
-        if not corpus_path_obj.exists():
-            raise FileNotFoundError(f"Corpus file not found: {corpus_path}")
-        
-        with open(corpus_path, "r", encoding="utf-8") as f:
-            corpus_text = f.read()
-        
-        logger.info("Corpus loaded", path=corpus_path, text_length=len(corpus_text))
-        
-        # 2. Chunk text
-        chunks = self.chunker.chunk(
-            text=corpus_text,
-            strategy="sliding_window",
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
-        
-        logger.info("Text chunked", chunk_count=len(chunks))
-        
-        if not chunks:
-            raise ValueError("No chunks generated from corpus text")
+        # 1-2. Load and chunk corpus text
+        chunks = self._load_chunks(corpus_path, chunk_size, chunk_overlap)
         
         # 3. Build BM25 index
         chunk_texts = [chunk.text for chunk in chunks]
@@ -117,7 +110,7 @@ class IngestionPipeline:
 
         # Save BM25 index - use explicit path if provided, otherwise use collection-suffixed name
         if not bm25_index_path:
-            bm25_index_path = str(indices_base / f"bm25_index_{collection_name}.pkl")
+            bm25_index_path = str(indices_base / f"bm25_index_{collection_name}.bm25")
         else:
             # Ensure parent directory exists for explicit path
             Path(bm25_index_path).parent.mkdir(parents=True, exist_ok=True)
@@ -125,53 +118,16 @@ class IngestionPipeline:
         self.bm25_indexer.save_index(bm25_index, bm25_index_path)
         logger.info("BM25 index built and saved", path=bm25_index_path)
         
-        # 4. Generate embeddings
-        embeddings = self.embedder.embed_batch(chunk_texts, batch_size=32)
-        logger.info("Embeddings generated", count=len(embeddings))
-        
-        # 5. Store in vector DB
-        # Create collection if it doesn't exist or overwrite is True
+        # 4-5. Generate embeddings and store in vector DB
+        # Delete the existing collection if overwrite is True
         if overwrite and self.vector_db.collection_exists(collection_name):
             self.vector_db.delete_collection(collection_name)
             logger.info("Existing collection deleted", collection=collection_name)
         
-        if not self.vector_db.collection_exists(collection_name):
-            self.vector_db.create_collection(
-                collection_name=collection_name,
-                embedding_dimension=self.embedder.dimension
-            )
-            logger.info("Collection created", collection=collection_name)
-        
-        # Prepare documents for vector DB
-        vector_documents = []
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            vector_documents.append(VectorDocument(
-                id=chunk.id,
-                text=chunk.text,
-                embedding=embedding,
-                metadata={
-                    "start_pos": chunk.start_pos,
-                    "end_pos": chunk.end_pos,
-                    **chunk.metadata
-                }
-            ))
-        
-        # Add documents to vector DB
-        self.vector_db.add_documents(collection_name, vector_documents)
-        logger.info("Documents added to vector DB", collection=collection_name, count=len(vector_documents))
+        self._store_vectors(chunks, collection_name)
         
         # 6. Save metadata
-        chunk_metadata_list = []
-        for i, chunk in enumerate(chunks):
-            chunk_metadata_list.append(ChunkMetadata(
-                chunk_id=chunk.id,
-                text=chunk.text,
-                start_pos=chunk.start_pos,
-                end_pos=chunk.end_pos,
-                chunk_index=i,
-                source=corpus_path,
-                additional_metadata=chunk.metadata
-            ))
+        chunk_metadata_list = self._build_chunk_metadata(chunks, corpus_path, start_index=0)
 
         # Save metadata - use explicit path if provided, otherwise use collection-suffixed name
         if not metadata_path:
@@ -186,17 +142,6 @@ class IngestionPipeline:
         # 7. Validate and report statistics
         duration = time.time() - start_time
         
-        # Get collection stats
-        collection_stats = self.vector_db.get_collection_stats(collection_name)
-        
-        statistics = {
-            "avg_chunk_size": sum(len(c.text) for c in chunks) / len(chunks) if chunks else 0,
-            "min_chunk_size": min((len(c.text) for c in chunks), default=0),
-            "max_chunk_size": max((len(c.text) for c in chunks), default=0),
-            "vector_db_count": collection_stats.get("count", 0),
-            "embedding_dimension": self.embedder.dimension
-        }
-        
         logger.info("Ingestion pipeline completed", 
                    duration=duration, 
                    total_chunks=len(chunks),
@@ -210,6 +155,271 @@ class IngestionPipeline:
             embedding_model=self.embedder.model_name,
             embedding_dimension=self.embedder.dimension,
             duration_seconds=duration,
-            statistics=statistics
+            statistics=self._statistics(chunks, collection_name)
+        )
+    
+    @debug_log_method
+    def append(
+        self,
+        corpus_path: str,
+        collection_name: str = "corpus_embeddings",
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        indices_dir: Optional[str] = None,
+        bm25_index_path: Optional[str] = None,
+        metadata_path: Optional[str] = None,
+        bm25_retriever: Optional[BM25Retriever] = None
+    ) -> IngestionResult:
+        """Add a new corpus to existing indices without re-ingesting.
+
+        New chunks continue the existing chunk numbering. The vectors are
+        embedded and written first; only then are the BM25 index (extended
+        with a new segment and saved merged) and the metadata file replaced,
+        so a failed embedding leaves both files matching each other.
+
+        Args:
+            corpus_path: Path to the new corpus text file
+            collection_name: Name of vector DB collection
+            chunk_size: Target chunk size
+            chunk_overlap: Overlap between chunks
+            indices_dir: Optional directory for storing indices (defaults to "data/indices")
+            bm25_index_path: Optional explicit path for BM25 index (overrides default naming)
+            metadata_path: Optional explicit path for metadata (overrides default naming)
+            bm25_retriever: Optional live retriever to update without reloading
+
+        Returns:
+            IngestionResult for the appended chunks
+        """
+        start_time = time.time()
+        logger.info("Starting append ingestion", corpus_path=corpus_path, collection=collection_name)
+
+        indices_base = Path(indices_dir) if indices_dir else Path("data/indices")
+        if not bm25_index_path:
+            bm25_index_path = str(indices_base / f"bm25_index_{collection_name}.bm25")
+        if not metadata_path:
+            metadata_path = str(indices_base / f"chunks_{collection_name}.json")
+
+        existing_metadata = sorted(
+            self.metadata_store.load_metadata(metadata_path).values(),
+            key=lambda m: m.chunk_index
+        )
+        # A legacy .pkl index is read and saved back under the new name
+        bm25_index = self.bm25_indexer.load_index(resolve_bm25_index_path(bm25_index_path))
+        start_index = bm25_index.corpus_size
+        if existing_metadata and existing_metadata[-1].chunk_index != start_index - 1:
+            raise ValueError("Chunk metadata does not match the BM25 index; re-run full ingestion")
+
+        # Continue chunk ids after the existing ones so ids stay unique
+        chunks = [
+            replace(chunk, id=f"chunk_{start_index + i}")
+            for i, chunk in enumerate(self._load_chunks(corpus_path, chunk_size, chunk_overlap))
+        ]
+
+        self._store_vectors(chunks, collection_name)
+
+        # Both files are written to a temporary path and renamed into place
+        appended_index = self.bm25_indexer.append_to_index(bm25_index, [chunk.text for chunk in chunks])
+        self.bm25_indexer.save_index(appended_index, bm25_index_path)
+        logger.info("BM25 index appended and saved", path=bm25_index_path)
+
+        new_metadata = self._build_chunk_metadata(chunks, corpus_path, start_index=start_index)
+        self.metadata_store.save_metadata(existing_metadata + new_metadata, metadata_path)
+        logger.info("Metadata saved", path=metadata_path)
+
+        if bm25_retriever is not None and bm25_retriever.index is not None:
+            bm25_retriever.add_chunks(new_metadata)
+
+        duration = time.time() - start_time
+        logger.info("Append ingestion completed",
+                   duration=duration,
+                   appended_chunks=len(chunks),
+                   total_chunks=start_index + len(chunks),
+                   collection=collection_name)
+
+        return IngestionResult(
+            total_chunks=len(chunks),
+            bm25_index_path=bm25_index_path,
+            vector_db_collection=collection_name,
+            metadata_path=metadata_path,
+            embedding_model=self.embedder.model_name,
+            embedding_dimension=self.embedder.dimension,
+            duration_seconds=duration,
+            statistics=self._statistics(chunks, collection_name)
+        )
+    
+    def _load_chunks(self, corpus_path: str, chunk_size: int, chunk_overlap: int) -> List[Chunk]:
+        """Load a corpus file and split it into chunks.
+
+        Args:
+            corpus_path: Path to corpus text file
+            chunk_size: Target chunk size
+            chunk_overlap: Overlap between chunks
+
+        Returns:
+            List of chunks
+        """
+        corpus_path_obj = Path(corpus_path)
+        if not corpus_path_obj.exists():
+            raise FileNotFoundError(f"Corpus file not found: {corpus_path}")
+        
+        with open(corpus_path, "r", encoding="utf-8") as f:
+            corpus_text = f.read()
+        
+        logger.info("Corpus loaded", path=corpus_path, text_length=len(corpus_text))
+        
+        chunks = self.chunker.chunk(
+            text=corpus_text,
+            strategy="sliding_window",
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+        
+        logger.info("Text chunked", chunk_count=len(chunks))
+        
+        if not chunks:
+            raise ValueError("No chunks generated from corpus text")
+        return chunks
+    
+    def _store_vectors(self, chunks: List[Chunk], collection_name: str) -> None:
+        """Embed chunks and stream them into the vector DB collection.
+
+        Embeddings are produced slice by slice and written while the next
+        slice is embedded, so only a few slices are held in memory.
+
+        Args:
+            chunks: Chunks to store
+            collection_name: Name of vector DB collection (created if missing)
+        """
+        chunk_texts = [chunk.text for chunk in chunks]
+        batch_size = self.embedding_batch_size or adaptive_batch_size(
+            chunk_texts, self.embedder.max_seq_length
+        )
+        
+        if not self.vector_db.collection_exists(collection_name):
+            self.vector_db.create_collection(
+                collection_name=collection_name,
+                embedding_dimension=self.embedder.dimension
+            )
+            logger.info("Collection created", collection=collection_name)
+        
+        # Chunks whose text is in the embedding cache are not re-embedded
+        cache_stats: Dict[str, int] = {}
+        timing = {"embedding_seconds": 0.0}
+        start_time = time.perf_counter()
+        self.vector_db.add_documents(
+            collection_name,
+            self._vector_documents(chunks, batch_size, cache_stats, timing)
+        )
+        total_seconds = time.perf_counter() - start_time
+        elapsed = timing["embedding_seconds"]
+        
+        self._embedding_stats = {
+            "embedding_seconds": elapsed,
+            "embedding_chunks_per_second": len(chunk_texts) / elapsed if elapsed > 0 else 0.0,
+            "embedding_workers": self.embedding_workers,
+            "embedding_batch_size": batch_size,
+            "embedding_cache_hits": cache_stats.get("cache_hits", 0),
+            "embedding_cache_misses": cache_stats.get("cache_misses", len(chunk_texts)),
+        }
+        logger.info("Documents added to vector DB",
+                   collection=collection_name,
+                   count=len(chunks),
+                   store_seconds=total_seconds,
+                   **self._embedding_stats)
+
+    def _vector_documents(
+        self,
+        chunks: List[Chunk],
+        batch_size: int,
+        cache_stats: Dict[str, int],
+        timing: Dict[str, float]
+    ) -> Iterator[VectorDocument]:
+        """Yield vector documents as their embeddings are produced.
+
+        Args:
+            chunks: Chunks to embed
+            batch_size: Embedding batch size
+            cache_stats: Receives embedding cache hit/miss counts
+            timing: Receives the time spent embedding under ``embedding_seconds``
+
+        Yields:
+            One VectorDocument per chunk, in chunk order
+        """
+        slices = self.embedder.iter_embed_documents(
+            [chunk.text for chunk in chunks],
+            batch_size=batch_size,
+            workers=self.embedding_workers,
+            slice_size=self.embedding_stream_size,
+            stats=cache_stats
         )
+        offset = 0
+        while True:
+            start_time = time.perf_counter()
+            embeddings = next(slices, None)
+            timing["embedding_seconds"] += time.perf_counter() - start_time
+            if embeddings is None:
+                return
+            # Rows of the slice's float32 matrix are handed over as views
+            for chunk, embedding in zip(chunks[offset:offset + len(embeddings)], embeddings):
+                yield VectorDocument(
+                    id=chunk.id,
+                    text=chunk.text,
+                    embedding=embedding,
+                    metadata={
+                        "start_pos": chunk.start_pos,
+                        "end_pos": chunk.end_pos,
+                        **chunk.metadata
+                    }
+                )
+            offset += len(embeddings)
+    
+    def _build_chunk_metadata(
+        self,
+        chunks: List[Chunk],
+        source: str,
+        start_index: int
+    ) -> List[ChunkMetadata]:
+        """Create chunk metadata aligned with BM25 document ids.
+
+        Args:
+            chunks: Chunks in index order
+            source: Corpus path recorded as the chunk source
+            start_index: chunk_index of the first chunk
+
+        Returns:
+            List of chunk metadata
+        """
+        return [
+            ChunkMetadata(
+                chunk_id=chunk.id,
+                text=chunk.text,
+                start_pos=chunk.start_pos,
+                end_pos=chunk.end_pos,
+                chunk_index=start_index + i,
+                source=source,
+                additional_metadata=chunk.metadata
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+    
+    def _statistics(self, chunks: List[Chunk], collection_name: str) -> Dict[str, Any]:
+        """Summarize chunk sizes and the vector collection.
+
+        Args:
+            chunks: Ingested chunks
+            collection_name: Name of vector DB collection
+
+        Returns:
+            Statistics dictionary
+        """
+        collection_stats = self.vector_db.get_collection_stats(collection_name)
+        
+        return {
+            "avg_chunk_size": sum(len(c.text) for c in chunks) / len(chunks) if chunks else 0,
+            "min_chunk_size": min((len(c.text) for c in chunks), default=0),
+            "max_chunk_size": max((len(c.text) for c in chunks), default=0),
+            "vector_db_count": collection_stats.get("count", 0),
+            "embedding_dimension": self.embedder.dimension,
+            **self._embedding_stats
+        }
 
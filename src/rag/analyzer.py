@@ -0,0 +1,180 @@
+"""Text analysis shared by BM25 indexing and querying."""
+
+from typing import List, Dict, Any, Optional, Iterable, Callable
+import re
+import unicodedata
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Letters and digits; punctuation and underscores separate tokens
+DEFAULT_TOKEN_PATTERN = r"[^\W_]+"
+
+# Compact English stopword list (function words only)
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves s t
+""".split())
+
+# Record separator used to fold a whole batch with one normalization call
+_BATCH_SEPARATOR = "\x1e"
+
+
+class Analyzer:
+    """Turn text into BM25 terms.
+
+    The pipeline is: Unicode folding (NFKD, accents stripped, casefold),
+    regex tokenization, optional stopword removal and optional Porter
+    stemming. The regex is compiled once per analyzer and stems are cached,
+    so analysis cost is dominated by the C-level regex scan.
+
+    ``to_config`` / ``from_config`` round-trip the settings; the config is
+    stored inside the BM25 index so queries are always analyzed exactly like
+    the chunks were at ingestion time.
+    """
+
+    def __init__(
+        self,
+        tokenizer: str = "regex",
+        pattern: str = DEFAULT_TOKEN_PATTERN,
+        fold_unicode: bool = True,
+        lowercase: bool = True,
+        stopwords: Optional[Iterable[str]] = None,
+        stemming: bool = False
+    ):
+        """Initialize analyzer.
+
+        Args:
+            tokenizer: "regex" for pattern tokenization, "whitespace" for str.split()
+            pattern: Token regex (regex tokenizer only)
+            fold_unicode: Strip accents and apply compatibility normalization
+            lowercase: Lowercase terms (casefold when folding Unicode)
+            stopwords: Terms to drop; "english" selects the built-in list
+            stemming: Apply the Porter stemmer to every term
+        """
+        if tokenizer not in ("regex", "whitespace"):
+            raise ValueError(f"Unsupported tokenizer: {tokenizer}")
+
+        self.tokenizer = tokenizer
+        self.pattern = pattern
+        self.fold_unicode = fold_unicode
+        self.lowercase = lowercase
+        self.stemming = stemming
+
+        if stopwords == "english":
+            self.stopwords_name: Optional[str] = "english"
+            self.stopwords = ENGLISH_STOPWORDS
+        elif stopwords:
+            self.stopwords_name = None
+            self.stopwords = frozenset(self._fold(word) for word in stopwords)
+        else:
+            self.stopwords_name = None
+            self.stopwords = frozenset()
+
+        if tokenizer == "regex":
+            self._split: Callable[[str], List[str]] = re.compile(pattern).findall
+        else:
+            self._split = str.split
+
+        self._stem_cache: Dict[str, str] = {}
+        self._stem: Optional[Callable[[str], str]] = None
+        if stemming:
+            from nltk.stem import PorterStemmer
+            self._stem = PorterStemmer().stem
+
+    @classmethod
+    def whitespace(cls) -> "Analyzer":
+        """Analyzer equivalent to the original ``text.lower().split()``.
+
+        Used for indices built before analyzers existed.
+        """
+        return cls(tokenizer="whitespace", fold_unicode=False)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "Analyzer":
+        """Create analyzer from a config dictionary.
+
+        Args:
+            config: Analyzer settings (keys of ``__init__``); None for defaults
+
+        Returns:
+            Analyzer instance
+        """
+        return cls(**(config or {}))
+
+    def to_config(self) -> Dict[str, Any]:
+        """Serialize settings so the analyzer can be persisted with an index."""
+        return {
+            "tokenizer": self.tokenizer,
+            "pattern": self.pattern,
+            "fold_unicode": self.fold_unicode,
+            "lowercase": self.lowercase,
+            "stopwords": self.stopwords_name or sorted(self.stopwords),
+            "stemming": self.stemming,
+        }
+
+    def _fold(self, text: str) -> str:
+        """Apply Unicode folding and case normalization."""
+        if self.fold_unicode:
+            text = unicodedata.normalize("NFKD", text)
+            if not text.isascii():
+                text = "".join(ch for ch in text if not unicodedata.combining(ch))
+            return text.casefold() if self.lowercase else text
+        return text.lower() if self.lowercase else text
+
+    def _filter_terms(self, tokens: List[str]) -> List[str]:
+        """Remove stopwords and stem the remaining tokens."""
+        if self.stopwords:
+            stopwords = self.stopwords
+            tokens = [token for token in tokens if token not in stopwords]
+        if self._stem is not None:
+            cache = self._stem_cache
+            stem = self._stem
+            terms = []
+            for token in tokens:
+                term = cache.get(token)
+                if term is None:
+                    term = cache[token] = stem(token)
+                terms.append(term)
+            tokens = terms
+        return tokens
+
+    def analyze(self, text: str) -> List[str]:
+        """Analyze a single text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of terms
+        """
+        return self._filter_terms(self._split(self._fold(text)))
+
+    def analyze_batch(self, texts: List[str]) -> List[List[str]]:
+        """Analyze many texts at once (ingestion fast path).
+
+        Folding runs once over the joined batch instead of once per text,
+        and the precompiled tokenizer is reused for every text.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List of term lists, one per text
+        """
+        if not texts:
+            return []
+
+        folded = self._fold(_BATCH_SEPARATOR.join(texts)).split(_BATCH_SEPARATOR)
+        if len(folded) != len(texts):
+            # A text contained the separator itself; fall back to per-text folding
+            folded = [self._fold(text) for text in texts]
+
+        split = self._split
+        filter_terms = self._filter_terms
+        return [filter_terms(split(text)) for text in folded]
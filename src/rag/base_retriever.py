@@ -23,6 +23,28 @@ class BaseRetriever(ABC):
         """
         pass
     
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[RetrievalResult]]:
+        """
+        Retrieve relevant chunks for several queries.
+        
+        The default runs ``retrieve`` per query; retrievers that can share
+        work across queries override it.
+        
+        Args:
+            queries: Search query strings
+            top_k: Number of results to return per query
+            filters: Optional filters applied to every query
+            
+        Returns:
+            One list of RetrievalResult objects per query
+        """
+        return [self.retrieve(query, top_k, filters) for query in queries]
+    
     @abstractmethod
     def retrieve_with_scores(self, query: str, top_k: int = 10) -> List[RetrievalResult]:
         """
@@ -0,0 +1,531 @@
+"""Compressed BM25 postings: varint doc ids and 8-bit quantized impacts."""
+
+from typing import List, Dict, Tuple, Optional
+import numpy as np
+from .analyzer import Analyzer
+from .bm25_engine import (
+    BM25Engine,
+    count_phrase_matches,
+    sum_contributions,
+    top_k_order,
+    write_index_file,
+    read_index_file,
+    encode_vocabulary,
+    decode_vocabulary,
+    vocabulary_nbytes,
+)
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Quantization levels of the per-posting impacts (uint8)
+IMPACT_LEVELS = 255
+
+
+class CompressedBM25Engine:
+    """Read-mostly BM25 index with compressed postings.
+
+    Each posting list stores document ids as delta + varint bytes and the
+    BM25 term-frequency factor ``tf * (k1 + 1) / (tf + norm)`` quantized to
+    8 bits against the list's maximum. A per-term scale (IDF times that
+    maximum) turns the quantized values back into contributions, so scoring
+    never materializes float postings. Lists are decoded with vectorized
+    NumPy operations when a query touches them.
+
+    Term frequencies are kept as varints so ``decompress`` reproduces the
+    exact ``BM25Engine`` (needed for appends). Scores differ from the exact
+    engine by at most half a quantization step per query term. Token
+    positions, when stored, are delta + varint coded within each posting.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        doc_id_offsets: np.ndarray,
+        doc_id_bytes: np.ndarray,
+        term_freq_offsets: np.ndarray,
+        term_freq_bytes: np.ndarray,
+        impacts: np.ndarray,
+        impact_scales: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        analyzer: Optional[Analyzer] = None,
+        position_offsets: Optional[np.ndarray] = None,
+        position_bytes: Optional[np.ndarray] = None
+    ):
+        """Initialize engine from compressed postings.
+
+        Args:
+            vocabulary: Mapping from term to term id
+            offsets: CSR offsets of each term's postings (len = vocab size + 1)
+            doc_id_offsets: Byte offsets of each term's list in ``doc_id_bytes``
+            doc_id_bytes: Varint-encoded document id deltas, grouped by term
+            term_freq_offsets: Byte offsets of each term's list in ``term_freq_bytes``
+            term_freq_bytes: Varint-encoded term frequencies in posting order
+            impacts: Quantized term-frequency factors in posting order
+            impact_scales: Per-term multiplier from quantized impact to score
+            doc_lengths: Token count of each document
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+            epsilon: IDF floor as a fraction of the average IDF
+            analyzer: Analyzer used for the indexed terms (default: whitespace)
+            position_offsets: Byte offsets of each term's positions in ``position_bytes``
+            position_bytes: Varint-encoded position deltas (None if positions are not stored)
+        """
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.doc_id_offsets = doc_id_offsets
+        self.doc_id_bytes = doc_id_bytes
+        self.term_freq_offsets = term_freq_offsets
+        self.term_freq_bytes = term_freq_bytes
+        self.impacts = impacts
+        self.impact_scales = impact_scales
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.analyzer = analyzer or Analyzer.whitespace()
+        self.position_offsets = position_offsets
+        self.position_bytes = position_bytes
+        self.corpus_size = len(doc_lengths)
+
+    @classmethod
+    def from_engine(cls, engine: BM25Engine) -> "CompressedBM25Engine":
+        """Compress a ``BM25Engine``.
+
+        Args:
+            engine: Engine to compress
+
+        Returns:
+            CompressedBM25Engine instance
+        """
+        offsets = np.asarray(engine.offsets, dtype=np.int64)
+        doc_ids = np.asarray(engine.doc_ids, dtype=np.int64)
+        doc_freqs = np.diff(offsets)
+        nonempty = offsets[:-1][doc_freqs > 0]
+
+        # Gaps between consecutive ids of a list; the first id is stored as is
+        doc_id_bytes, doc_id_lengths = encode_varint(_group_deltas(doc_ids, nonempty))
+        term_freq_bytes, term_freq_lengths = encode_varint(engine.term_freqs)
+
+        position_offsets = position_bytes = None
+        if engine.positions is not None:
+            posting_positions = np.zeros(len(doc_ids) + 1, dtype=np.int64)
+            np.cumsum(engine.term_freqs, out=posting_positions[1:])
+            position_bytes, position_lengths = encode_varint(_group_deltas(
+                np.asarray(engine.positions, dtype=np.int64), posting_positions[:-1][engine.term_freqs > 0]
+            ))
+            position_offsets = _byte_offsets(position_lengths)[posting_positions[offsets]]
+
+        tf = np.asarray(engine.term_freqs, dtype=np.float64)
+        factors = tf * (engine.k1 + 1) / (tf + engine.doc_norms[doc_ids])
+        if len(nonempty):
+            factor_max = np.zeros(len(doc_freqs), dtype=np.float64)
+            factor_max[doc_freqs > 0] = np.maximum.reduceat(factors, nonempty)
+            posting_max = np.repeat(factor_max, doc_freqs)
+            # Every posting keeps a non-zero level so matching documents stay candidates
+            impacts = np.clip(np.rint(factors / posting_max * IMPACT_LEVELS), 1, IMPACT_LEVELS)
+        else:
+            factor_max = np.zeros(len(doc_freqs), dtype=np.float64)
+            impacts = np.zeros(0, dtype=np.float64)
+
+        compressed = cls(
+            vocabulary=engine.vocabulary,
+            offsets=offsets,
+            doc_id_offsets=_byte_offsets(doc_id_lengths)[offsets],
+            doc_id_bytes=doc_id_bytes,
+            term_freq_offsets=_byte_offsets(term_freq_lengths)[offsets],
+            term_freq_bytes=term_freq_bytes,
+            impacts=impacts.astype(np.uint8),
+            impact_scales=engine.idf * factor_max / IMPACT_LEVELS,
+            doc_lengths=np.asarray(engine.doc_lengths, dtype=np.int32),
+            k1=engine.k1,
+            b=engine.b,
+            epsilon=engine.epsilon,
+            analyzer=engine.analyzer,
+            position_offsets=position_offsets,
+            position_bytes=position_bytes
+        )
+        logger.debug("BM25 postings compressed",
+                    posting_count=len(doc_ids),
+                    raw_bytes=engine.nbytes,
+                    compressed_bytes=compressed.nbytes)
+        return compressed
+
+    def decompress(self) -> BM25Engine:
+        """Decode all postings into an exact ``BM25Engine``.
+
+        Returns:
+            BM25Engine instance
+        """
+        posting_count = int(self.offsets[-1])
+        doc_ids = _group_prefix_sums(decode_varint(self.doc_id_bytes, posting_count), np.diff(self.offsets))
+        term_freqs = decode_varint(self.term_freq_bytes, posting_count)
+        positions = None
+        if self.position_bytes is not None:
+            positions = _group_prefix_sums(
+                decode_varint(self.position_bytes, int(term_freqs.sum())), term_freqs
+            ).astype(np.int32)
+        return BM25Engine(
+            vocabulary=self.vocabulary,
+            offsets=np.asarray(self.offsets, dtype=np.int64),
+            doc_ids=doc_ids.astype(np.int32),
+            term_freqs=term_freqs.astype(np.int32),
+            doc_lengths=np.asarray(self.doc_lengths, dtype=np.int32),
+            k1=self.k1,
+            b=self.b,
+            epsilon=self.epsilon,
+            analyzer=self.analyzer,
+            positions=positions
+        )
+
+    def save(self, path: str) -> None:
+        """Write the index in the flat binary format with compressed postings.
+
+        Args:
+            path: Destination file path
+        """
+        term_offsets, terms = encode_vocabulary(self.vocabulary)
+        arrays = {
+            "offsets": np.ascontiguousarray(self.offsets, dtype="<i8"),
+            "doc_id_offsets": np.ascontiguousarray(self.doc_id_offsets, dtype="<i8"),
+            "doc_id_bytes": np.ascontiguousarray(self.doc_id_bytes, dtype=np.uint8),
+            "term_freq_offsets": np.ascontiguousarray(self.term_freq_offsets, dtype="<i8"),
+            "term_freq_bytes": np.ascontiguousarray(self.term_freq_bytes, dtype=np.uint8),
+            "impacts": np.ascontiguousarray(self.impacts, dtype=np.uint8),
+            "impact_scales": np.ascontiguousarray(self.impact_scales, dtype="<f8"),
+            "doc_lengths": np.ascontiguousarray(self.doc_lengths, dtype="<i4"),
+            "term_offsets": term_offsets,
+            "terms": terms,
+        }
+        if self.position_bytes is not None:
+            arrays["position_offsets"] = np.ascontiguousarray(self.position_offsets, dtype="<i8")
+            arrays["position_bytes"] = np.ascontiguousarray(self.position_bytes, dtype=np.uint8)
+        write_index_file(
+            path,
+            {
+                "postings": "compressed",
+                "k1": self.k1,
+                "b": self.b,
+                "epsilon": self.epsilon,
+                "corpus_size": self.corpus_size,
+                "analyzer": self.analyzer.to_config(),
+            },
+            arrays
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompressedBM25Engine":
+        """Open an index written by ``save``; raw indices are compressed on load.
+
+        Args:
+            path: Index file path
+            mmap: Memory-map the arrays instead of reading them into memory
+
+        Returns:
+            CompressedBM25Engine instance
+
+        Raises:
+            ValueError: If the file is not a BM25 index or has an unsupported version
+        """
+        header, arrays = read_index_file(path, mmap=mmap)
+        if header.get("postings", "raw") != "compressed":
+            return cls.from_engine(BM25Engine.load(path, mmap=mmap))
+
+        return cls(
+            vocabulary=decode_vocabulary(arrays["term_offsets"], arrays["terms"]),
+            offsets=arrays["offsets"],
+            doc_id_offsets=arrays["doc_id_offsets"],
+            doc_id_bytes=arrays["doc_id_bytes"],
+            term_freq_offsets=arrays["term_freq_offsets"],
+            term_freq_bytes=arrays["term_freq_bytes"],
+            impacts=arrays["impacts"],
+            impact_scales=arrays["impact_scales"],
+            doc_lengths=arrays["doc_lengths"],
+            k1=header["k1"],
+            b=header["b"],
+            epsilon=header["epsilon"],
+            analyzer=Analyzer.from_config(header["analyzer"]),
+            position_offsets=arrays.get("position_offsets"),
+            position_bytes=arrays.get("position_bytes")
+        )
+
+    @property
+    def vocabulary_size(self) -> int:
+        """Number of distinct terms in the index."""
+        return len(self.vocabulary)
+
+    @property
+    def nbytes(self) -> int:
+        """Index size in bytes: compressed postings, per-term and per-document arrays and vocabulary."""
+        arrays = [
+            self.offsets, self.doc_id_offsets, self.doc_id_bytes, self.term_freq_offsets,
+            self.term_freq_bytes, self.impacts, self.impact_scales, self.doc_lengths,
+        ]
+        if self.position_bytes is not None:
+            arrays.extend([self.position_offsets, self.position_bytes])
+        return sum(array.nbytes for array in arrays) + vocabulary_nbytes(self.vocabulary)
+
+    @property
+    def compressed(self) -> bool:
+        """Whether postings are compressed (always True)."""
+        return True
+
+    @property
+    def has_positions(self) -> bool:
+        """Whether token positions are stored (phrase matching is available)."""
+        return self.position_bytes is not None
+
+    def _term_positions(self, term_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Decode one term's postings with their token positions.
+
+        Args:
+            term_id: Term id
+
+        Returns:
+            Tuple of (document ids, position offsets per posting (len + 1), positions)
+        """
+        count = int(self.offsets[term_id + 1] - self.offsets[term_id])
+        data = self.doc_id_bytes[self.doc_id_offsets[term_id]:self.doc_id_offsets[term_id + 1]]
+        docs = np.cumsum(decode_varint(data, count))
+        term_freqs = decode_varint(
+            self.term_freq_bytes[self.term_freq_offsets[term_id]:self.term_freq_offsets[term_id + 1]], count
+        )
+        position_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(term_freqs, out=position_offsets[1:])
+        data = self.position_bytes[self.position_offsets[term_id]:self.position_offsets[term_id + 1]]
+        positions = _group_prefix_sums(decode_varint(data, int(position_offsets[-1])), term_freqs)
+        return docs, position_offsets, positions
+
+    def phrase_frequencies(
+        self,
+        phrase_tokens: List[str],
+        doc_ids: np.ndarray,
+        slop: int = 0
+    ) -> np.ndarray:
+        """Count occurrences of a phrase in the given documents (see ``BM25Engine.phrase_frequencies``).
+
+        Args:
+            phrase_tokens: Analyzed phrase terms, in order
+            doc_ids: Documents to check
+            slop: Allowed displacement of each term from its exact phrase position
+
+        Returns:
+            Phrase occurrence count per document in ``doc_ids``
+
+        Raises:
+            ValueError: If the index was built without positions
+        """
+        if self.position_bytes is None:
+            raise ValueError("BM25 index was built without token positions")
+        term_ids = [self.vocabulary.get(token) for token in phrase_tokens]
+        if None in term_ids:
+            return np.zeros(len(doc_ids), dtype=np.int64)
+        return count_phrase_matches([self._term_positions(term_id) for term_id in term_ids], doc_ids, slop)
+
+    def _term_ids(self, query_tokens: List[str]) -> List[int]:
+        """Map query tokens to term ids, dropping unknown terms (repeats kept)."""
+        vocabulary = self.vocabulary
+        return [vocabulary[token] for token in query_tokens if token in vocabulary]
+
+    def _term_contributions(
+        self,
+        term_id: int,
+        eligible: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Decode one posting list into (document ids, score contributions).
+
+        Args:
+            term_id: Term id
+            eligible: Optional mask of documents to score; other postings are skipped
+
+        Returns:
+            Tuple of (document ids, score contributions)
+        """
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        data = self.doc_id_bytes[self.doc_id_offsets[term_id]:self.doc_id_offsets[term_id + 1]]
+        docs = np.cumsum(decode_varint(data, int(end - start))).astype(np.int32)
+        impacts = self.impacts[start:end]
+        if eligible is not None:
+            keep = eligible[docs]
+            docs, impacts = docs[keep], impacts[keep]
+        return docs, impacts * self.impact_scales[term_id]
+
+    def score_candidates(
+        self,
+        query_tokens: List[str],
+        eligible: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score only the documents that contain at least one query term.
+
+        Args:
+            query_tokens: Tokenized query
+            eligible: Optional mask of documents to score; postings of other
+                documents are never scored
+
+        Returns:
+            Tuple of (document ids sorted ascending, their BM25 scores)
+        """
+        return sum_contributions(
+            [self._term_contributions(term_id, eligible) for term_id in self._term_ids(query_tokens)]
+        )
+
+    def score_candidates_batch(
+        self,
+        tokenized_queries: List[List[str]],
+        eligible: Optional[np.ndarray] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score many queries, decoding each distinct term's postings once.
+
+        Args:
+            tokenized_queries: Tokenized queries
+            eligible: Optional mask of documents to score
+
+        Returns:
+            One ``score_candidates``-style (document ids, scores) pair per query
+        """
+        decoded: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        results = []
+        for query_tokens in tokenized_queries:
+            parts = []
+            for term_id in self._term_ids(query_tokens):
+                if term_id not in decoded:
+                    decoded[term_id] = self._term_contributions(term_id, eligible)
+                parts.append(decoded[term_id])
+            results.append(sum_contributions(parts))
+        return results
+
+    def posting_count(self, query_tokens: List[str]) -> int:
+        """Number of postings of the distinct query terms.
+
+        Args:
+            query_tokens: Tokenized query
+
+        Returns:
+            Sum of document frequencies
+        """
+        term_ids = np.array(sorted(set(self._term_ids(query_tokens))), dtype=np.int64)
+        return int((self.offsets[term_ids + 1] - self.offsets[term_ids]).sum())
+
+    def get_top_k_pruned(
+        self,
+        query_tokens: List[str],
+        top_k: int,
+        eligible: Optional[np.ndarray] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Pruned top-k is not available on compressed postings.
+
+        Args:
+            query_tokens: Tokenized query
+            top_k: Number of documents to return
+            eligible: Optional mask of documents that may be returned
+            stats: Optional dict receiving pruning statistics
+
+        Returns:
+            None (callers score exhaustively)
+        """
+        return None
+
+    def get_scores(self, query_tokens: List[str]) -> np.ndarray:
+        """Score every document.
+
+        Args:
+            query_tokens: Tokenized query
+
+        Returns:
+            Array of BM25 scores indexed by document id
+        """
+        scores = np.zeros(self.corpus_size, dtype=np.float64)
+        for term_id in self._term_ids(query_tokens):
+            docs, contributions = self._term_contributions(term_id)
+            scores[docs] += contributions
+        return scores
+
+    def get_top_k(self, query_tokens: List[str], top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ``top_k`` highest scoring documents.
+
+        Args:
+            query_tokens: Tokenized query
+            top_k: Number of documents to return
+
+        Returns:
+            Tuple of (document ids, scores) sorted by descending score
+        """
+        candidates, scores = self.score_candidates(query_tokens)
+        order = top_k_order(scores, top_k)
+        return candidates[order], scores[order]
+
+
+def _group_deltas(values: np.ndarray, group_starts: np.ndarray) -> np.ndarray:
+    """Gaps between consecutive values, restarting (value kept as is) at each group start."""
+    deltas = np.diff(values, prepend=0)
+    deltas[group_starts] = values[group_starts]
+    return deltas
+
+
+def _group_prefix_sums(deltas: np.ndarray, group_lengths: np.ndarray) -> np.ndarray:
+    """Inverse of ``_group_deltas``: running sums that restart at every group."""
+    running = np.cumsum(deltas)
+    group_lengths = group_lengths[group_lengths > 0]
+    starts = np.cumsum(group_lengths) - group_lengths
+    # Subtract the running total before each group so every group restarts at its first value
+    return running - np.repeat(running[starts] - deltas[starts], group_lengths)
+
+
+def _byte_offsets(lengths: np.ndarray) -> np.ndarray:
+    """Byte offset of each encoded value (plus the total) from per-value byte lengths."""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def encode_varint(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """LEB128-encode non-negative integers (7 bits per byte, high bit = more bytes follow).
+
+    Args:
+        values: Non-negative integers
+
+    Returns:
+        Tuple of (encoded bytes, byte length of each value)
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        lengths += values >= np.uint64(1 << shift)
+
+    encoded = np.zeros(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    for byte in range(int(lengths.max()) if len(values) else 0):
+        selected = lengths > byte
+        chunk = (values[selected] >> np.uint64(7 * byte)) & np.uint64(0x7F)
+        more = (lengths[selected] > byte + 1).astype(np.uint64) << np.uint64(7)
+        encoded[starts[selected] + byte] = chunk | more
+    return encoded, lengths
+
+
+def decode_varint(data: np.ndarray, count: int) -> np.ndarray:
+    """Decode ``count`` LEB128 values with vectorized NumPy operations.
+
+    Args:
+        data: Encoded bytes
+        count: Number of values encoded in ``data``
+
+    Returns:
+        Decoded values as int64
+    """
+    data = np.asarray(data, dtype=np.uint8)
+    if len(data) == count:
+        # Every value fits in one byte (the common case for dense lists)
+        return data.astype(np.int64)
+
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    payload = (data & 0x7F).astype(np.int64) << (7 * position)
+    return np.add.reduceat(payload, starts)
@@ -0,0 +1,1003 @@
+"""Inverted-index BM25 engine backed by NumPy arrays."""
+
+from typing import List, Dict, Tuple, Iterable, Any, Optional
+from collections import Counter
+from pathlib import Path
+import json
+import os
+import pickle
+import struct
+import sys
+import numpy as np
+from scipy import sparse
+from .analyzer import Analyzer
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# On-disk index format: magic, version (u32), header length (u32), JSON header,
+# then each array as raw little-endian data aligned to INDEX_ALIGNMENT bytes.
+# Version 3 adds the "postings" header field ("raw" or "compressed")
+INDEX_MAGIC = b"BM25IDX\0"
+INDEX_FORMAT_VERSION = 3
+INDEX_ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+# Postings per block for block-max upper bounds in pruned top-k evaluation
+POSTING_BLOCK_SIZE = 128
+
+# Relative slack on the pruning threshold so rounding never drops a tied document
+_PRUNING_TOLERANCE = 1e-9
+
+# Multiplier combining (document id, token position) into one sortable key
+_POSITION_STRIDE = 1 << 32
+
+
+def is_bm25_index_file(path: str) -> bool:
+    """Check whether a file uses the BM25Engine on-disk format.
+
+    Args:
+        path: File path
+
+    Returns:
+        True if the file starts with the index magic bytes
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(INDEX_MAGIC)) == INDEX_MAGIC
+    except OSError:
+        return False
+
+
+def resolve_bm25_index_path(path: str) -> str:
+    """Fall back to the legacy ``.pkl`` name when a ``.bm25`` index is missing.
+
+    Index files used to be named ``*.pkl``. Deployments upgraded without
+    re-running ingestion keep serving their old index, which
+    ``load_bm25_index`` still reads; the next full or append ingestion
+    writes the new file.
+
+    Args:
+        path: Configured index path
+
+    Returns:
+        ``path``, or the legacy path if only that exists
+    """
+    candidate = Path(path)
+    if candidate.exists() or candidate.suffix != ".bm25":
+        return path
+    legacy = candidate.with_suffix(".pkl")
+    if legacy.exists():
+        logger.warning("BM25 index not found, using legacy index file; re-run ingestion to upgrade",
+                       path=path, legacy_path=str(legacy))
+        return str(legacy)
+    return path
+
+
+class BM25Engine:
+    """Okapi BM25 over an inverted index.
+
+    Postings are stored in CSR layout: the postings of term ``t`` live in
+    ``doc_ids[offsets[t]:offsets[t + 1]]`` with matching ``term_freqs``.
+    IDF values and per-document length norms are precomputed, so scoring a
+    query only touches the postings of its terms instead of every chunk.
+
+    Scores are identical to ``rank_bm25.BM25Okapi`` (same IDF floor, same
+    handling of repeated query terms), so the engine can replace it as-is.
+    The ``analyzer`` that produced the indexed terms travels with the index
+    and must be used to tokenize queries.
+
+    Optionally the index stores token ``positions`` for phrase matching:
+    the positions of posting ``i`` are the next ``term_freqs[i]`` entries,
+    ascending, so postings and positions share one order.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        analyzer: Optional[Analyzer] = None,
+        positions: Optional[np.ndarray] = None
+    ):
+        """Initialize engine from prebuilt postings.
+
+        Args:
+            vocabulary: Mapping from term to term id
+            offsets: CSR offsets into the postings arrays (len = vocab size + 1)
+            doc_ids: Document ids of all postings, grouped by term
+            term_freqs: Term frequencies matching ``doc_ids``
+            doc_lengths: Token count of each document
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+            epsilon: IDF floor as a fraction of the average IDF
+            analyzer: Analyzer used for the indexed terms (default: whitespace)
+            positions: Token positions grouped by posting (None if not stored)
+        """
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.analyzer = analyzer or Analyzer.whitespace()
+        self.positions = positions
+        self.corpus_size = len(doc_lengths)
+        self.avgdl = float(doc_lengths.sum()) / self.corpus_size if self.corpus_size else 0.0
+        self.idf = self._compute_idf()
+        self.doc_norms = self._compute_doc_norms()
+        self._impacts: Optional[sparse.csr_matrix] = None
+        self._posting_impacts: Optional[np.ndarray] = None
+        self._blocks: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+        self._position_offsets: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_tokenized(
+        cls,
+        tokenized_docs: Iterable[List[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        analyzer: Optional[Analyzer] = None,
+        store_positions: bool = False
+    ) -> "BM25Engine":
+        """Build engine from tokenized documents.
+
+        Args:
+            tokenized_docs: Token lists, one per document (document id = position)
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+            epsilon: IDF floor as a fraction of the average IDF
+            analyzer: Analyzer that produced the tokens
+            store_positions: Keep token positions for phrase matching
+
+        Returns:
+            BM25Engine instance
+        """
+        if store_positions:
+            tokenized_docs = list(tokenized_docs)
+        doc_lengths: List[int] = []
+
+        def term_counts() -> Iterable[Dict[str, int]]:
+            for tokens in tokenized_docs:
+                doc_lengths.append(len(tokens))
+                yield Counter(tokens)
+
+        vocabulary, offsets, doc_ids, term_freqs = _build_postings(term_counts())
+        return cls(
+            vocabulary=vocabulary,
+            offsets=offsets,
+            doc_ids=doc_ids,
+            term_freqs=term_freqs,
+            doc_lengths=np.asarray(doc_lengths, dtype=np.int32),
+            k1=k1,
+            b=b,
+            epsilon=epsilon,
+            analyzer=analyzer,
+            positions=_build_positions(tokenized_docs, vocabulary) if store_positions else None
+        )
+
+    @classmethod
+    def from_okapi(cls, okapi: Any) -> "BM25Engine":
+        """Convert a legacy pickled ``rank_bm25.BM25Okapi`` index.
+
+        Args:
+            okapi: BM25Okapi instance
+
+        Returns:
+            Equivalent BM25Engine instance
+        """
+        vocabulary, offsets, doc_ids, term_freqs = _build_postings(okapi.doc_freqs)
+        return cls(
+            vocabulary=vocabulary,
+            offsets=offsets,
+            doc_ids=doc_ids,
+            term_freqs=term_freqs,
+            doc_lengths=np.asarray(okapi.doc_len, dtype=np.int32),
+            k1=okapi.k1,
+            b=okapi.b,
+            epsilon=okapi.epsilon
+        )
+
+    def save(self, path: str) -> None:
+        """Write the index in the versioned flat binary format.
+
+        The file is written to a temporary path and renamed into place, so
+        processes reading the old file are never exposed to a partial write.
+
+        Args:
+            path: Destination file path
+        """
+        term_offsets, terms = encode_vocabulary(self.vocabulary)
+        arrays = {
+            "offsets": np.ascontiguousarray(self.offsets, dtype="<i8"),
+            "doc_ids": np.ascontiguousarray(self.doc_ids, dtype="<i4"),
+            "term_freqs": np.ascontiguousarray(self.term_freqs, dtype="<i4"),
+            "doc_lengths": np.ascontiguousarray(self.doc_lengths, dtype="<i4"),
+            "term_offsets": term_offsets,
+            "terms": terms,
+        }
+        if self.positions is not None:
+            arrays["positions"] = np.ascontiguousarray(self.positions, dtype="<i4")
+        write_index_file(
+            path,
+            {
+                "postings": "raw",
+                "k1": self.k1,
+                "b": self.b,
+                "epsilon": self.epsilon,
+                "corpus_size": self.corpus_size,
+                "analyzer": self.analyzer.to_config(),
+            },
+            arrays
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "BM25Engine":
+        """Open an index written by ``save``.
+
+        With ``mmap`` the postings stay in the page cache and are shared by
+        every process that opens the same file; nothing is unpickled.
+        Compressed indices are decoded into regular postings.
+
+        Args:
+            path: Index file path
+            mmap: Memory-map the arrays instead of reading them into memory
+
+        Returns:
+            BM25Engine instance
+
+        Raises:
+            ValueError: If the file is not a BM25 index or has an unsupported version
+        """
+        header, arrays = read_index_file(path, mmap=mmap)
+        if header.get("postings", "raw") == "compressed":
+            from .bm25_compressed import CompressedBM25Engine
+            return CompressedBM25Engine.load(path, mmap=mmap).decompress()
+
+        return cls(
+            vocabulary=decode_vocabulary(arrays["term_offsets"], arrays["terms"]),
+            offsets=arrays["offsets"],
+            doc_ids=arrays["doc_ids"],
+            term_freqs=arrays["term_freqs"],
+            doc_lengths=arrays["doc_lengths"],
+            k1=header["k1"],
+            b=header["b"],
+            epsilon=header["epsilon"],
+            # Version 1 indices were always built with whitespace tokenization
+            analyzer=Analyzer.from_config(header["analyzer"]) if "analyzer" in header else None,
+            positions=arrays.get("positions")
+        )
+
+    def _compute_idf(self) -> np.ndarray:
+        """Compute BM25Okapi IDF with the epsilon floor for negative values."""
+        return bm25_idf(np.diff(self.offsets), self.corpus_size, self.epsilon)
+
+    def _compute_doc_norms(self) -> np.ndarray:
+        """Precompute ``k1 * (1 - b + b * dl / avgdl)`` for every document."""
+        if self.corpus_size == 0:
+            return np.zeros(0, dtype=np.float64)
+        return self.k1 * (1 - self.b + self.b * self.doc_lengths.astype(np.float64) / self.avgdl)
+
+    @property
+    def vocabulary_size(self) -> int:
+        """Number of distinct terms in the index."""
+        return len(self.vocabulary)
+
+    @property
+    def nbytes(self) -> int:
+        """Index size in bytes: postings, per-document arrays, lazily built caches and vocabulary."""
+        arrays = [self.offsets, self.doc_ids, self.term_freqs, self.doc_lengths, self.idf, self.doc_norms]
+        if self._posting_impacts is not None:
+            arrays.append(self._posting_impacts)
+        if self._impacts is not None:
+            # The impact matrix shares data and indices with the postings
+            arrays.append(self._impacts.indptr)
+        if self._blocks is not None:
+            arrays.extend(self._blocks)
+        if self.positions is not None:
+            arrays.append(self.positions)
+        if self._position_offsets is not None:
+            arrays.append(self._position_offsets)
+        return sum(array.nbytes for array in arrays) + vocabulary_nbytes(self.vocabulary)
+
+    @property
+    def compressed(self) -> bool:
+        """Whether postings are compressed (always False; see ``CompressedBM25Engine``)."""
+        return False
+
+    @property
+    def has_positions(self) -> bool:
+        """Whether token positions are stored (phrase matching is available)."""
+        return self.positions is not None
+
+    def _term_positions(self, term_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Postings of one term with their token positions.
+
+        Args:
+            term_id: Term id
+
+        Returns:
+            Tuple of (document ids, position offsets per posting (len + 1), positions)
+        """
+        if self._position_offsets is None:
+            position_offsets = np.zeros(len(self.term_freqs) + 1, dtype=np.int64)
+            np.cumsum(self.term_freqs, out=position_offsets[1:])
+            self._position_offsets = position_offsets
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        position_offsets = self._position_offsets[start:end + 1]
+        positions = self.positions[position_offsets[0]:position_offsets[-1]]
+        return self.doc_ids[start:end], position_offsets - position_offsets[0], positions
+
+    def phrase_frequencies(
+        self,
+        phrase_tokens: List[str],
+        doc_ids: np.ndarray,
+        slop: int = 0
+    ) -> np.ndarray:
+        """Count occurrences of a phrase in the given documents.
+
+        Only the position lists of ``doc_ids`` are intersected, so cost grows
+        with the number of documents checked rather than the corpus size.
+
+        Args:
+            phrase_tokens: Analyzed phrase terms, in order
+            doc_ids: Documents to check
+            slop: Allowed displacement of each term from its exact phrase position
+
+        Returns:
+            Phrase occurrence count per document in ``doc_ids``
+
+        Raises:
+            ValueError: If the index was built without positions
+        """
+        if self.positions is None:
+            raise ValueError("BM25 index was built without token positions")
+        term_ids = [self.vocabulary.get(token) for token in phrase_tokens]
+        if None in term_ids:
+            return np.zeros(len(doc_ids), dtype=np.int64)
+        return count_phrase_matches([self._term_positions(term_id) for term_id in term_ids], doc_ids, slop)
+
+    def _term_ids(self, query_tokens: List[str]) -> List[int]:
+        """Map query tokens to term ids, dropping unknown terms.
+
+        Repeated tokens are kept so they contribute once per occurrence,
+        matching ``BM25Okapi.get_scores``.
+        """
+        vocabulary = self.vocabulary
+        return [vocabulary[token] for token in query_tokens if token in vocabulary]
+
+    def _term_contributions(
+        self,
+        term_id: int,
+        eligible: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score contributions of one term over its posting list.
+
+        Args:
+            term_id: Term id
+            eligible: Optional mask of documents to score; other postings are skipped
+
+        Returns:
+            Tuple of (document ids, score contributions)
+        """
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        docs = self.doc_ids[start:end]
+        tf = self.term_freqs[start:end]
+        if eligible is not None:
+            keep = eligible[docs]
+            docs, tf = docs[keep], tf[keep]
+        tf = tf.astype(np.float64)
+        contributions = self.idf[term_id] * (tf * (self.k1 + 1) / (tf + self.doc_norms[docs]))
+        return docs, contributions
+
+    def score_candidates(
+        self,
+        query_tokens: List[str],
+        eligible: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score only the documents that contain at least one query term.
+
+        Args:
+            query_tokens: Tokenized query
+            eligible: Optional mask of documents to score (e.g. a metadata
+                filter); postings of other documents are never scored
+
+        Returns:
+            Tuple of (document ids sorted ascending, their BM25 scores)
+        """
+        return sum_contributions(
+            [self._term_contributions(term_id, eligible) for term_id in self._term_ids(query_tokens)]
+        )
+
+    def _impact_matrix(self) -> sparse.csr_matrix:
+        """Term x document matrix of precomputed BM25 contributions.
+
+        Shares the CSR layout of the postings; built on first use and kept
+        for subsequent batches.
+        """
+        if self._impacts is None:
+            self._impacts = sparse.csr_matrix(
+                (self._impacts_per_posting(), self.doc_ids, self.offsets),
+                shape=(self.vocabulary_size, self.corpus_size)
+            )
+        return self._impacts
+
+    def _impacts_per_posting(self) -> np.ndarray:
+        """BM25 contribution of every posting, aligned with ``doc_ids``."""
+        if self._posting_impacts is None:
+            term_ids = np.repeat(
+                np.arange(self.vocabulary_size, dtype=np.int32), np.diff(self.offsets)
+            )
+            tf = self.term_freqs.astype(np.float64)
+            self._posting_impacts = self.idf[term_ids] * (
+                tf * (self.k1 + 1) / (tf + self.doc_norms[self.doc_ids])
+            )
+        return self._posting_impacts
+
+    def _block_maxima(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Split every posting list into blocks and record each block's maximum impact.
+
+        Returns:
+            Tuple of (per-term block offsets, block max impacts, last document
+            id of each block, per-term max impacts)
+        """
+        if self._blocks is None:
+            impacts = self._impacts_per_posting()
+            doc_freqs = np.diff(self.offsets)
+            block_counts = -(-doc_freqs // POSTING_BLOCK_SIZE)
+            block_offsets = np.zeros(len(doc_freqs) + 1, dtype=np.int64)
+            np.cumsum(block_counts, out=block_offsets[1:])
+
+            block_terms = np.repeat(np.arange(len(doc_freqs)), block_counts)
+            block_rank = np.arange(block_offsets[-1]) - block_offsets[block_terms]
+            starts = self.offsets[block_terms] + block_rank * POSTING_BLOCK_SIZE
+            ends = np.minimum(starts + POSTING_BLOCK_SIZE, self.offsets[block_terms + 1])
+
+            if len(starts):
+                block_max = np.maximum.reduceat(impacts, starts)
+                term_max = np.maximum.reduceat(block_max, block_offsets[:-1])
+            else:
+                block_max = term_max = np.zeros(0, dtype=np.float64)
+            self._blocks = (block_offsets, block_max, self.doc_ids[ends - 1], term_max)
+        return self._blocks
+
+    def posting_count(self, query_tokens: List[str]) -> int:
+        """Number of postings of the distinct query terms (bounds matching documents).
+
+        Args:
+            query_tokens: Tokenized query
+
+        Returns:
+            Sum of document frequencies
+        """
+        term_ids = np.array(sorted(set(self._term_ids(query_tokens))), dtype=np.int64)
+        return int((self.offsets[term_ids + 1] - self.offsets[term_ids]).sum())
+
+    def get_top_k_pruned(
+        self,
+        query_tokens: List[str],
+        top_k: int,
+        eligible: Optional[np.ndarray] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Top-k with MaxScore dynamic pruning and block-max upper bounds.
+
+        A threshold is seeded with the k-th best score of the term with the
+        highest maximum contribution. Terms whose summed upper bounds stay
+        below it are non-essential: documents containing only them cannot
+        reach the top-k, so their posting lists are never scanned. They are looked up
+        for the surviving candidates instead, dropping candidates whose score
+        plus the block-max bounds of the unscored terms falls below the
+        threshold. Returns the same documents and scores as exhaustive
+        evaluation (ties broken by ascending document id).
+
+        Args:
+            query_tokens: Tokenized query
+            top_k: Number of documents to return
+            eligible: Optional mask of documents that may be returned
+            stats: Optional dict receiving ``postings_evaluated`` and ``postings_total``
+
+        Returns:
+            Tuple of (document ids, scores) sorted by descending score, or
+            None when a query term has a negative IDF (bounds would be invalid)
+        """
+        counts = Counter(self._term_ids(query_tokens))
+        term_ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if len(term_ids) == 0 or top_k <= 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64)
+        if (self.idf[term_ids] < 0).any():
+            return None
+
+        impacts = self._impacts_per_posting()
+        block_offsets, block_max, block_last, term_max = self._block_maxima()
+        upper = weights * term_max[term_ids]
+        postings_total = int((self.offsets[term_ids + 1] - self.offsets[term_ids]).sum())
+
+        def postings(index: int) -> Tuple[np.ndarray, np.ndarray]:
+            term_id = term_ids[index]
+            span = slice(self.offsets[term_id], self.offsets[term_id + 1])
+            return self.doc_ids[span], impacts[span] * weights[index]
+
+        def kth_largest(values: np.ndarray) -> float:
+            if len(values) < top_k:
+                return 0.0
+            return float(np.partition(values, len(values) - top_k)[len(values) - top_k])
+
+        # Initial threshold from the term with the highest upper bound alone
+        order = np.argsort(-upper, kind="stable")
+        docs, scores = postings(order[0])
+        if eligible is not None:
+            scores = scores[eligible[docs]]
+        threshold = kth_largest(scores)
+
+        # Terms whose summed bounds (from the lowest up) stay below the
+        # threshold are non-essential; the rest are scored over whole lists
+        suffix_bounds = np.cumsum(upper[order][::-1])[::-1]
+        essential_count = int(np.count_nonzero(suffix_bounds >= threshold * (1 - _PRUNING_TOLERANCE)))
+        accumulator = np.zeros(self.corpus_size, dtype=np.float64)
+        postings_evaluated = 0
+        for index in order[:essential_count]:
+            docs, scores = postings(index)
+            if eligible is not None:
+                keep = eligible[docs]
+                docs, scores = docs[keep], scores[keep]
+            accumulator[docs] += scores
+            postings_evaluated += len(docs)
+
+        candidates = np.flatnonzero(accumulator)
+        partial = accumulator[candidates]
+        threshold = max(threshold, kth_largest(partial))
+
+        # Non-essential terms are only looked up for candidates whose score
+        # plus block-max bounds of the unscored terms can still reach the threshold
+        for position in range(essential_count, len(order)):
+            index = order[position]
+            remaining = suffix_bounds[position + 1] if position + 1 < len(order) else 0.0
+            term_id = term_ids[index]
+            blocks = slice(block_offsets[term_id], block_offsets[term_id + 1])
+            last_docs = block_last[blocks]
+
+            block = np.searchsorted(last_docs, candidates)
+            inside = block < len(last_docs)
+            bound = np.where(inside, block_max[blocks][np.minimum(block, len(last_docs) - 1)], 0.0)
+            keep = partial + weights[index] * bound + remaining >= threshold * (1 - _PRUNING_TOLERANCE)
+            candidates, partial = candidates[keep], partial[keep]
+
+            docs, scores = postings(index)
+            found = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+            hit = docs[found] == candidates
+            partial = partial + np.where(hit, scores[found], 0.0)
+            postings_evaluated += len(candidates)
+            threshold = max(threshold, kth_largest(partial))
+
+        if stats is not None:
+            stats["postings_evaluated"] = postings_evaluated
+            stats["postings_total"] = postings_total
+
+        # Exhaustive evaluation never ranks zero-score documents
+        positive = partial > 0
+        candidates, partial = candidates[positive], partial[positive]
+        top = top_k_order(partial, top_k)
+        return candidates[top].astype(np.int32, copy=False), partial[top]
+
+    def score_candidates_batch(
+        self,
+        tokenized_queries: List[List[str]],
+        eligible: Optional[np.ndarray] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score many queries with one sparse matrix product.
+
+        Builds a query x term count matrix (repeated tokens count once per
+        occurrence) and multiplies it with the impact matrix. With an
+        ``eligible`` mask each query is scored over the eligible postings
+        only instead.
+
+        Args:
+            tokenized_queries: Tokenized queries
+            eligible: Optional mask of documents to score
+
+        Returns:
+            One ``score_candidates``-style (document ids, scores) pair per query
+        """
+        if eligible is not None:
+            return [self.score_candidates(query_tokens, eligible) for query_tokens in tokenized_queries]
+
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, query_tokens in enumerate(tokenized_queries):
+            term_ids = self._term_ids(query_tokens)
+            rows.extend([row] * len(term_ids))
+            cols.extend(term_ids)
+
+        query_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(tokenized_queries), self.vocabulary_size)
+        )
+        scores = (query_matrix @ self._impact_matrix()).tocsr()
+        scores.sort_indices()
+
+        results = []
+        for row in range(len(tokenized_queries)):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            results.append((
+                scores.indices[start:end].astype(np.int32, copy=False),
+                scores.data[start:end]
+            ))
+        return results
+
+    def get_scores(self, query_tokens: List[str]) -> np.ndarray:
+        """Score every document (``BM25Okapi.get_scores`` compatible).
+
+        Args:
+            query_tokens: Tokenized query
+
+        Returns:
+            Array of BM25 scores indexed by document id
+        """
+        scores = np.zeros(self.corpus_size, dtype=np.float64)
+        for term_id in self._term_ids(query_tokens):
+            docs, contributions = self._term_contributions(term_id)
+            scores[docs] += contributions
+        return scores
+
+    def get_top_k(self, query_tokens: List[str], top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ``top_k`` highest scoring documents.
+
+        Only documents containing a query term are considered. Ties are broken
+        by ascending document id.
+
+        Args:
+            query_tokens: Tokenized query
+            top_k: Number of documents to return
+
+        Returns:
+            Tuple of (document ids, scores) sorted by descending score
+        """
+        candidates, scores = self.score_candidates(query_tokens)
+        order = top_k_order(scores, top_k)
+        return candidates[order], scores[order]
+
+
+def load_bm25_index(path: str, mmap: bool = True) -> Any:
+    """Load a BM25 index file, converting legacy pickled indices.
+
+    Flat files with compressed postings load as ``CompressedBM25Engine``.
+    Indices written before the flat format existed are pickled
+    ``BM25Okapi`` (or ``BM25Engine``) objects. They still load so existing
+    deployments keep working, but unpickling runs arbitrary code, so only
+    trusted files should be loaded this way; re-run ingestion to upgrade.
+
+    Args:
+        path: Index file path
+        mmap: Memory-map the arrays of flat format indices
+
+    Returns:
+        BM25Engine or CompressedBM25Engine instance
+    """
+    if is_bm25_index_file(path):
+        header, _ = read_index_file(path, mmap=mmap)
+        if header.get("postings", "raw") == "compressed":
+            from .bm25_compressed import CompressedBM25Engine
+            return CompressedBM25Engine.load(path, mmap=mmap)
+        return BM25Engine.load(path, mmap=mmap)
+
+    logger.warning("Loading legacy pickled BM25 index; re-run ingestion to upgrade", path=path)
+    with open(path, "rb") as f:
+        index = pickle.load(f)
+    if not isinstance(index, BM25Engine):
+        return BM25Engine.from_okapi(index)
+    # Rebuild so attributes added after the object was pickled are initialized
+    return BM25Engine(
+        vocabulary=index.vocabulary,
+        offsets=index.offsets,
+        doc_ids=index.doc_ids,
+        term_freqs=index.term_freqs,
+        doc_lengths=index.doc_lengths,
+        k1=index.k1,
+        b=index.b,
+        epsilon=index.epsilon,
+        analyzer=getattr(index, "analyzer", None)
+    )
+
+
+def bm25_idf(doc_freqs: np.ndarray, corpus_size: int, epsilon: float) -> np.ndarray:
+    """BM25Okapi IDF per term, with negative values floored to ``epsilon * mean``.
+
+    Args:
+        doc_freqs: Document frequency of every term
+        corpus_size: Number of documents
+        epsilon: IDF floor as a fraction of the average IDF
+
+    Returns:
+        IDF array aligned with ``doc_freqs``
+    """
+    doc_freqs = np.asarray(doc_freqs, dtype=np.float64)
+    if len(doc_freqs) == 0:
+        return doc_freqs
+    idf = np.log(corpus_size - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+    eps = epsilon * float(idf.mean())
+    idf[idf < 0] = eps
+    return idf
+
+
+def sum_contributions(parts: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum per-term (document ids, contributions) pairs into document scores.
+
+    Args:
+        parts: One (document ids, contributions) pair per query term
+
+    Returns:
+        Tuple of (document ids sorted ascending, summed scores)
+    """
+    if not parts:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64)
+    if len(parts) == 1:
+        return parts[0][0].astype(np.int32, copy=False), parts[0][1]
+
+    docs = np.concatenate([p[0] for p in parts])
+    contributions = np.concatenate([p[1] for p in parts])
+    candidates, inverse = np.unique(docs, return_inverse=True)
+    scores = np.bincount(inverse, weights=contributions, minlength=len(candidates))
+    return candidates.astype(np.int32, copy=False), scores
+
+
+def write_index_file(path: str, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+    """Write a header and named arrays in the flat index format.
+
+    The file is written to a temporary path and renamed into place.
+
+    Args:
+        path: Destination file path
+        header: JSON-serializable index settings
+        arrays: Arrays to store, in file order
+    """
+    # Array offsets are relative to the data section, which starts at the
+    # first aligned position after the header
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": position}
+        position = _align(position + array.nbytes)
+    header = {"version": INDEX_FORMAT_VERSION, **header, "arrays": layout}
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+
+    path_obj = Path(path)
+    tmp_path = path_obj.with_name(path_obj.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path_obj)
+
+
+def read_index_file(path: str, mmap: bool = True) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Read the header and arrays of a flat format index file.
+
+    Args:
+        path: Index file path
+        mmap: Memory-map the arrays instead of reading them into memory
+
+    Returns:
+        Tuple of (header, arrays by name)
+
+    Raises:
+        ValueError: If the file is not a BM25 index or has an unsupported version
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"Not a BM25 index file: {path}")
+        magic, version, header_length = _PREAMBLE.unpack(preamble)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"Not a BM25 index file: {path}")
+        if version > INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported BM25 index format version {version}: {path}")
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    data_start = _align(_PREAMBLE.size + header_length)
+
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.fromfile(path, dtype=np.uint8)
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        start = data_start + entry["offset"]
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(entry["shape"])
+    return header, arrays
+
+
+def encode_vocabulary(vocabulary: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack terms, ordered by term id, into UTF-8 bytes plus offsets.
+
+    Args:
+        vocabulary: Mapping from term to term id
+
+    Returns:
+        Tuple of (term byte offsets, concatenated term bytes)
+    """
+    encoded_terms = [term.encode("utf-8") for term in sorted(vocabulary, key=vocabulary.__getitem__)]
+    term_offsets = np.zeros(len(encoded_terms) + 1, dtype="<i8")
+    np.cumsum([len(term) for term in encoded_terms], out=term_offsets[1:])
+    return term_offsets, np.frombuffer(b"".join(encoded_terms), dtype=np.uint8)
+
+
+def decode_vocabulary(term_offsets: np.ndarray, terms: np.ndarray) -> Dict[str, int]:
+    """Inverse of ``encode_vocabulary``.
+
+    Args:
+        term_offsets: Term byte offsets
+        terms: Concatenated term bytes
+
+    Returns:
+        Mapping from term to term id
+    """
+    raw_terms = terms.tobytes()
+    bounds = term_offsets.tolist()
+    return {raw_terms[bounds[i]:bounds[i + 1]].decode("utf-8"): i for i in range(len(bounds) - 1)}
+
+
+def vocabulary_nbytes(vocabulary: Dict[str, int]) -> int:
+    """Approximate resident size of a vocabulary dict (table, keys and values).
+
+    Args:
+        vocabulary: Mapping from term to term id
+
+    Returns:
+        Size in bytes
+    """
+    return sys.getsizeof(vocabulary) + sum(sys.getsizeof(term) + 28 for term in vocabulary)
+
+
+def _align(position: int) -> int:
+    """Round a byte position up to the next array alignment boundary."""
+    return -(-position // INDEX_ALIGNMENT) * INDEX_ALIGNMENT
+
+
+def _build_postings(
+    doc_term_freqs: Iterable[Dict[str, int]]
+) -> Tuple[Dict[str, int], np.ndarray, np.ndarray, np.ndarray]:
+    """Invert per-document term frequencies into CSR postings.
+
+    Args:
+        doc_term_freqs: Term -> frequency mapping per document, in document order
+
+    Returns:
+        Tuple of (vocabulary, offsets, doc_ids, term_freqs)
+    """
+    vocabulary: Dict[str, int] = {}
+    postings: List[Tuple[List[int], List[int]]] = []
+
+    for doc_id, frequencies in enumerate(doc_term_freqs):
+        for term, tf in frequencies.items():
+            term_id = vocabulary.get(term)
+            if term_id is None:
+                term_id = len(vocabulary)
+                vocabulary[term] = term_id
+                postings.append(([], []))
+            docs, freqs = postings[term_id]
+            docs.append(doc_id)
+            freqs.append(tf)
+
+    lengths = np.fromiter((len(docs) for docs, _ in postings), dtype=np.int64, count=len(postings))
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    total = int(offsets[-1])
+
+    doc_ids = np.fromiter((d for docs, _ in postings for d in docs), dtype=np.int32, count=total)
+    term_freqs = np.fromiter((f for _, freqs in postings for f in freqs), dtype=np.int32, count=total)
+    return vocabulary, offsets, doc_ids, term_freqs
+
+
+def _build_positions(tokenized_docs: List[List[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    """Token positions in posting order (term, then document, then position).
+
+    Args:
+        tokenized_docs: Token lists, one per document
+        vocabulary: Mapping from term to term id
+
+    Returns:
+        Positions array aligned with the postings built from ``tokenized_docs``
+    """
+    lengths = np.fromiter((len(tokens) for tokens in tokenized_docs), dtype=np.int64, count=len(tokenized_docs))
+    total = int(lengths.sum())
+    term_ids = np.fromiter(
+        (vocabulary[token] for tokens in tokenized_docs for token in tokens), dtype=np.int64, count=total
+    )
+    starts = np.cumsum(lengths) - lengths
+    positions = np.arange(total, dtype=np.int64) - np.repeat(starts, lengths)
+    # Tokens are generated in document and position order; a stable sort by term keeps it
+    return positions[np.argsort(term_ids, kind="stable")].astype(np.int32)
+
+
+def count_phrase_matches(
+    term_postings: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    doc_ids: np.ndarray,
+    slop: int = 0
+) -> np.ndarray:
+    """Count phrase occurrences by intersecting position lists.
+
+    Every occurrence of the first term is an anchor; each following term
+    ``i`` must occur within ``slop`` positions of ``anchor + i``. Positions
+    are combined with document ids into sorted keys, so each term is one
+    vectorized ``searchsorted`` over the anchors.
+
+    Args:
+        term_postings: Per phrase term, (document ids, position offsets per
+            posting (len + 1), positions) as returned by ``_term_positions``
+        doc_ids: Documents to check
+        slop: Allowed displacement of each term from its exact phrase position
+
+    Returns:
+        Phrase occurrence count per document in ``doc_ids``
+    """
+    doc_ids = np.asarray(doc_ids, dtype=np.int64)
+    counts = np.zeros(len(doc_ids), dtype=np.int64)
+    if not term_postings or len(doc_ids) == 0:
+        return counts
+
+    targets = np.unique(doc_ids)
+    anchors: Optional[np.ndarray] = None
+    for offset, (docs, position_offsets, positions) in enumerate(term_postings):
+        found = np.minimum(np.searchsorted(docs, targets), max(len(docs) - 1, 0))
+        hit = docs[found] == targets if len(docs) else np.zeros(len(targets), dtype=bool)
+        postings = found[hit]
+        starts = position_offsets[postings]
+        lengths = position_offsets[postings + 1] - starts
+        gather = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        keys = (np.repeat(targets[hit], lengths) * _POSITION_STRIDE
+                + positions[gather].astype(np.int64) - offset)
+
+        if anchors is None:
+            anchors = keys
+        else:
+            nearest = np.searchsorted(keys, anchors - slop)
+            inside = nearest < len(keys)
+            inside[inside] = keys[nearest[inside]] <= anchors[inside] + slop
+            anchors = anchors[inside]
+        if len(anchors) == 0:
+            return counts
+
+    per_target = np.bincount(np.searchsorted(targets, anchors // _POSITION_STRIDE), minlength=len(targets))
+    return per_target[np.searchsorted(targets, doc_ids)]
+
+
+def top_k_order(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Select positions of the ``top_k`` largest scores with ``argpartition``.
+
+    Ties are broken by ascending position, so the result equals the first
+    ``top_k`` entries of a stable descending sort.
+
+    Args:
+        scores: Score array
+        top_k: Number of positions to select
+
+    Returns:
+        Positions into ``scores`` sorted by descending score
+    """
+    n = len(scores)
+    if top_k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if top_k < n:
+        kth = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:top_k - len(above)]
+        selected = np.concatenate([above, ties])
+    else:
+        selected = np.arange(n)
+    # lexsort sorts by the last key first: descending score, then ascending position
+    return selected[np.lexsort((selected, -scores[selected]))]
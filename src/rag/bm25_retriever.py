@@ -1,10 +1,14 @@
 """BM25-based retriever implementation."""
 
-from typing import List, Optional, Dict, Any
-from rank_bm25 import BM25Okapi
-import pickle
+from typing import List, Optional, Dict, Any, Tuple, NamedTuple
 from pathlib import Path
+import re
+import threading
+import numpy as np
 from .base_retriever import BaseRetriever
+from .bm25_engine import load_bm25_index, resolve_bm25_index_path, top_k_order
+from .bm25_segments import SegmentedBM25Index
+from .metadata_index import MetadataIndex
 from ..core.base_agent import RetrievalResult
 from ..ingestion.metadata_store import MetadataStore, ChunkMetadata
 from ..utils.logging import get_logger
@@ -12,42 +16,91 @@ from ..utils.debug_logging import debug_log_method
 
 logger = get_logger(__name__)
 
+# Distinct query terms from which top-k uses dynamic pruning (long game-loop queries)
+PRUNING_MIN_TERMS = 4
+
+# Quoted spans of a query are matched as phrases
+QUOTED_PHRASE = re.compile(r'"([^"]+)"')
+
+# Highest-scoring candidates whose position lists are checked for phrases
+PHRASE_CANDIDATES = 50
+
+# Default score multiplier per matched phrase
+DEFAULT_PHRASE_BOOST = 0.5
+
+
+class _IndexSnapshot(NamedTuple):
+    """BM25 index and the chunk metadata aligned with it, published together."""
+    index: Any
+    chunks: List[str]
+    # Chunk metadata by BM25 document id, and its filter index
+    doc_metadata: List[Optional[ChunkMetadata]]
+    metadata_index: MetadataIndex
+
 
 class BM25Retriever(BaseRetriever):
     """BM25-based retriever."""
     
-    def __init__(self, index_path: Optional[str] = None, metadata_path: Optional[str] = None, lazy_load: bool = False):
+    def __init__(
+        self,
+        index_path: Optional[str] = None,
+        metadata_path: Optional[str] = None,
+        lazy_load: bool = False,
+        phrase_boost: float = DEFAULT_PHRASE_BOOST,
+        phrase_slop: int = 0
+    ):
         """Initialize BM25 retriever.
 
         Args:
             index_path: Path to BM25 index file
             metadata_path: Path to chunk metadata file
             lazy_load: If True, don't load indices immediately (default: False)
+            phrase_boost: Score multiplier added per "quoted phrase" a chunk contains (0 disables)
+            phrase_slop: Allowed displacement of phrase terms (0 = exact phrase)
         """
         self.index_path = index_path
         self.metadata_path = metadata_path
-        self.index = None
+        self.phrase_boost = phrase_boost
+        self.phrase_slop = phrase_slop
         self.metadata_store = MetadataStore()
         self.metadata = {}
-        self.chunks = []
         self.index_to_chunk_id = {}
+        # Replaced by one assignment, so a query reading it once sees an
+        # index and metadata of the same length even during an append
+        self._snapshot = _IndexSnapshot(None, [], [], MetadataIndex([]))
+        self._append_lock = threading.Lock()
 
         if not lazy_load and index_path and metadata_path:
             self._load_index()
             self._load_metadata()
             self._load_chunks()
     
+    @property
+    def index(self):
+        """Currently published BM25 index (None until loaded)."""
+        return self._snapshot.index
+    
+    @property
+    def chunks(self) -> List[str]:
+        """Chunk texts in BM25 document order."""
+        return self._snapshot.chunks
+    
     def _load_index(self) -> None:
         """Load BM25 index from disk."""
+        self.index_path = resolve_bm25_index_path(self.index_path)
         logger.info("Loading BM25 index", path=self.index_path)
         
         if not Path(self.index_path).exists():
             raise FileNotFoundError(f"BM25 index file not found: {self.index_path}")
         
-        with open(self.index_path, "rb") as f:
-            self.index = pickle.load(f)
+        # Memory-mapped so workers on the same host share the postings pages;
+        # no chunk is eligible until the aligned metadata is published
+        self._snapshot = _IndexSnapshot(load_bm25_index(self.index_path, mmap=True), [], [], MetadataIndex([]))
         
-        logger.info("BM25 index loaded successfully", path=self.index_path)
+        logger.info("BM25 index loaded successfully",
+                   path=self.index_path,
+                   chunk_count=self.index.corpus_size,
+                   vocabulary_size=self.index.vocabulary_size)
     
     def _load_metadata(self) -> None:
         """Load chunk metadata from disk."""
@@ -62,10 +115,21 @@ class BM25Retriever(BaseRetriever):
         logger.info("Loading chunk texts")
         # Sort metadata by chunk_index to match BM25 index order
         sorted_metadata = sorted(self.metadata.values(), key=lambda m: m.chunk_index)
-        self.chunks = [meta.text for meta in sorted_metadata]
         # Create mapping from chunk_index to chunk_id
         self.index_to_chunk_id = {meta.chunk_index: meta.chunk_id for meta in sorted_metadata}
-        logger.info("Chunk texts loaded", count=len(self.chunks))
+
+        # Align metadata with BM25 document ids so retrieval can index by ordinal
+        index = self._snapshot.index
+        doc_count = index.corpus_size if index is not None else len(sorted_metadata)
+        doc_metadata: List[Optional[ChunkMetadata]] = [None] * doc_count
+        for meta in sorted_metadata:
+            if 0 <= meta.chunk_index < doc_count:
+                doc_metadata[meta.chunk_index] = meta
+        metadata_index = MetadataIndex(doc_metadata)
+        self._snapshot = _IndexSnapshot(index, [meta.text for meta in sorted_metadata], doc_metadata, metadata_index)
+        logger.info("Chunk texts loaded",
+                   count=len(sorted_metadata),
+                   filter_fields=metadata_index.indexed_fields)
 
     @debug_log_method
     def load_index(self, index_path: str, metadata_path: str) -> None:
@@ -81,13 +145,59 @@ class BM25Retriever(BaseRetriever):
         self._load_metadata()
         self._load_chunks()
 
+    @debug_log_method
+    def add_chunks(self, chunks: List[ChunkMetadata]) -> None:
+        """Append chunks to the live index without reloading.
+
+        The loaded index becomes the first segment of a
+        ``SegmentedBM25Index``; new chunks are searchable immediately with
+        corpus statistics covering old and new chunks. The grown index and
+        metadata are built aside and published together, so queries running
+        meanwhile keep using the previous snapshot.
+
+        Args:
+            chunks: New chunk metadata; chunk_index must continue the current numbering
+        """
+        if not chunks:
+            return
+        
+        with self._append_lock:
+            snapshot = self._snapshot
+            if snapshot.index is None:
+                raise ValueError("BM25 index not loaded")
+            
+            start = snapshot.index.corpus_size
+            expected = list(range(start, start + len(chunks)))
+            if [chunk.chunk_index for chunk in chunks] != expected:
+                raise ValueError(f"Appended chunks must have chunk_index {start}..{start + len(chunks) - 1}")
+            
+            if isinstance(snapshot.index, SegmentedBM25Index):
+                index = snapshot.index.copy()
+            else:
+                index = SegmentedBM25Index(snapshot.index)
+            texts = [chunk.text for chunk in chunks]
+            index.add_documents(texts)
+            doc_metadata = snapshot.doc_metadata + list(chunks)
+            
+            self.metadata = {**self.metadata, **{chunk.chunk_id: chunk for chunk in chunks}}
+            self.index_to_chunk_id = {
+                **self.index_to_chunk_id, **{chunk.chunk_index: chunk.chunk_id for chunk in chunks}
+            }
+            self._snapshot = _IndexSnapshot(index, snapshot.chunks + texts, doc_metadata, MetadataIndex(doc_metadata))
+        
+        logger.info("Chunks appended to BM25 index",
+                   added=len(chunks),
+                   chunk_count=index.corpus_size,
+                   segment_count=index.segment_count)
+
     def is_loaded(self) -> bool:
         """Check if index is loaded.
 
         Returns:
             True if index is loaded, False otherwise
         """
-        return self.index is not None and len(self.chunks) > 0
+        snapshot = self._snapshot
+        return snapshot.index is not None and len(snapshot.chunks) > 0
     
     @debug_log_method
     def retrieve(
@@ -108,86 +218,315 @@ class BM25Retriever(BaseRetriever):
         """
         logger.debug("BM25 retrieval", query=query[:50], top_k=top_k)
         
-        if self.index is None:
+        snapshot = self._snapshot
+        if snapshot.index is None:
             raise ValueError("BM25 index not loaded")
         
-        if not self.chunks:
+        if not snapshot.chunks:
             logger.warning("No chunks available for BM25 retrieval")
             return []
         
+        eligible = self._eligible(snapshot, filters)
+        if not eligible.any():
+            return []
+        
         # Tokenize query
-        tokenized_query = query.lower().split()
+        tokenized_query = snapshot.index.analyzer.analyze(query)
+        phrases = self._phrases(snapshot, query)
         
-        # Get scores from BM25
-        scores = self.index.get_scores(tokenized_query)
+        normalized_results = None if phrases else self._retrieve_pruned(snapshot, tokenized_query, eligible, top_k)
+        if normalized_results is None:
+            # Score only eligible chunks containing query terms; every other chunk scores 0
+            candidates, scores = snapshot.index.score_candidates(tokenized_query, self._scoring_mask(eligible))
+            scores = self._boost_phrases(snapshot, candidates, scores, phrases, eligible, top_k)
+            normalized_results = self._build_results(snapshot, candidates, scores, eligible, top_k)
         
-        # Create list of (score, index) pairs
-        scored_chunks = list(enumerate(scores))
+        logger.debug("BM25 retrieval completed", 
+                    query=query[:50], 
+                    results_count=len(normalized_results))
+        return normalized_results
+    
+    @debug_log_method
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[RetrievalResult]]:
+        """Retrieve for several queries in one pass.
+
+        All queries are analyzed up front and scored together with a single
+        sparse query x term matrix product; results equal calling
+        ``retrieve`` for each query.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            filters: Optional metadata filters applied to every query
+
+        Returns:
+            One list of RetrievalResult objects per query
+        """
+        logger.debug("BM25 batch retrieval", query_count=len(queries), top_k=top_k)
         
-        # Sort by score (descending)
-        scored_chunks.sort(key=lambda x: x[1], reverse=True)
+        snapshot = self._snapshot
+        if snapshot.index is None:
+            raise ValueError("BM25 index not loaded")
         
-        # Apply filters if provided
-        filtered_results = []
-        for chunk_idx, score in scored_chunks:
-            # Map chunk index to chunk_id
-            chunk_id = self.index_to_chunk_id.get(chunk_idx)
-            if chunk_id is None:
-                continue
-            
-            metadata = self.metadata.get(chunk_id)
-            if metadata is None:
-                continue
-            
-            # Apply filters
-            if filters:
-                match = True
-                for key, value in filters.items():
-                    if key in metadata.additional_metadata:
-                        if metadata.additional_metadata[key] != value:
-                            match = False
-                            break
-                    elif hasattr(metadata, key):
-                        if getattr(metadata, key) != value:
-                            match = False
-                            break
-                    else:
-                        match = False
-                        break
-                
-                if not match:
-                    continue
-            
-            filtered_results.append((chunk_idx, score, metadata))
+        if not snapshot.chunks:
+            logger.warning("No chunks available for BM25 retrieval")
+            return [[] for _ in queries]
         
-        # Normalize scores (optional - BM25 scores can be negative, so we normalize to 0-1)
-        if filtered_results:
-            max_score = max(score for _, score, _ in filtered_results)
-            min_score = min(score for _, score, _ in filtered_results)
-            score_range = max_score - min_score if max_score != min_score else 1.0
-            
-            normalized_results = []
-            for chunk_idx, score, metadata in filtered_results[:top_k]:
-                normalized_score = (score - min_score) / score_range if score_range > 0 else 0.5
-                normalized_results.append(RetrievalResult(
-                    chunk_text=metadata.text,
-                    score=normalized_score,
-                    chunk_id=metadata.chunk_id,
-                    metadata={
-                        "start_pos": metadata.start_pos,
-                        "end_pos": metadata.end_pos,
-                        "chunk_index": metadata.chunk_index,
-                        "source": metadata.source,
-                        **metadata.additional_metadata
-                    }
-                ))
-            
-            logger.debug("BM25 retrieval completed", 
-                        query=query[:50], 
-                        results_count=len(normalized_results))
-            return normalized_results
+        eligible = self._eligible(snapshot, filters)
+        if not eligible.any():
+            return [[] for _ in queries]
+        
+        analyze = snapshot.index.analyzer.analyze
+        scored = snapshot.index.score_candidates_batch(
+            [analyze(query) for query in queries], self._scoring_mask(eligible)
+        )
+        results = [
+            self._build_results(
+                snapshot,
+                candidates,
+                self._boost_phrases(snapshot, candidates, scores, self._phrases(snapshot, query), eligible, top_k),
+                eligible,
+                top_k
+            )
+            for query, (candidates, scores) in zip(queries, scored)
+        ]
+        
+        logger.debug("BM25 batch retrieval completed",
+                    query_count=len(queries),
+                    results_count=sum(len(r) for r in results))
+        return results
+    
+    def _phrases(self, snapshot: _IndexSnapshot, query: str) -> List[List[str]]:
+        """Analyzed multi-term phrases quoted in the query.
+
+        Args:
+            snapshot: Index and metadata the query runs against
+            query: Search query
+
+        Returns:
+            Term lists of the quoted phrases (empty when phrase boosting is
+            disabled or the index has no positions)
+        """
+        if self.phrase_boost <= 0 or '"' not in query or not snapshot.index.has_positions:
+            return []
+        analyze = snapshot.index.analyzer.analyze
+        phrases = [analyze(match) for match in QUOTED_PHRASE.findall(query)]
+        # Single terms are already scored by BM25 itself
+        return [phrase for phrase in phrases if len(phrase) > 1]
+    
+    def _boost_phrases(
+        self,
+        snapshot: _IndexSnapshot,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        phrases: List[List[str]],
+        eligible: np.ndarray,
+        top_k: int
+    ) -> np.ndarray:
+        """Boost the best candidates that contain the quoted phrases.
+
+        Position lists are intersected only for the ``PHRASE_CANDIDATES``
+        (at least ``top_k``) highest-scoring eligible candidates. Each
+        matched phrase multiplies the score by ``1 + phrase_boost``.
+
+        Args:
+            snapshot: Index and metadata the query runs against
+            candidates: Ids of chunks containing query terms
+            scores: BM25 scores of ``candidates``
+            phrases: Analyzed phrases
+            eligible: Mask of chunks that may be returned
+            top_k: Number of results
+
+        Returns:
+            Boosted scores aligned with ``candidates``
+        """
+        if not phrases:
+            return scores
+        
+        positive = np.flatnonzero((scores > 0) & eligible[candidates])
+        checked = positive[top_k_order(scores[positive], max(top_k, PHRASE_CANDIDATES))]
+        matched = np.zeros(len(checked), dtype=np.int64)
+        for phrase in phrases:
+            matched += snapshot.index.phrase_frequencies(phrase, candidates[checked], self.phrase_slop) > 0
+        
+        boosted = np.array(scores, dtype=np.float64)
+        boosted[checked] *= 1 + self.phrase_boost * matched
+        return boosted
+    
+    @staticmethod
+    def _eligible(snapshot: _IndexSnapshot, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Chunks that have metadata and pass the filters (vector AND of bitmaps)."""
+        if filters:
+            return snapshot.metadata_index.mask(filters)
+        return snapshot.metadata_index.present
+    
+    @staticmethod
+    def _scoring_mask(eligible: np.ndarray) -> Optional[np.ndarray]:
+        """Mask restricting scoring to eligible chunks (None when every chunk is eligible)."""
+        return None if eligible.all() else eligible
+    
+    def _build_results(
+        self,
+        snapshot: _IndexSnapshot,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        eligible: np.ndarray,
+        top_k: int
+    ) -> List[RetrievalResult]:
+        """Rank scored candidates and materialize the top-k results.
+
+        Args:
+            snapshot: Index and metadata the query runs against
+            candidates: Ids of eligible chunks containing query terms (ascending),
+                as scored under ``_scoring_mask(eligible)``
+            scores: BM25 scores of ``candidates``
+            eligible: Mask of chunks that may be returned
+            top_k: Number of results
+
+        Returns:
+            List of RetrievalResult objects with normalized scores
+        """
+        eligible_count = int(np.count_nonzero(eligible))
+        
+        ranked_ids, ranked_scores = self._rank(candidates, scores, eligible, top_k)
+        
+        # Normalize scores to 0-1 over all eligible chunks (not just the top-k),
+        # counting the implicit zero score of chunks without any query term
+        if eligible_count > len(candidates):
+            max_score = float(scores.max(initial=0.0))
+            min_score = float(scores.min(initial=0.0))
+        else:
+            max_score = float(scores.max())
+            min_score = float(scores.min())
+        
+        return self._materialize(snapshot, ranked_ids, ranked_scores, min_score, max_score)
+    
+    def _retrieve_pruned(
+        self,
+        snapshot: _IndexSnapshot,
+        tokenized_query: List[str],
+        eligible: np.ndarray,
+        top_k: int
+    ) -> Optional[List[RetrievalResult]]:
+        """Top-k for long queries without scoring every posting.
+
+        Used only when the result is provably identical to exhaustive
+        scoring: at least ``top_k`` chunks match, and some eligible chunk
+        matches no query term, so the normalization minimum is 0.
+
+        Args:
+            snapshot: Index and metadata the query runs against
+            tokenized_query: Analyzed query terms
+            eligible: Mask of chunks that may be returned
+            top_k: Number of results
+
+        Returns:
+            Normalized results, or None to fall back to exhaustive scoring
+        """
+        if top_k <= 0 or len(set(tokenized_query)) < PRUNING_MIN_TERMS:
+            return None
+        if snapshot.index.posting_count(tokenized_query) >= np.count_nonzero(eligible):
+            return None
+        
+        top = snapshot.index.get_top_k_pruned(tokenized_query, top_k, eligible=eligible)
+        if top is None or len(top[0]) < top_k:
+            return None
+        
+        ranked_ids, ranked_scores = top
+        return self._materialize(snapshot, ranked_ids, ranked_scores, 0.0, float(ranked_scores[0]))
+    
+    def _materialize(
+        self,
+        snapshot: _IndexSnapshot,
+        ranked_ids: np.ndarray,
+        ranked_scores: np.ndarray,
+        min_score: float,
+        max_score: float
+    ) -> List[RetrievalResult]:
+        """Create min-max normalized results for ranked chunks.
+
+        Args:
+            snapshot: Index and metadata the query runs against
+            ranked_ids: Chunk ids in rank order
+            ranked_scores: Raw BM25 scores of ``ranked_ids``
+            min_score: Lowest raw score among eligible chunks
+            max_score: Highest raw score among eligible chunks
+
+        Returns:
+            List of RetrievalResult objects
+        """
+        score_range = max_score - min_score if max_score != min_score else 1.0
+        
+        # Materialize results only for the final top-k
+        normalized_results = []
+        for doc_id, score in zip(ranked_ids.tolist(), ranked_scores.tolist()):
+            metadata = snapshot.doc_metadata[doc_id]
+            normalized_score = (score - min_score) / score_range if score_range > 0 else 0.5
+            normalized_results.append(RetrievalResult(
+                chunk_text=metadata.text,
+                score=normalized_score,
+                chunk_id=metadata.chunk_id,
+                metadata={
+                    "start_pos": metadata.start_pos,
+                    "end_pos": metadata.end_pos,
+                    "chunk_index": metadata.chunk_index,
+                    "source": metadata.source,
+                    **metadata.additional_metadata
+                }
+            ))
+        
+        return normalized_results
+    
+    def _rank(
+        self,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        eligible: np.ndarray,
+        top_k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Select the top-k eligible chunks without sorting the whole corpus.
+
+        The order equals a stable descending sort of the scores of all
+        eligible chunks: chunks without any query term score 0 and fill the
+        remaining slots by ascending chunk index, after positive scores and
+        before negative ones. Keeping this padding preserves the result lists
+        hybrid fusion has always seen.
+
+        Args:
+            candidates: Ids of eligible chunks containing query terms
+            scores: BM25 scores of ``candidates``
+            eligible: Mask of chunks that may be returned
+            top_k: Number of results
+
+        Returns:
+            Tuple of (chunk ids, raw scores) in rank order
+        """
+        positive = scores > 0
+        order = top_k_order(scores[positive], top_k)
+        ranked_ids = [candidates[positive][order]]
+        ranked_scores = [scores[positive][order]]
+        remaining = top_k - len(order)
+        
+        if remaining > 0:
+            zero_mask = eligible.copy()
+            zero_mask[candidates[scores != 0]] = False
+            zero_ids = np.flatnonzero(zero_mask)[:remaining]
+            ranked_ids.append(zero_ids)
+            ranked_scores.append(np.zeros(len(zero_ids)))
+            remaining -= len(zero_ids)
+        
+        if remaining > 0:
+            negative = scores < 0
+            order = top_k_order(scores[negative], remaining)
+            ranked_ids.append(candidates[negative][order])
+            ranked_scores.append(scores[negative][order])
         
-        return []
+        return np.concatenate(ranked_ids), np.concatenate(ranked_scores)
     
     def retrieve_with_scores(
         self,
@@ -0,0 +1,512 @@
+"""Appendable BM25 index built from immutable segments."""
+
+from typing import List, Dict, Tuple, Optional, NamedTuple, Iterable, Union
+from collections import Counter
+import copy
+import threading
+import numpy as np
+from .analyzer import Analyzer
+from .bm25_engine import BM25Engine, bm25_idf, sum_contributions, top_k_order, vocabulary_nbytes
+from .bm25_compressed import CompressedBM25Engine
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Documents buffered in the mutable segment before it is sealed
+DEFAULT_MAX_BUFFER_DOCS = 1000
+
+# Sealed segments kept before they are merged into one
+DEFAULT_MAX_SEGMENTS = 8
+
+
+class _SegmentView(NamedTuple):
+    """Immutable scoring state, swapped atomically on every append."""
+    segments: Tuple[BM25Engine, ...]
+    bases: Tuple[int, ...]
+    doc_norms: Tuple[np.ndarray, ...]
+    vocabulary: Dict[str, int]
+    idf: np.ndarray
+    corpus_size: int
+
+
+class SegmentedBM25Index:
+    """BM25 index that accepts new documents without a rebuild.
+
+    Documents live in immutable ``BM25Engine`` segments plus a small mutable
+    segment holding the most recent appends. Corpus statistics (document
+    frequencies, document count, average length) are kept globally, so
+    scores equal those of a single engine built over all documents. The
+    mutable segment is sealed once it reaches ``max_buffer_docs`` and sealed
+    segments are merged when there are more than ``max_segments``.
+
+    Exposes the scoring interface of ``BM25Engine``; ``save`` writes the
+    merged index in the regular flat format.
+    """
+
+    def __init__(
+        self,
+        base: Optional[Union[BM25Engine, CompressedBM25Engine]] = None,
+        analyzer: Optional[Analyzer] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        max_buffer_docs: int = DEFAULT_MAX_BUFFER_DOCS,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        store_positions: bool = False
+    ):
+        """Initialize segmented index.
+
+        Args:
+            base: Existing index used as the first sealed segment (compressed
+                indices are decompressed, so appended indices score exactly)
+            analyzer: Analyzer for appended documents (default: base analyzer)
+            k1: BM25 term frequency saturation (default: base value)
+            b: BM25 length normalization (default: base value)
+            epsilon: IDF floor as a fraction of the average IDF (default: base value)
+            max_buffer_docs: Size at which the mutable segment is sealed
+            max_segments: Number of sealed segments that triggers a merge
+            store_positions: Keep token positions for phrase matching (default: base value)
+        """
+        # Segments score from raw postings; remember the format the index was opened in
+        self._compressed = isinstance(base, CompressedBM25Engine) or bool(getattr(base, "compressed", False))
+        if isinstance(base, CompressedBM25Engine):
+            base = base.decompress()
+        if base is not None:
+            analyzer = analyzer or base.analyzer
+            k1, b, epsilon = base.k1, base.b, base.epsilon
+            store_positions = base.has_positions
+
+        self.analyzer = analyzer or Analyzer()
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.max_buffer_docs = max_buffer_docs
+        self.max_segments = max_segments
+        self.store_positions = store_positions
+
+        self._lock = threading.Lock()
+        self._sealed: List[BM25Engine] = []
+        self._buffer: List[List[str]] = []
+        self._buffer_segment: Optional[BM25Engine] = None
+        self._vocabulary: Dict[str, int] = {}
+        self._doc_freqs = np.zeros(0, dtype=np.int64)
+        self._total_length = 0
+        self._corpus_size = 0
+
+        if base is not None:
+            self._sealed.append(base)
+            self._add_statistics(
+                sorted(base.vocabulary, key=base.vocabulary.__getitem__),
+                np.diff(base.offsets),
+                int(base.doc_lengths.sum()),
+                base.corpus_size
+            )
+        self._view = self._build_view()
+
+    @property
+    def corpus_size(self) -> int:
+        """Number of documents across all segments."""
+        return self._view.corpus_size
+
+    @property
+    def vocabulary_size(self) -> int:
+        """Number of distinct terms across all segments."""
+        return len(self._view.vocabulary)
+
+    @property
+    def nbytes(self) -> int:
+        """Index size in bytes: all segments plus the global statistics."""
+        view = self._view
+        return (
+            sum(segment.nbytes for segment in view.segments)
+            + sum(norms.nbytes for norms in view.doc_norms)
+            + view.idf.nbytes
+            + self._doc_freqs.nbytes
+            + vocabulary_nbytes(view.vocabulary)
+        )
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the index was opened from compressed postings.
+
+        Segments are decompressed in memory (``nbytes`` reports their raw
+        size); a compressed ``BM25Indexer`` saves the merged index compressed.
+        """
+        return self._compressed
+
+    @property
+    def segment_count(self) -> int:
+        """Number of segments, including a non-empty mutable one."""
+        return len(self._view.segments)
+
+    def add_documents(self, texts: List[str]) -> np.ndarray:
+        """Append documents; they are searchable as soon as this returns.
+
+        Args:
+            texts: Document texts
+
+        Returns:
+            Document ids assigned to the new documents
+        """
+        if not texts:
+            return np.zeros(0, dtype=np.int64)
+
+        tokenized_docs = self.analyzer.analyze_batch(texts)
+
+        with self._lock:
+            start = self._corpus_size
+            doc_freqs = Counter(term for tokens in tokenized_docs for term in set(tokens))
+            self._add_statistics(
+                doc_freqs,
+                np.fromiter(doc_freqs.values(), dtype=np.int64, count=len(doc_freqs)),
+                sum(len(tokens) for tokens in tokenized_docs),
+                len(tokenized_docs)
+            )
+
+            self._buffer.extend(tokenized_docs)
+            self._buffer_segment = self._build_segment(self._buffer)
+            if len(self._buffer) >= self.max_buffer_docs:
+                self._seal()
+            if len(self._sealed) > self.max_segments:
+                self._sealed = [self._merge_segments(self._sealed)]
+
+            self._view = self._build_view()
+
+        logger.debug("Documents appended to BM25 index",
+                    added=len(texts),
+                    corpus_size=self._corpus_size,
+                    segment_count=self.segment_count)
+        return np.arange(start, start + len(texts), dtype=np.int64)
+
+    def copy(self) -> "SegmentedBM25Index":
+        """Copy that shares the immutable segments with this index.
+
+        Appending to the copy leaves this index unchanged, so readers of a
+        published index never see it grow between two calls.
+
+        Returns:
+            Independent index over the same documents
+        """
+        with self._lock:
+            clone = copy.copy(self)
+            clone._lock = threading.Lock()
+            clone._sealed = list(self._sealed)
+            clone._buffer = list(self._buffer)
+        return clone
+
+    def merge(self) -> BM25Engine:
+        """Merge all segments (including the mutable one) into a single engine.
+
+        Returns:
+            Engine equivalent to the whole index
+        """
+        with self._lock:
+            self._seal()
+            if len(self._sealed) != 1:
+                self._sealed = [self._merge_segments(self._sealed)]
+                self._view = self._build_view()
+            return self._sealed[0]
+
+    def save(self, path: str) -> None:
+        """Merge and write the index in the flat BM25 format.
+
+        Args:
+            path: File path to write
+        """
+        self.merge().save(path)
+
+    def _seal(self) -> None:
+        """Turn the mutable segment into an immutable one."""
+        if self._buffer_segment is not None:
+            self._sealed.append(self._buffer_segment)
+        self._buffer = []
+        self._buffer_segment = None
+
+    def _build_segment(self, tokenized_docs: List[List[str]]) -> BM25Engine:
+        """Build a segment; its own IDF is unused, global statistics apply."""
+        return BM25Engine.from_tokenized(
+            tokenized_docs, k1=self.k1, b=self.b, epsilon=self.epsilon, analyzer=self.analyzer,
+            store_positions=self.store_positions
+        )
+
+    def _add_statistics(
+        self,
+        terms: Iterable[str],
+        doc_freqs: np.ndarray,
+        total_length: int,
+        doc_count: int
+    ) -> None:
+        """Fold document frequencies and lengths of new documents into the global statistics.
+
+        Args:
+            terms: Terms in the order of ``doc_freqs``
+            doc_freqs: Document frequency of each term among the new documents
+            total_length: Summed length of the new documents
+            doc_count: Number of new documents
+        """
+        # Copy so readers holding the previous view never see new term ids
+        vocabulary = dict(self._vocabulary)
+        term_ids = np.fromiter(
+            (vocabulary.setdefault(term, len(vocabulary)) for term in terms),
+            dtype=np.int64,
+            count=len(doc_freqs)
+        )
+        global_freqs = np.zeros(len(vocabulary), dtype=np.int64)
+        global_freqs[:len(self._doc_freqs)] = self._doc_freqs
+        np.add.at(global_freqs, term_ids, np.asarray(doc_freqs, dtype=np.int64))
+
+        self._vocabulary = vocabulary
+        self._doc_freqs = global_freqs
+        self._total_length += total_length
+        self._corpus_size += doc_count
+
+    def _build_view(self) -> _SegmentView:
+        """Recompute IDF and length norms from the global statistics."""
+        segments = list(self._sealed)
+        if self._buffer_segment is not None:
+            segments.append(self._buffer_segment)
+
+        avgdl = self._total_length / self._corpus_size if self._corpus_size else 0.0
+        bases = []
+        doc_norms = []
+        base = 0
+        for segment in segments:
+            bases.append(base)
+            base += segment.corpus_size
+            if avgdl:
+                lengths = segment.doc_lengths.astype(np.float64)
+                doc_norms.append(self.k1 * (1 - self.b + self.b * lengths / avgdl))
+            else:
+                doc_norms.append(np.zeros(segment.corpus_size, dtype=np.float64))
+
+        return _SegmentView(
+            segments=tuple(segments),
+            bases=tuple(bases),
+            doc_norms=tuple(doc_norms),
+            vocabulary=self._vocabulary,
+            idf=bm25_idf(self._doc_freqs, self._corpus_size, self.epsilon),
+            corpus_size=self._corpus_size
+        )
+
+    def _merge_segments(self, segments: List[BM25Engine]) -> BM25Engine:
+        """Concatenate segment postings into one engine without re-analyzing text.
+
+        Args:
+            segments: Segments in document order
+
+        Returns:
+            Merged engine
+        """
+        vocabulary: Dict[str, int] = {}
+        term_parts, doc_parts, tf_parts = [], [], []
+        base = 0
+        for segment in segments:
+            local_terms = sorted(segment.vocabulary, key=segment.vocabulary.__getitem__)
+            term_ids = np.fromiter(
+                (vocabulary.setdefault(term, len(vocabulary)) for term in local_terms),
+                dtype=np.int64,
+                count=len(local_terms)
+            )
+            term_parts.append(np.repeat(term_ids, np.diff(segment.offsets)))
+            doc_parts.append(segment.doc_ids.astype(np.int64) + base)
+            tf_parts.append(segment.term_freqs)
+            base += segment.corpus_size
+
+        terms = np.concatenate(term_parts)
+        # Stable sort keeps each posting list in ascending document order
+        order = np.argsort(terms, kind="stable")
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(vocabulary)), out=offsets[1:])
+        term_freqs = np.concatenate(tf_parts)
+
+        positions = None
+        if self.store_positions:
+            # Move each posting's block of positions along with the posting
+            starts = np.cumsum(term_freqs) - term_freqs
+            lengths = term_freqs[order]
+            gather = (np.repeat(starts[order] - (np.cumsum(lengths) - lengths), lengths)
+                      + np.arange(int(lengths.sum())))
+            positions = np.concatenate([s.positions for s in segments])[gather]
+
+        merged = BM25Engine(
+            vocabulary=vocabulary,
+            offsets=offsets,
+            doc_ids=np.concatenate(doc_parts)[order].astype(np.int32),
+            term_freqs=term_freqs[order].astype(np.int32, copy=False),
+            doc_lengths=np.concatenate([s.doc_lengths for s in segments]).astype(np.int32, copy=False),
+            k1=self.k1,
+            b=self.b,
+            epsilon=self.epsilon,
+            analyzer=self.analyzer,
+            positions=positions
+        )
+        logger.info("BM25 segments merged",
+                   segment_count=len(segments),
+                   corpus_size=merged.corpus_size,
+                   vocabulary_size=merged.vocabulary_size)
+        return merged
+
+    def score_candidates(
+        self,
+        query_tokens: List[str],
+        eligible: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score only the documents that contain at least one query term.
+
+        Args:
+            query_tokens: Tokenized query
+            eligible: Optional mask of documents to score (global ids); postings
+                of other documents are never scored
+
+        Returns:
+            Tuple of (document ids sorted ascending, their BM25 scores)
+        """
+        view = self._view
+        if len(view.segments) == 1:
+            # A single segment carries exactly the global statistics
+            return view.segments[0].score_candidates(query_tokens, eligible)
+
+        k1 = self.k1
+        parts = []
+        for token in query_tokens:
+            term_id = view.vocabulary.get(token)
+            if term_id is None:
+                continue
+            idf = view.idf[term_id]
+            for segment, base, doc_norms in zip(view.segments, view.bases, view.doc_norms):
+                local_id = segment.vocabulary.get(token)
+                if local_id is None:
+                    continue
+                start, end = segment.offsets[local_id], segment.offsets[local_id + 1]
+                docs = segment.doc_ids[start:end]
+                tf = segment.term_freqs[start:end]
+                if eligible is not None:
+                    keep = eligible[docs.astype(np.int64) + base]
+                    docs, tf = docs[keep], tf[keep]
+                tf = tf.astype(np.float64)
+                parts.append((
+                    docs.astype(np.int64) + base,
+                    idf * (tf * (k1 + 1) / (tf + doc_norms[docs]))
+                ))
+        return sum_contributions(parts)
+
+    def score_candidates_batch(
+        self,
+        tokenized_queries: List[List[str]],
+        eligible: Optional[np.ndarray] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score many queries (sparse matrix product when there is one segment).
+
+        Args:
+            tokenized_queries: Tokenized queries
+            eligible: Optional mask of documents to score (global ids)
+
+        Returns:
+            One (document ids, scores) pair per query
+        """
+        view = self._view
+        if len(view.segments) == 1:
+            return view.segments[0].score_candidates_batch(tokenized_queries, eligible)
+        return [self.score_candidates(query_tokens, eligible) for query_tokens in tokenized_queries]
+
+    def posting_count(self, query_tokens: List[str]) -> int:
+        """Number of postings of the distinct query terms across all segments.
+
+        Args:
+            query_tokens: Tokenized query
+
+        Returns:
+            Sum of global document frequencies
+        """
+        view = self._view
+        return sum(
+            int(self._doc_freqs[view.vocabulary[token]])
+            for token in set(query_tokens) if token in view.vocabulary
+        )
+
+    def get_top_k_pruned(
+        self,
+        query_tokens: List[str],
+        top_k: int,
+        eligible: Optional[np.ndarray] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Pruned top-k (see ``BM25Engine.get_top_k_pruned``) for a single segment.
+
+        Args:
+            query_tokens: Tokenized query
+            top_k: Number of documents to return
+            eligible: Optional mask of documents that may be returned
+            stats: Optional dict receiving pruning statistics
+
+        Returns:
+            Tuple of (document ids, scores), or None while there are several
+            segments (callers then score exhaustively)
+        """
+        view = self._view
+        if len(view.segments) != 1:
+            return None
+        return view.segments[0].get_top_k_pruned(query_tokens, top_k, eligible=eligible, stats=stats)
+
+    @property
+    def has_positions(self) -> bool:
+        """Whether token positions are stored (phrase matching is available)."""
+        return self.store_positions
+
+    def phrase_frequencies(
+        self,
+        phrase_tokens: List[str],
+        doc_ids: np.ndarray,
+        slop: int = 0
+    ) -> np.ndarray:
+        """Count occurrences of a phrase in the given documents, segment by segment.
+
+        Args:
+            phrase_tokens: Analyzed phrase terms, in order
+            doc_ids: Documents to check
+            slop: Allowed displacement of each term from its exact phrase position
+
+        Returns:
+            Phrase occurrence count per document in ``doc_ids``
+
+        Raises:
+            ValueError: If the index was built without positions
+        """
+        if not self.store_positions:
+            raise ValueError("BM25 index was built without token positions")
+        view = self._view
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        counts = np.zeros(len(doc_ids), dtype=np.int64)
+        for segment, base in zip(view.segments, view.bases):
+            inside = (doc_ids >= base) & (doc_ids < base + segment.corpus_size)
+            if inside.any():
+                counts[inside] = segment.phrase_frequencies(phrase_tokens, doc_ids[inside] - base, slop)
+        return counts
+
+    def get_scores(self, query_tokens: List[str]) -> np.ndarray:
+        """Score every document (``BM25Okapi.get_scores`` compatible).
+
+        Args:
+            query_tokens: Tokenized query
+
+        Returns:
+            Array of BM25 scores indexed by document id
+        """
+        candidates, scores = self.score_candidates(query_tokens)
+        dense = np.zeros(self.corpus_size, dtype=np.float64)
+        dense[candidates] = scores
+        return dense
+
+    def get_top_k(self, query_tokens: List[str], top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ``top_k`` highest scoring documents.
+
+        Args:
+            query_tokens: Tokenized query
+            top_k: Number of documents to return
+
+        Returns:
+            Tuple of (document ids, scores) sorted by descending score
+        """
+        candidates, scores = self.score_candidates(query_tokens)
+        order = top_k_order(scores, top_k)
+        return candidates[order], scores[order]
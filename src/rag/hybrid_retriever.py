@@ -1,18 +1,52 @@
 """Hybrid retriever combining BM25 and vector search."""
 
-from typing import List, Optional, Dict, Any, Literal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import List, Optional, Dict, Any, Literal, Callable, Tuple
+import numpy as np
 from .base_retriever import BaseRetriever
 from ..core.base_agent import RetrievalResult
 from .bm25_retriever import BM25Retriever
 from .vector_retriever import VectorRetriever
+from .bm25_engine import top_k_order
+from .reranker import CrossEncoderReranker
 from ..utils.logging import get_logger
 from ..utils.debug_logging import debug_log_method
 
 logger = get_logger(__name__)
 
+# Threads shared by the legs of concurrent queries; a timed-out leg keeps
+# its thread until it finishes
+DEFAULT_LEG_WORKERS = 8
+LEGS = ("bm25", "vector")
+# Candidates fetched from each leg per requested result
+DEFAULT_DEPTH_FACTOR = 2.0
+
 
 class HybridRetriever(BaseRetriever):
-    """Hybrid retriever combining BM25 and vector search."""
+    """Hybrid retriever combining BM25 and vector search.
+
+    The BM25 and vector legs run concurrently on a thread pool (NumPy,
+    torch and Chroma release the GIL), so hybrid latency is that of the
+    slower leg rather than the sum. A leg that fails or exceeds its
+    timeout is dropped and the results of the other leg are returned;
+    only if both legs fail is the error raised. Every fused result carries
+    ``retrieval_timings_ms`` and ``degraded_legs`` in its metadata.
+
+    Fusion runs over NumPy arrays indexed by chunk ordinal; result objects
+    are created only for the final top-k, each annotated with the raw and
+    normalized score and the rank it had in either leg.
+
+    Each leg returns ``top_k * 2`` candidates. In adaptive mode the legs
+    start at ``top_k * initial_depth_factor`` candidates and the depth is
+    doubled (up to ``top_k * max_depth_factor``) only while fewer than
+    ``overlap_threshold`` of the fused top-k were found by both legs;
+    ``depth_stats`` reports the depth actually used.
+
+    With a ``reranker`` the best ``rerank_candidates`` fused results are
+    reordered by a cross-encoder and the top-k of that order is returned.
+    """
     
     def __init__(
         self,
@@ -21,7 +55,16 @@ class HybridRetriever(BaseRetriever):
         fusion_strategy: Literal["rrf", "weighted"] = "rrf",
         bm25_weight: float = 0.5,
         vector_weight: float = 0.5,
-        rrf_k: int = 60
+        rrf_k: int = 60,
+        concurrent_legs: bool = True,
+        bm25_timeout_ms: Optional[float] = None,
+        vector_timeout_ms: Optional[float] = None,
+        adaptive_depth: bool = False,
+        initial_depth_factor: float = 1.0,
+        max_depth_factor: float = 4.0,
+        overlap_threshold: float = 0.5,
+        reranker: Optional[CrossEncoderReranker] = None,
+        rerank_candidates: int = 30
     ):
         """Initialize hybrid retriever.
         
@@ -32,6 +75,15 @@ class HybridRetriever(BaseRetriever):
             bm25_weight: Weight for BM25 scores (for weighted fusion)
             vector_weight: Weight for vector scores (for weighted fusion)
             rrf_k: RRF constant (for RRF fusion)
+            concurrent_legs: Run the BM25 and vector legs concurrently
+            bm25_timeout_ms: Time after which the BM25 leg is dropped (None waits; concurrent only)
+            vector_timeout_ms: Time after which the vector leg is dropped (None waits; concurrent only)
+            adaptive_depth: Start with few candidates per leg and expand while the legs disagree
+            initial_depth_factor: First candidate depth per leg, as a multiple of top_k (adaptive only)
+            max_depth_factor: Largest candidate depth per leg, as a multiple of top_k (adaptive only)
+            overlap_threshold: Share of the fused top-k both legs must have found to stop expanding
+            reranker: Optional cross-encoder applied to the fused results
+            rerank_candidates: Fused results passed to the reranker (at least top_k)
         """
         self.bm25_retriever = bm25_retriever
         self.vector_retriever = vector_retriever
@@ -39,6 +91,23 @@ class HybridRetriever(BaseRetriever):
         self.bm25_weight = bm25_weight
         self.vector_weight = vector_weight
         self.rrf_k = rrf_k
+        self.concurrent_legs = concurrent_legs
+        self.bm25_timeout_ms = bm25_timeout_ms
+        self.vector_timeout_ms = vector_timeout_ms
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.degraded_count = 0
+        self.adaptive_depth = adaptive_depth
+        self.initial_depth_factor = initial_depth_factor
+        self.max_depth_factor = max(initial_depth_factor, max_depth_factor)
+        self.overlap_threshold = overlap_threshold
+        self._depth_lock = threading.Lock()
+        self._depth_queries = 0
+        self._depth_total = 0
+        self._depth_rounds = 0
+        self._depth_expanded_queries = 0
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
     
     @debug_log_method
     def retrieve(
@@ -59,21 +128,301 @@ class HybridRetriever(BaseRetriever):
         """
         logger.debug("Hybrid retrieval", query=query[:50], top_k=top_k, strategy=self.fusion_strategy)
         
-        # Get results from both retrievers
-        bm25_results = self.bm25_retriever.retrieve(query, top_k=top_k * 2, filters=filters)
-        vector_results = self.vector_retriever.retrieve(query, top_k=top_k * 2, filters=filters)
-        
-        if self.fusion_strategy == "rrf":
-            fused_results = self._fuse_rrf(bm25_results, vector_results, top_k)
-        else:
-            fused_results = self._fuse_weighted(bm25_results, vector_results, top_k)
+        start_time = time.perf_counter()
+        depth = self._initial_depth(top_k)
+        timings: Dict[str, float] = {}
+        rounds = 0
+        while True:
+            rounds += 1
+            # Get results from both retrievers
+            bm25_results, vector_results, round_timings, degraded = self._run_legs(
+                lambda depth=depth: self.bm25_retriever.retrieve(query, top_k=depth, filters=filters),
+                lambda depth=depth: self.vector_retriever.retrieve(query, top_k=depth, filters=filters)
+            )
+            self._add_timings(timings, round_timings)
+            # A dropped leg contributes no results
+            bm25_results = bm25_results or []
+            vector_results = vector_results or []
+            fused_results = self._fuse(bm25_results, vector_results, self._fused_count(top_k))
+            if not self._should_expand(fused_results[:top_k], bm25_results, vector_results, top_k, depth, degraded):
+                break
+            depth = self._next_depth(depth, top_k)
+        self._record_depth(depth, rounds)
+        fused_results = self._rerank(query, fused_results, top_k, timings)
+        timings["total"] = (time.perf_counter() - start_time) * 1000
+        fused_results = self._with_timings(fused_results, timings, degraded)
         
         logger.debug("Hybrid retrieval completed", 
                     query=query[:50], 
                     results_count=len(fused_results),
-                    strategy=self.fusion_strategy)
+                    strategy=self.fusion_strategy,
+                    candidate_depth=depth,
+                    degraded_legs=degraded,
+                    **{f"{leg}_ms": elapsed for leg, elapsed in timings.items()})
+        
+        return fused_results
+    
+    @debug_log_method
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[RetrievalResult]]:
+        """Retrieve for several queries with one call per retriever.
+
+        BM25 scores all queries in a single batch and the vector retriever
+        embeds them together; fusion then runs per query exactly as in
+        ``retrieve``.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            filters: Optional metadata filters applied to every query
+
+        Returns:
+            One list of fused RetrievalResult objects per query
+        """
+        logger.debug("Hybrid batch retrieval", query_count=len(queries), top_k=top_k)
+        
+        start_time = time.perf_counter()
+        fused_batches: List[List[RetrievalResult]] = [[] for _ in queries]
+        timings: Dict[str, float] = {}
+        degraded: List[str] = []
+        depth = self._initial_depth(top_k)
+        rounds = 0
+        pending = list(range(len(queries)))
+        while pending:
+            rounds += 1
+            batch_queries = [queries[i] for i in pending]
+            bm25_batches, vector_batches, round_timings, round_degraded = self._run_legs(
+                lambda depth=depth, batch=batch_queries: self.bm25_retriever.retrieve_many(
+                    batch, top_k=depth, filters=filters
+                ),
+                lambda depth=depth, batch=batch_queries: self.vector_retriever.retrieve_many(
+                    batch, top_k=depth, filters=filters
+                )
+            )
+            self._add_timings(timings, round_timings)
+            degraded = sorted(set(degraded) | set(round_degraded), key=LEGS.index)
+            # A dropped leg contributes no results to any query
+            bm25_batches = bm25_batches or [[] for _ in pending]
+            vector_batches = vector_batches or [[] for _ in pending]
+            
+            unstable = []
+            for i, bm25_results, vector_results in zip(pending, bm25_batches, vector_batches):
+                fused_batches[i] = self._fuse(bm25_results, vector_results, self._fused_count(top_k))
+                if self._should_expand(fused_batches[i][:top_k], bm25_results, vector_results, top_k, depth,
+                                       round_degraded):
+                    unstable.append(i)
+                else:
+                    self._record_depth(depth, rounds)
+            pending = unstable
+            depth = self._next_depth(depth, top_k)
+        fused_batches = [
+            self._rerank(query, batch, top_k, timings) for query, batch in zip(queries, fused_batches)
+        ]
+        timings["total"] = (time.perf_counter() - start_time) * 1000
+        
+        return [self._with_timings(batch, timings, degraded) for batch in fused_batches]
+    
+    def depth_stats(self) -> Dict[str, Any]:
+        """Get candidate depth counters.
+        
+        Returns:
+            Dictionary with the number of queries, mean candidates fetched
+            per leg, mean leg rounds per query and queries that expanded
+        """
+        with self._depth_lock:
+            queries = self._depth_queries
+            return {
+                "queries": queries,
+                "mean_depth": self._depth_total / queries if queries else 0.0,
+                "mean_rounds": self._depth_rounds / queries if queries else 0.0,
+                "expanded_queries": self._depth_expanded_queries,
+            }
+    
+    def _fuse(
+        self,
+        bm25_results: List[RetrievalResult],
+        vector_results: List[RetrievalResult],
+        top_k: int
+    ) -> List[RetrievalResult]:
+        """Fuse both legs with the configured strategy."""
+        if self.fusion_strategy == "rrf":
+            return self._fuse_rrf(bm25_results, vector_results, top_k)
+        return self._fuse_weighted(bm25_results, vector_results, top_k)
+    
+    def _fused_count(self, top_k: int) -> int:
+        """Fused results to keep: the reranker's candidates, or top_k."""
+        if self.reranker is None:
+            return top_k
+        return max(top_k, self.rerank_candidates)
+    
+    def _rerank(
+        self,
+        query: str,
+        fused_results: List[RetrievalResult],
+        top_k: int,
+        timings: Dict[str, float]
+    ) -> List[RetrievalResult]:
+        """Rerank fused results if a reranker is configured, timing it."""
+        if self.reranker is None:
+            return fused_results[:top_k]
+        start_time = time.perf_counter()
+        reranked = self.reranker.rerank(query, fused_results, top_k)
+        timings["rerank"] = timings.get("rerank", 0.0) + (time.perf_counter() - start_time) * 1000
+        return reranked
+    
+    def _initial_depth(self, top_k: int) -> int:
+        """Candidates requested from each leg in the first round."""
+        factor = self.initial_depth_factor if self.adaptive_depth else DEFAULT_DEPTH_FACTOR
+        return max(top_k, int(round(top_k * factor)))
+    
+    def _next_depth(self, depth: int, top_k: int) -> int:
+        """Double the depth, capped at the maximum."""
+        return min(depth * 2, max(top_k, int(round(top_k * self.max_depth_factor))))
+    
+    def _should_expand(
+        self,
+        fused_results: List[RetrievalResult],
+        bm25_results: List[RetrievalResult],
+        vector_results: List[RetrievalResult],
+        top_k: int,
+        depth: int,
+        degraded: List[str]
+    ) -> bool:
+        """Whether another round with more candidates could change the fused top-k.
         
-        return fused_results[:top_k]
+        Expansion stops at the maximum depth, when a leg was dropped, when
+        neither leg has more candidates, or once at least
+        ``overlap_threshold`` of the fused top-k were found by both legs.
+        """
+        if not self.adaptive_depth or degraded or not fused_results:
+            return False
+        if depth >= self._next_depth(depth, top_k):
+            return False
+        if len(bm25_results) < depth and len(vector_results) < depth:
+            return False
+        both = sum(
+            r.metadata.get("bm25_rank") is not None and r.metadata.get("vector_rank") is not None
+            for r in fused_results
+        )
+        return both / len(fused_results) < self.overlap_threshold
+    
+    def _record_depth(self, depth: int, rounds: int) -> None:
+        """Count the final candidate depth of one query."""
+        with self._depth_lock:
+            self._depth_queries += 1
+            self._depth_total += depth
+            self._depth_rounds += rounds
+            if rounds > 1:
+                self._depth_expanded_queries += 1
+    
+    @staticmethod
+    def _add_timings(timings: Dict[str, float], round_timings: Dict[str, float]) -> None:
+        """Accumulate per-leg timings over expansion rounds."""
+        for leg, elapsed in round_timings.items():
+            timings[leg] = timings.get(leg, 0.0) + elapsed
+    
+    def close(self) -> None:
+        """Shut down the leg thread pool (waits for running legs)."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def _run_legs(
+        self,
+        bm25_call: Callable[[], Any],
+        vector_call: Callable[[], Any]
+    ) -> Tuple[Any, Any, Dict[str, float], List[str]]:
+        """Run the BM25 and vector legs, concurrently unless disabled.
+        
+        Args:
+            bm25_call: Runs the BM25 leg
+            vector_call: Runs the vector leg
+            
+        Returns:
+            BM25 result, vector result (None for a dropped leg), per-leg
+            timings in milliseconds and the names of dropped legs
+            
+        Raises:
+            Exception: The BM25 leg's error if both legs fail
+        """
+        legs = {"bm25": bm25_call, "vector": vector_call}
+        timeouts = {"bm25": self.bm25_timeout_ms, "vector": self.vector_timeout_ms}
+        outcomes: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+        timings: Dict[str, float] = {}
+        
+        if not self.concurrent_legs:
+            for leg, call in legs.items():
+                start_time = time.perf_counter()
+                try:
+                    outcomes[leg] = call()
+                except Exception as e:
+                    errors[leg] = e
+                timings[leg] = (time.perf_counter() - start_time) * 1000
+        else:
+            executor = self._get_executor()
+            start_time = time.perf_counter()
+            futures: Dict[str, Future] = {}
+            for leg, call in legs.items():
+                futures[leg] = executor.submit(self._timed, call)
+            for leg, future in futures.items():
+                timeout = None
+                if timeouts[leg] is not None:
+                    elapsed = time.perf_counter() - start_time
+                    timeout = max(0.0, timeouts[leg] / 1000 - elapsed)
+                try:
+                    outcomes[leg], timings[leg] = future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    future.cancel()
+                    errors[leg] = TimeoutError(f"{leg} leg exceeded {timeouts[leg]} ms")
+                    timings[leg] = (time.perf_counter() - start_time) * 1000
+                except Exception as e:
+                    errors[leg] = e
+                    timings[leg] = (time.perf_counter() - start_time) * 1000
+        
+        if len(errors) == len(legs):
+            logger.error("Both hybrid retrieval legs failed",
+                        bm25_error=str(errors["bm25"]), vector_error=str(errors["vector"]))
+            raise errors["bm25"]
+        degraded = list(errors)
+        if degraded:
+            self.degraded_count += 1
+            for leg, error in errors.items():
+                logger.warning("Hybrid retrieval leg dropped", leg=leg, error=str(error), elapsed_ms=timings[leg])
+        return outcomes.get("bm25"), outcomes.get("vector"), timings, degraded
+    
+    @staticmethod
+    def _timed(call: Callable[[], Any]) -> Tuple[Any, float]:
+        """Run a leg and measure it on its own thread (excludes queueing)."""
+        start_time = time.perf_counter()
+        result = call()
+        return result, (time.perf_counter() - start_time) * 1000
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the leg thread pool on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=DEFAULT_LEG_WORKERS, thread_name_prefix="hybrid-leg"
+                )
+            return self._executor
+    
+    @staticmethod
+    def _with_timings(
+        results: List[RetrievalResult],
+        timings: Dict[str, float],
+        degraded: List[str]
+    ) -> List[RetrievalResult]:
+        """Add leg timings and dropped legs to the metadata of fused results."""
+        for result in results:
+            result.metadata["retrieval_timings_ms"] = dict(timings)
+            result.metadata["degraded_legs"] = list(degraded)
+        return results
     
     def retrieve_with_scores(
         self,
@@ -111,49 +460,12 @@ class HybridRetriever(BaseRetriever):
         """
         logger.debug("Fusing results with RRF", bm25_count=len(bm25_results), vector_count=len(vector_results))
         
-        # RRF formula: score = 1 / (k + rank)
-        # Create score dictionary mapping chunk_id to RRF score
-        rrf_scores: Dict[str, float] = {}
-        chunk_data: Dict[str, RetrievalResult] = {}
-        
-        # Add BM25 results
-        for rank, result in enumerate(bm25_results, start=1):
-            rrf_score = 1.0 / (self.rrf_k + rank)
-            if result.chunk_id in rrf_scores:
-                rrf_scores[result.chunk_id] += rrf_score
-            else:
-                rrf_scores[result.chunk_id] = rrf_score
-                chunk_data[result.chunk_id] = result
-        
-        # Add vector results
-        for rank, result in enumerate(vector_results, start=1):
-            rrf_score = 1.0 / (self.rrf_k + rank)
-            if result.chunk_id in rrf_scores:
-                rrf_scores[result.chunk_id] += rrf_score
-            else:
-                rrf_scores[result.chunk_id] = rrf_score
-                chunk_data[result.chunk_id] = result
-        
-        # Sort by combined RRF score
-        sorted_chunks = sorted(
-            rrf_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
+        candidates, ranks, raw_scores = self._align(bm25_results, vector_results)
+        # RRF formula: score = sum over legs of 1 / (k + rank)
+        rrf_scores = np.where(ranks > 0, 1.0 / (self.rrf_k + ranks), 0.0)
+        return self._fused_results(
+            candidates, ranks, raw_scores, rrf_scores[0] + rrf_scores[1], top_k
         )
-        
-        # Create fused results
-        fused_results = []
-        for chunk_id, rrf_score in sorted_chunks[:top_k]:
-            result = chunk_data[chunk_id]
-            # Create new result with RRF score
-            fused_results.append(RetrievalResult(
-                chunk_text=result.chunk_text,
-                score=rrf_score,
-                chunk_id=result.chunk_id,
-                metadata=result.metadata
-            ))
-        
-        return fused_results
     
     @debug_log_method
     def _fuse_weighted(
@@ -174,64 +486,108 @@ class HybridRetriever(BaseRetriever):
         """
         logger.debug("Fusing results with weighted scores", bm25_count=len(bm25_results), vector_count=len(vector_results))
         
-        # Normalize scores to 0-1 range for both result sets
-        def normalize_scores(results: List[RetrievalResult]) -> List[RetrievalResult]:
-            if not results:
-                return []
-            
-            scores = [r.score for r in results]
-            min_score = min(scores)
-            max_score = max(scores)
-            score_range = max_score - min_score if max_score != min_score else 1.0
-            
-            normalized = []
-            for result in results:
-                normalized_score = (result.score - min_score) / score_range if score_range > 0 else 0.5
-                normalized.append(RetrievalResult(
-                    chunk_text=result.chunk_text,
-                    score=normalized_score,
-                    chunk_id=result.chunk_id,
-                    metadata=result.metadata
-                ))
-            return normalized
-        
-        normalized_bm25 = normalize_scores(bm25_results)
-        normalized_vector = normalize_scores(vector_results)
-        
-        # Combine scores: final = bm25_weight * bm25_score + vector_weight * vector_score
-        combined_scores: Dict[str, float] = {}
-        chunk_data: Dict[str, RetrievalResult] = {}
-        
-        # Add BM25 scores
-        for result in normalized_bm25:
-            combined_scores[result.chunk_id] = self.bm25_weight * result.score
-            chunk_data[result.chunk_id] = result
-        
-        # Add vector scores
-        for result in normalized_vector:
-            if result.chunk_id in combined_scores:
-                combined_scores[result.chunk_id] += self.vector_weight * result.score
-            else:
-                combined_scores[result.chunk_id] = self.vector_weight * result.score
-                chunk_data[result.chunk_id] = result
-        
-        # Sort by combined score
-        sorted_chunks = sorted(
-            combined_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        candidates, ranks, raw_scores = self._align(bm25_results, vector_results)
+        # Combine min-max normalized scores: final = bm25_weight * bm25 + vector_weight * vector
+        normalized = np.nan_to_num(_normalize(raw_scores), nan=0.0)
+        combined_scores = self.bm25_weight * normalized[0] + self.vector_weight * normalized[1]
+        return self._fused_results(candidates, ranks, raw_scores, combined_scores, top_k)
+    
+    @staticmethod
+    def _align(
+        bm25_results: List[RetrievalResult],
+        vector_results: List[RetrievalResult]
+    ) -> Tuple[List[RetrievalResult], np.ndarray, np.ndarray]:
+        """Map both legs' results onto ordinals of the distinct chunks.
+
+        Ordinals follow first appearance, BM25 results first, which keeps
+        the tie order of the previous dict-based fusion.
+
+        Args:
+            bm25_results: BM25 retrieval results
+            vector_results: Vector retrieval results
+
+        Returns:
+            One result per distinct chunk (its first appearance), ranks of
+            shape (2, chunks) with 0 where a leg missed the chunk, and raw
+            scores of the same shape with NaN where a leg missed it
+        """
+        ordinals: Dict[str, int] = {}
+        candidates: List[RetrievalResult] = []
+        leg_ordinals = []
+        for results in (bm25_results, vector_results):
+            positions = np.empty(len(results), dtype=np.int64)
+            for position, result in enumerate(results):
+                ordinal = ordinals.get(result.chunk_id)
+                if ordinal is None:
+                    ordinal = ordinals[result.chunk_id] = len(candidates)
+                    candidates.append(result)
+                positions[position] = ordinal
+            leg_ordinals.append(positions)
         
-        # Create fused results
+        ranks = np.zeros((2, len(candidates)), dtype=np.int64)
+        raw_scores = np.full((2, len(candidates)), np.nan)
+        for leg, (results, positions) in enumerate(zip((bm25_results, vector_results), leg_ordinals)):
+            scores = np.fromiter((result.score for result in results), dtype=np.float64, count=len(results))
+            # Assigned in reverse so a chunk listed twice keeps its best rank
+            ranks[leg, positions[::-1]] = np.arange(len(results), 0, -1)
+            raw_scores[leg, positions[::-1]] = scores[::-1]
+        return candidates, ranks, raw_scores
+    
+    @staticmethod
+    def _fused_results(
+        candidates: List[RetrievalResult],
+        ranks: np.ndarray,
+        raw_scores: np.ndarray,
+        fused_scores: np.ndarray,
+        top_k: int
+    ) -> List[RetrievalResult]:
+        """Create results for the top-k fused scores with per-leg provenance.
+
+        Args:
+            candidates: One result per distinct chunk
+            ranks: Per-leg ranks (0 where a leg missed the chunk)
+            raw_scores: Per-leg scores (NaN where a leg missed the chunk)
+            fused_scores: Fused score per chunk
+            top_k: Number of results to return
+
+        Returns:
+            Fused results sorted by score, with ``bm25_score``,
+            ``vector_score``, their ``*_score_normalized`` values and
+            ``bm25_rank``/``vector_rank`` in metadata (None where a leg
+            missed the chunk)
+        """
+        normalized = _normalize(raw_scores)
         fused_results = []
-        for chunk_id, combined_score in sorted_chunks[:top_k]:
-            result = chunk_data[chunk_id]
+        for ordinal in top_k_order(fused_scores, top_k).tolist():
+            result = candidates[ordinal]
+            metadata = dict(result.metadata)
+            for leg, name in enumerate(LEGS):
+                found = ranks[leg, ordinal] > 0
+                metadata[f"{name}_score"] = float(raw_scores[leg, ordinal]) if found else None
+                metadata[f"{name}_score_normalized"] = float(normalized[leg, ordinal]) if found else None
+                metadata[f"{name}_rank"] = int(ranks[leg, ordinal]) if found else None
             fused_results.append(RetrievalResult(
                 chunk_text=result.chunk_text,
-                score=combined_score,
+                score=float(fused_scores[ordinal]),
                 chunk_id=result.chunk_id,
-                metadata=result.metadata
+                metadata=metadata
             ))
-        
         return fused_results
 
+
+def _normalize(raw_scores: np.ndarray) -> np.ndarray:
+    """Min-max normalize each leg's scores to [0, 1], ignoring NaN (missing) entries.
+
+    A leg whose scores are all equal normalizes to 0.
+    """
+    normalized = np.full_like(raw_scores, np.nan)
+    for leg in range(raw_scores.shape[0]):
+        present = ~np.isnan(raw_scores[leg])
+        if not present.any():
+            continue
+        scores = raw_scores[leg, present]
+        min_score = scores.min()
+        max_score = scores.max()
+        score_range = max_score - min_score if max_score != min_score else 1.0
+        normalized[leg, present] = (scores - min_score) / score_range
+    return normalized
@@ -0,0 +1,140 @@
+"""Columnar metadata index for filter pushdown."""
+
+from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import fields
+import numpy as np
+from ..ingestion.metadata_store import ChunkMetadata
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# ChunkMetadata attributes usable as filters (text is never indexed)
+INDEXED_ATTRIBUTES = tuple(
+    f.name for f in fields(ChunkMetadata) if f.name not in ("text", "additional_metadata")
+)
+
+# Code of documents that lack a field
+_MISSING = -1
+
+
+class MetadataIndex:
+    """Per-field value codes over chunk metadata, indexed by document id.
+
+    Every field (``ChunkMetadata`` attributes and ``additional_metadata``
+    keys) is dictionary-encoded into an int32 column, so the bitmap of
+    documents with ``field == value`` is a single vectorized comparison and
+    a multi-field filter is the AND of those bitmaps. A key present in
+    ``additional_metadata`` shadows the attribute of the same name, and
+    documents lacking a key never match a filter on it.
+    """
+
+    def __init__(self, records: List[Optional[ChunkMetadata]]):
+        """Build index.
+
+        Args:
+            records: Chunk metadata by document id (None for missing documents)
+        """
+        self.doc_count = len(records)
+        self.present = np.fromiter(
+            (record is not None for record in records), dtype=bool, count=self.doc_count
+        )
+        self._records = records
+        self._columns: Dict[str, Tuple[np.ndarray, Dict[Any, int]]] = {}
+        # Fields with unhashable values are evaluated by scanning records
+        self._unindexed: set = set()
+
+        columns: Dict[str, np.ndarray] = {}
+        dictionaries: Dict[str, Dict[Any, int]] = {}
+        for doc_id, record in enumerate(records):
+            if record is None:
+                continue
+            values = {name: getattr(record, name) for name in INDEXED_ATTRIBUTES}
+            values.update(record.additional_metadata)
+            for key, value in values.items():
+                if key in self._unindexed:
+                    continue
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = np.full(self.doc_count, _MISSING, dtype=np.int32)
+                    dictionaries[key] = {}
+                dictionary = dictionaries[key]
+                try:
+                    code = dictionary.get(value)
+                    if code is None:
+                        code = dictionary[value] = len(dictionary)
+                except TypeError:
+                    self._unindexed.add(key)
+                    del columns[key], dictionaries[key]
+                    continue
+                column[doc_id] = code
+
+        for key, column in columns.items():
+            self._columns[key] = (column, dictionaries[key])
+
+        logger.debug("Metadata index built",
+                    doc_count=self.doc_count,
+                    field_count=len(self._columns),
+                    unindexed_fields=sorted(self._unindexed))
+
+    @property
+    def indexed_fields(self) -> List[str]:
+        """Names of dictionary-encoded fields."""
+        return sorted(self._columns)
+
+    def field_mask(self, key: str, value: Any) -> np.ndarray:
+        """Bitmap of documents whose ``key`` equals ``value``.
+
+        Args:
+            key: Metadata field
+            value: Required value
+
+        Returns:
+            Boolean mask indexed by document id
+        """
+        if key in self._unindexed:
+            return self._scan(key, value)
+
+        column = self._columns.get(key)
+        if column is None:
+            if key == "text":
+                return self._scan(key, value)
+            return np.zeros(self.doc_count, dtype=bool)
+
+        codes, dictionary = column
+        try:
+            code = dictionary.get(value)
+        except TypeError:
+            # Unhashable filter values cannot equal any indexed value
+            return np.zeros(self.doc_count, dtype=bool)
+        if code is None:
+            return np.zeros(self.doc_count, dtype=bool)
+        return codes == code
+
+    def mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Bitmap of documents matching all filters.
+
+        Args:
+            filters: Metadata filters (field -> required value)
+
+        Returns:
+            Boolean mask indexed by document id
+        """
+        mask = self.present.copy()
+        for key, value in filters.items():
+            mask &= self.field_mask(key, value)
+            if not mask.any():
+                break
+        return mask
+
+    def _scan(self, key: str, value: Any) -> np.ndarray:
+        """Evaluate a filter record by record (fields that cannot be encoded)."""
+        def matches(record: Optional[ChunkMetadata]) -> bool:
+            if record is None:
+                return False
+            if key in record.additional_metadata:
+                return record.additional_metadata[key] == value
+            return hasattr(record, key) and getattr(record, key) == value
+
+        return np.fromiter(
+            (matches(record) for record in self._records), dtype=bool, count=self.doc_count
+        )
@@ -0,0 +1,238 @@
+"""Cross-encoder reranking of fused retrieval results."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+from sentence_transformers import CrossEncoder
+from ..core.base_agent import RetrievalResult
+from ..utils.logging import get_logger
+from ..utils.debug_logging import debug_log_method
+
+logger = get_logger(__name__)
+
+DEFAULT_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_SCORE_CACHE_SIZE = 4096
+# Pairs scored before the per-pair latency is known; later batches are sized from the budget
+BUDGET_PROBE_PAIRS = 8
+
+
+class CrossEncoderReranker:
+    """Rerank retrieval results with a small local cross-encoder.
+
+    The cross-encoder reads query and chunk together, which ranks the
+    fused hybrid candidates more precisely than either leg's score, so
+    agents can ask for fewer chunks. Pairs are scored in batches in fused
+    order. With ``max_latency_ms`` set, each batch is sized from the
+    measured per-pair latency to what still fits in the budget (a small
+    probe batch comes first while the latency is unknown); once no pair
+    fits, scoring stops and the unscored tail keeps its fused order below
+    the reranked head. Every query scores at least one pair, so a stale
+    estimate is corrected rather than switching reranking off, and the
+    first (warm-up) batch is not measured. Scores are cached by (query,
+    chunk id).
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANKER_MODEL,
+        batch_size: int = 32,
+        max_latency_ms: Optional[float] = None,
+        cache_size: int = DEFAULT_SCORE_CACHE_SIZE,
+        max_length: int = 256,
+        cache_dir: Optional[str] = None
+    ):
+        """Initialize reranker.
+
+        Args:
+            model_name: Name or path of the cross-encoder model
+            batch_size: Maximum query/chunk pairs per model call
+            max_latency_ms: Per-query scoring budget; batches that would overrun it are not started (None scores all)
+            cache_size: Maximum number of cached (query, chunk id) scores (0 disables)
+            max_length: Maximum tokens of a query/chunk pair
+            cache_dir: Optional cache directory for model
+        """
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.max_latency_ms = max_latency_ms
+        self.cache_size = max(0, cache_size)
+        self.max_length = max_length
+        self.cache_dir = cache_dir
+        self.model = None
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.query_count = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.budget_exceeded = 0
+        self.total_latency_ms = 0.0
+        self.pair_latency_ms: Optional[float] = None
+        self._warmed_up = False
+        self._initialize_model()
+
+    def _initialize_model(self) -> None:
+        """Load the cross-encoder on CPU."""
+        logger.info("Initializing reranker", model=self.model_name, cache_dir=self.cache_dir)
+        try:
+            self.model = CrossEncoder(
+                self.model_name,
+                max_length=self.max_length,
+                device="cpu",
+                cache_folder=self.cache_dir
+            )
+            logger.info("Reranker initialized successfully", model=self.model_name)
+        except Exception as e:
+            logger.error("Failed to initialize reranker", error=str(e), model=self.model_name)
+            raise
+
+    @debug_log_method
+    def rerank(
+        self,
+        query: str,
+        results: List[RetrievalResult],
+        top_k: Optional[int] = None
+    ) -> List[RetrievalResult]:
+        """Reorder results by cross-encoder score.
+
+        Results keep the fused score as ``score`` (also stored in
+        ``metadata["fused_score"]``), so score units do not depend on the
+        budget; the cross-encoder score is ``metadata["rerank_score"]``
+        (None for results left unscored by the latency budget).
+
+        Args:
+            query: Search query
+            results: Fused results, best first
+            top_k: Number of results to return (None returns all)
+
+        Returns:
+            Reranked results
+        """
+        start_time = time.perf_counter()
+        normalized_query = " ".join(query.split())
+        keys = [(normalized_query, result.chunk_id) for result in results]
+        scores: List[Optional[float]] = [None] * len(results)
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    scores[i] = cached
+        hits = sum(score is not None for score in scores)
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        scored = 0
+        over_budget = False
+        while scored < len(missing):
+            limit = self._batch_limit(start_time, first=scored == 0)
+            if limit == 0:
+                over_budget = True
+                break
+            batch = missing[scored:scored + limit]
+            batch_start = time.perf_counter()
+            batch_scores = self.model.predict(
+                [(query, results[i].chunk_text) for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False
+            )
+            self._record_pair_latency((time.perf_counter() - batch_start) * 1000 / len(batch))
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+            scored += len(batch)
+            self._store([keys[i] for i in batch], [scores[i] for i in batch])
+
+        # Scored results by cross-encoder score, then the unscored tail in fused order
+        ranked = sorted(
+            (i for i, score in enumerate(scores) if score is not None),
+            key=lambda i: -scores[i]
+        ) + [i for i, score in enumerate(scores) if score is None]
+        reranked = []
+        for i in ranked[:top_k]:
+            result = results[i]
+            reranked.append(RetrievalResult(
+                chunk_text=result.chunk_text,
+                score=result.score,
+                chunk_id=result.chunk_id,
+                metadata={**result.metadata, "fused_score": result.score, "rerank_score": scores[i]}
+            ))
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        with self._lock:
+            self.query_count += 1
+            self.pairs_scored += scored
+            self.cache_hits += hits
+            self.total_latency_ms += elapsed_ms
+            if over_budget:
+                self.budget_exceeded += 1
+        if over_budget:
+            logger.debug("Rerank latency budget reached", scored=scored + hits, candidates=len(results),
+                         elapsed_ms=elapsed_ms)
+        return reranked
+
+    def stats(self) -> Dict[str, Any]:
+        """Get reranking counters.
+
+        Returns:
+            Dictionary with queries, scored pairs, cache hits, queries that
+            hit the latency budget, the mean latency and the estimated
+            latency of one pair
+        """
+        with self._lock:
+            return {
+                "queries": self.query_count,
+                "pairs_scored": self.pairs_scored,
+                "cache_hits": self.cache_hits,
+                "cache_size": len(self._cache),
+                "budget_exceeded": self.budget_exceeded,
+                "mean_latency_ms": self.total_latency_ms / self.query_count if self.query_count else 0.0,
+                "pair_latency_ms": self.pair_latency_ms,
+            }
+
+    def clear_cache(self) -> None:
+        """Drop cached scores (counters are kept)."""
+        with self._lock:
+            self._cache.clear()
+
+    def _batch_limit(self, start_time: float, first: bool) -> int:
+        """Number of pairs the next batch may score (0 once the budget is used up).
+
+        Args:
+            start_time: ``time.perf_counter()`` at the start of the query
+            first: Whether this is the query's first batch, which scores at
+                least one pair while any budget remains
+
+        Returns:
+            Maximum pairs in the next batch
+        """
+        if self.max_latency_ms is None:
+            return self.batch_size
+        remaining_ms = self.max_latency_ms - (time.perf_counter() - start_time) * 1000
+        if remaining_ms <= 0:
+            return 0
+        if self.pair_latency_ms is None:
+            return min(self.batch_size, BUDGET_PROBE_PAIRS)
+        limit = min(self.batch_size, int(remaining_ms // self.pair_latency_ms))
+        return max(limit, 1) if first else limit
+
+    def _record_pair_latency(self, latency_ms: float) -> None:
+        """Fold a measured per-pair latency into the running estimate.
+
+        The first batch includes one-off model warm-up and is skipped.
+        """
+        with self._lock:
+            if not self._warmed_up:
+                self._warmed_up = True
+            elif self.pair_latency_ms is None:
+                self.pair_latency_ms = latency_ms
+            else:
+                self.pair_latency_ms = 0.7 * self.pair_latency_ms + 0.3 * latency_ms
+
+    def _store(self, keys: List[Tuple[str, str]], scores: List[float]) -> None:
+        """Insert scores into the LRU, evicting the least recently used entries."""
+        if self.cache_size == 0:
+            return
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -1,16 +1,20 @@
 """Vector database abstraction layer."""
 
-from .base import BaseVectorDB, VectorDocument, VectorSearchResult
+from .base import BaseVectorDB, Embedding, VectorDocument, VectorSearchResult, embedding_matrix
 from .chroma_provider import ChromaVectorDB
 from .pinecone_provider import PineconeVectorDB
+from .numpy_provider import NumpyVectorDB
 from .factory import VectorDBFactory
 
 __all__ = [
     "BaseVectorDB",
     "VectorDocument",
     "VectorSearchResult",
+    "Embedding",
+    "embedding_matrix",
     "ChromaVectorDB",
     "PineconeVectorDB",
+    "NumpyVectorDB",
     "VectorDBFactory",
 ]
 
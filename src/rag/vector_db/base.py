@@ -1,8 +1,12 @@
 """Abstract interface for vector database providers."""
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union, Iterable
 from dataclasses import dataclass
+import numpy as np
+
+# Embedding vectors: float32 arrays on the fast path, lists for compatibility
+Embedding = Union[np.ndarray, List[float]]
 
 
 @dataclass
@@ -10,10 +14,30 @@ class VectorDocument:
     """Represents a document with vector embedding."""
     id: str
     text: str
-    embedding: List[float]
+    embedding: Embedding
     metadata: Dict[str, Any]
 
 
+def embedding_matrix(documents: List[VectorDocument]) -> np.ndarray:
+    """Stack document embeddings into one float32 matrix.
+
+    Array embeddings are copied buffer to buffer; list embeddings are still
+    accepted but pay the per-float conversion.
+
+    Args:
+        documents: Documents with embeddings of equal dimension
+
+    Returns:
+        Float32 array of shape (len(documents), dimension)
+
+    Raises:
+        ValueError: If embeddings have different dimensions
+    """
+    if not documents:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.asarray([doc.embedding for doc in documents], dtype=np.float32)
+
+
 @dataclass
 class VectorSearchResult:
     """Result from vector search."""
@@ -55,13 +79,13 @@ class BaseVectorDB(ABC):
     def add_documents(
         self,
         collection_name: str,
-        documents: List[VectorDocument]
+        documents: Iterable[VectorDocument]
     ) -> None:
         """Add documents to the collection.
         
         Args:
             collection_name: Name of the collection
-            documents: List of documents to add
+            documents: Documents to add (any iterable, e.g. a generator)
         """
         pass
     
@@ -69,7 +93,7 @@ class BaseVectorDB(ABC):
     def search(
         self,
         collection_name: str,
-        query_embedding: List[float],
+        query_embedding: Embedding,
         top_k: int = 10,
         filters: Optional[Dict[str, Any]] = None
     ) -> List[VectorSearchResult]:
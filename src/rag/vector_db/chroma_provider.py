@@ -1,17 +1,73 @@
 """ChromaDB vector database provider implementation."""
 
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+import numpy as np
 import chromadb
 from chromadb.config import Settings
 from ...utils.logging import get_logger
 from ...utils.debug_logging import debug_log_method
-from .base import BaseVectorDB, VectorDocument, VectorSearchResult
+from .base import BaseVectorDB, Embedding, VectorDocument, VectorSearchResult, embedding_matrix
 
 logger = get_logger(__name__)
 
+DEFAULT_BATCH_SIZE = 1000
+SUPPORTED_SPACES = ("cosine", "l2", "ip")
+# Sentence-transformer embeddings are compared by angle
+DEFAULT_SPACE = "cosine"
+
+
+def distance_to_score(distance: float, space: str) -> float:
+    """Convert a Chroma distance to a similarity score (higher is better).
+
+    ``cosine`` and ``ip`` distances are ``1 - similarity``; ``l2`` distances
+    are squared Euclidean and map to ``1 / (1 + distance)``, as in the NumPy
+    provider.
+
+    Args:
+        distance: Distance returned by Chroma
+        space: HNSW space of the collection
+
+    Returns:
+        Similarity score
+    """
+    if space == "l2":
+        return 1.0 / (1.0 + distance)
+    return 1.0 - distance
+
+
+def _hnsw_setting(collection, configuration_key: str, metadata_key: str, default: Any = None) -> Any:
+    """Read an HNSW setting from a collection's configuration or metadata."""
+    configuration = getattr(collection, "configuration", None) or {}
+    hnsw = configuration.get("hnsw") or {}
+    if hnsw.get(configuration_key) is not None:
+        return hnsw[configuration_key]
+    return (collection.metadata or {}).get(metadata_key, default)
+
+
+def _batched(documents: Iterable[VectorDocument], batch_size: int) -> Iterator[List[VectorDocument]]:
+    """Split an iterable of documents into lists of at most ``batch_size``."""
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
 
 class ChromaVectorDB(BaseVectorDB):
-    """ChromaDB implementation of vector database interface."""
+    """ChromaDB implementation of vector database interface.
+
+    Collection handles are cached by name, so searches and status checks
+    do not list collections or fetch the handle on every call. The cache
+    is invalidated when this instance creates or deletes a collection.
+
+    New collections are HNSW indexes in ``hnsw_space`` (cosine by default)
+    with the configured graph degree and ``ef`` values; scores are
+    converted from each collection's own space.
+    """
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize ChromaDB client.
@@ -20,14 +76,34 @@ class ChromaVectorDB(BaseVectorDB):
             config: Configuration dictionary with:
                 - persist_directory: Directory for persistent storage
                 - in_memory: Whether to use in-memory mode
+                - batch_size: Documents per write (capped at Chroma's maximum batch size)
+                - writer_thread: Whether to write batches on a background thread
+                - hnsw_space: Distance of new collections ("cosine", "l2" or "ip")
+                - hnsw_m: Graph degree of new collections (None keeps Chroma's default)
+                - hnsw_construction_ef: Candidate list size while building (None keeps Chroma's default)
+                - hnsw_search_ef: Candidate list size while searching, also applied to
+                  existing collections (None keeps the collection's value)
+
+        Raises:
+            ValueError: If hnsw_space is not supported
         """
         self.persist_directory = config.get("persist_directory", "data/vector_db")
         self.in_memory = config.get("in_memory", False)
+        self.batch_size = config.get("batch_size", DEFAULT_BATCH_SIZE)
+        self.writer_thread = config.get("writer_thread", False)
+        self.hnsw_space = config.get("hnsw_space", DEFAULT_SPACE)
+        self.hnsw_m = config.get("hnsw_m")
+        self.hnsw_construction_ef = config.get("hnsw_construction_ef")
+        self.hnsw_search_ef = config.get("hnsw_search_ef")
+        if self.hnsw_space not in SUPPORTED_SPACES:
+            raise ValueError(f"Unsupported HNSW space: {self.hnsw_space}. Supported: {SUPPORTED_SPACES}")
         self.client = None
+        self._collections: Dict[str, Any] = {}
         self._initialize_client()
     
     def _initialize_client(self) -> None:
         """Initialize ChromaDB client."""
+        self._collections.clear()
         if self.in_memory:
             self.client = chromadb.Client()
         else:
@@ -48,6 +124,12 @@ class ChromaVectorDB(BaseVectorDB):
         # Already initialized in __init__, but update config if needed
         self.persist_directory = config.get("persist_directory", self.persist_directory)
         self.in_memory = config.get("in_memory", self.in_memory)
+        self.batch_size = config.get("batch_size", self.batch_size)
+        self.writer_thread = config.get("writer_thread", self.writer_thread)
+        self.hnsw_space = config.get("hnsw_space", self.hnsw_space)
+        self.hnsw_m = config.get("hnsw_m", self.hnsw_m)
+        self.hnsw_construction_ef = config.get("hnsw_construction_ef", self.hnsw_construction_ef)
+        self.hnsw_search_ef = config.get("hnsw_search_ef", self.hnsw_search_ef)
         if self.client is None:
             self._initialize_client()
 
@@ -71,51 +153,122 @@ class ChromaVectorDB(BaseVectorDB):
         
         # ChromaDB doesn't require explicit dimension specification
         # but we can store it in metadata
-        collection_metadata = metadata or {}
+        collection_metadata = dict(metadata or {})
         collection_metadata["embedding_dimension"] = embedding_dimension
+        hnsw_settings = {
+            "hnsw:space": self.hnsw_space,
+            "hnsw:M": self.hnsw_m,
+            "hnsw:construction_ef": self.hnsw_construction_ef,
+            "hnsw:search_ef": self.hnsw_search_ef,
+        }
+        for key, value in hnsw_settings.items():
+            if value is not None:
+                collection_metadata.setdefault(key, value)
         
-        self.client.create_collection(
+        self._collections[collection_name] = self.client.create_collection(
             name=collection_name,
             metadata=collection_metadata
         )
-        logger.info("Collection created", collection=collection_name, dimension=embedding_dimension)
+        logger.info("Collection created",
+                   collection=collection_name,
+                   dimension=embedding_dimension,
+                   space=collection_metadata["hnsw:space"])
 
     @debug_log_method
     def add_documents(
         self,
         collection_name: str,
-        documents: List[VectorDocument]
+        documents: Iterable[VectorDocument]
     ) -> None:
         """Add documents to the collection.
+
+        Documents are consumed lazily and written in batches of
+        ``batch_size``, so a generator producing embeddings slice by slice
+        never has more than a few batches in memory. With ``writer_thread``
+        the next batch is prepared while the previous one is being written.
         
         Args:
             collection_name: Name of the collection
-            documents: List of documents to add
+            documents: Documents to add (any iterable, e.g. a generator)
         """
-        if not self.collection_exists(collection_name):
-            raise ValueError(f"Collection does not exist: {collection_name}")
-        
-        collection = self.client.get_collection(collection_name)
-        
-        # Prepare data for ChromaDB
-        ids = [doc.id for doc in documents]
-        texts = [doc.text for doc in documents]
-        embeddings = [doc.embedding for doc in documents]
-        metadatas = [doc.metadata for doc in documents]
-        
+        collection = self._get_collection(collection_name)
+        batches = _batched(documents, self._write_batch_size())
+        if self.writer_thread:
+            count = self._write_in_background(collection, batches)
+        else:
+            count = 0
+            for batch in batches:
+                self._write_batch(collection, batch)
+                count += len(batch)
+        logger.info("Documents added", collection=collection_name, count=count)
+
+    def _write_batch_size(self) -> int:
+        """Configured batch size, capped at the client's maximum batch size."""
+        batch_size = max(1, self.batch_size)
+        get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+        if get_max_batch_size is not None:
+            batch_size = min(batch_size, get_max_batch_size())
+        return batch_size
+
+    @staticmethod
+    def _write_batch(collection, batch: List[VectorDocument]) -> None:
+        """Write one batch of documents."""
         collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas
+            ids=[doc.id for doc in batch],
+            # Chroma accepts a float32 matrix directly, avoiding per-float lists
+            embeddings=embedding_matrix(batch),
+            documents=[doc.text for doc in batch],
+            metadatas=[doc.metadata for doc in batch]
         )
-        logger.info("Documents added", collection=collection_name, count=len(documents))
+
+    def _write_in_background(self, collection, batches: Iterator[List[VectorDocument]]) -> int:
+        """Write batches on a writer thread while the caller produces the next ones.
+
+        The queue holds at most two batches, which bounds memory when the
+        producer is faster than the writes.
+
+        Returns:
+            Number of documents written
+
+        Raises:
+            Exception: The first error raised by the producer or the writer
+        """
+        pending: "queue.Queue[Optional[List[VectorDocument]]]" = queue.Queue(maxsize=2)
+        errors: List[BaseException] = []
+        written = [0]
+
+        def write() -> None:
+            while True:
+                batch = pending.get()
+                if batch is None:
+                    return
+                if errors:
+                    continue  # drain after a failure so the producer never blocks
+                try:
+                    self._write_batch(collection, batch)
+                    written[0] += len(batch)
+                except BaseException as e:
+                    errors.append(e)
+
+        writer = threading.Thread(target=write, name="chroma-writer", daemon=True)
+        writer.start()
+        try:
+            for batch in batches:
+                if errors:
+                    break
+                pending.put(batch)
+        finally:
+            pending.put(None)
+            writer.join()
+        if errors:
+            raise errors[0]
+        return written[0]
 
     @debug_log_method
     def search(
         self,
         collection_name: str,
-        query_embedding: List[float],
+        query_embedding: Embedding,
         top_k: int = 10,
         filters: Optional[Dict[str, Any]] = None
     ) -> List[VectorSearchResult]:
@@ -130,10 +283,7 @@ class ChromaVectorDB(BaseVectorDB):
         Returns:
             List of search results sorted by relevance
         """
-        if not self.collection_exists(collection_name):
-            raise ValueError(f"Collection does not exist: {collection_name}")
-        
-        collection = self.client.get_collection(collection_name)
+        collection = self._get_collection(collection_name)
         
         # Convert filters to ChromaDB where clause format
         where_clause = None
@@ -141,19 +291,26 @@ class ChromaVectorDB(BaseVectorDB):
             where_clause = filters
         
         # Perform search
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            where=where_clause
-        )
+        try:
+            results = collection.query(
+                query_embeddings=[np.asarray(query_embedding, dtype=np.float32)],
+                n_results=top_k,
+                where=where_clause
+            )
+        except Exception:
+            # The collection may have been deleted or recreated elsewhere
+            self._collections.pop(collection_name, None)
+            raise
         
         # Convert to VectorSearchResult format
         search_results = []
         if results["ids"] and len(results["ids"][0]) > 0:
+            # Collections created before spaces were configurable are l2
+            space = _hnsw_setting(collection, "space", "hnsw:space", "l2")
             for i in range(len(results["ids"][0])):
                 # ChromaDB returns distances, convert to similarity scores
                 distance = results["distances"][0][i] if results.get("distances") else 0.0
-                score = 1.0 / (1.0 + distance)  # Convert distance to similarity
+                score = distance_to_score(distance, space)
                 
                 search_results.append(VectorSearchResult(
                     document_id=results["ids"][0][i],
@@ -175,6 +332,7 @@ class ChromaVectorDB(BaseVectorDB):
             logger.warning("Collection does not exist", collection=collection_name)
             return
         
+        self._collections.pop(collection_name, None)
         self.client.delete_collection(collection_name)
         logger.info("Collection deleted", collection=collection_name)
     
@@ -187,6 +345,8 @@ class ChromaVectorDB(BaseVectorDB):
         Returns:
             True if collection exists, False otherwise
         """
+        if collection_name in self._collections:
+            return True
         try:
             collections = self.client.list_collections()
             return any(col.name == collection_name for col in collections)
@@ -194,6 +354,60 @@ class ChromaVectorDB(BaseVectorDB):
             logger.error("Error checking collection existence", error=str(e))
             return False
     
+    def _get_collection(self, collection_name: str):
+        """Get a collection handle, fetching it from the client on first use.
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            Chroma collection handle
+            
+        Raises:
+            ValueError: If collection does not exist
+        """
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            if not self.collection_exists(collection_name):
+                raise ValueError(f"Collection does not exist: {collection_name}")
+            collection = self.client.get_collection(collection_name)
+            self._collections[collection_name] = collection
+            if (self.hnsw_search_ef is not None
+                    and _hnsw_setting(collection, "ef_search", "hnsw:search_ef") != self.hnsw_search_ef):
+                collection = self.set_search_ef(collection_name, self.hnsw_search_ef)
+        return collection
+    
+    def set_search_ef(self, collection_name: str, search_ef: int):
+        """Change the HNSW search candidate list size of an existing collection.
+        
+        Larger values trade query latency for recall. The embedded Chroma
+        client uses the new value once the collection's index is next
+        loaded; ``hnsw_search_ef`` is applied when a collection is first
+        opened, before any query loads it.
+        
+        Args:
+            collection_name: Name of the collection
+            search_ef: New ``ef`` used while searching
+            
+        Returns:
+            Refreshed collection handle
+            
+        Raises:
+            ValueError: If collection does not exist
+        """
+        collection = self._get_collection(collection_name)
+        try:
+            collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+        except TypeError:
+            # chromadb < 1.0 has no collection configuration; ef is fixed at creation
+            logger.warning("search_ef of existing collections cannot be changed with this chromadb version",
+                           collection=collection_name)
+            return collection
+        collection = self.client.get_collection(collection_name)
+        self._collections[collection_name] = collection
+        logger.info("HNSW search_ef updated", collection=collection_name, search_ef=search_ef)
+        return collection
+    
     def get_collection_stats(self, collection_name: str) -> Dict[str, Any]:
         """Get statistics about a collection.
         
@@ -203,10 +417,7 @@ class ChromaVectorDB(BaseVectorDB):
         Returns:
             Dictionary with collection statistics (count, dimension, etc.)
         """
-        if not self.collection_exists(collection_name):
-            raise ValueError(f"Collection does not exist: {collection_name}")
-        
-        collection = self.client.get_collection(collection_name)
+        collection = self._get_collection(collection_name)
         count = collection.count()
         
         # Get dimension from metadata or sample embedding
@@ -222,6 +433,8 @@ class ChromaVectorDB(BaseVectorDB):
         return {
             "count": count,
             "dimension": dimension,
+            "space": _hnsw_setting(collection, "space", "hnsw:space", "l2"),
+            "search_ef": _hnsw_setting(collection, "ef_search", "hnsw:search_ef"),
             "metadata": collection.metadata or {}
         }
     
@@ -229,6 +442,7 @@ class ChromaVectorDB(BaseVectorDB):
         """Close connections and cleanup resources."""
         # ChromaDB persistent client doesn't need explicit close
         # but we can reset the client reference
+        self._collections.clear()
         self.client = None
         logger.info("ChromaDB client closed")
 
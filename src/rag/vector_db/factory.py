@@ -4,6 +4,7 @@ from typing import Dict, Any
 from .base import BaseVectorDB
 from .chroma_provider import ChromaVectorDB
 from .pinecone_provider import PineconeVectorDB
+from .numpy_provider import NumpyVectorDB
 from ...utils.logging import get_logger
 from ...utils.debug_logging import debug_log_method
 
@@ -19,7 +20,7 @@ class VectorDBFactory:
         """Create a vector DB provider instance.
 
         Args:
-            provider: Provider name ("chroma", "pinecone", etc.)
+            provider: Provider name ("chroma", "pinecone", "numpy", etc.)
             config: Provider-specific configuration
 
         Returns:
@@ -36,6 +37,9 @@ class VectorDBFactory:
         elif provider == "pinecone":
             logger.info("Creating Pinecone provider")
             return PineconeVectorDB(config)
+        elif provider == "numpy":
+            logger.info("Creating NumPy provider")
+            return NumpyVectorDB(config)
         else:
             raise ValueError(f"Unsupported vector DB provider: {provider}")
 
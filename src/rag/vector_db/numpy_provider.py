@@ -0,0 +1,659 @@
+"""NumPy exact-search vector database provider implementation."""
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+import numpy as np
+from ...utils.logging import get_logger
+from ...utils.debug_logging import debug_log_method
+from .base import BaseVectorDB, Embedding, VectorDocument, VectorSearchResult, embedding_matrix
+
+logger = get_logger(__name__)
+
+EMBEDDINGS_FILE = "embeddings.bin"
+DOCUMENTS_FILE = "documents.jsonl"
+COLLECTION_FILE = "collection.json"
+
+SUPPORTED_METRICS = ("cosine", "l2", "ip")
+
+# Code of documents that lack a metadata field
+_MISSING = -1
+
+
+class _Rows:
+    """Immutable view of a collection's documents at one point in time.
+
+    ``embeddings`` holds ``count`` rows; row ``i`` belongs to ``ids[i]``.
+    The id, text and metadata lists are append-only and shared with later
+    views, so a view reads only their first ``count`` entries. Row norms and
+    dictionary-encoded metadata columns are derived lazily per view.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        self.embeddings = embeddings
+        self.count = len(embeddings)
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self._norms: Optional[np.ndarray] = None
+        self._columns: Dict[str, Optional[Tuple[np.ndarray, Dict[Any, int]]]] = {}
+
+    @property
+    def norms(self) -> np.ndarray:
+        """L2 norm of every stored embedding (float32)."""
+        if self._norms is None:
+            self._norms = np.linalg.norm(self.embeddings, axis=1).astype(np.float32)
+        return self._norms
+
+    def column(self, key: str) -> Optional[Tuple[np.ndarray, Dict[Any, int]]]:
+        """Dictionary-encoded int32 column of ``key`` (None if unhashable)."""
+        if key not in self._columns:
+            codes = np.full(self.count, _MISSING, dtype=np.int32)
+            dictionary: Dict[Any, int] = {}
+            try:
+                for row in range(self.count):
+                    metadata = self.metadatas[row]
+                    if key in metadata:
+                        value = metadata[key]
+                        code = dictionary.get(value)
+                        if code is None:
+                            code = dictionary[value] = len(dictionary)
+                        codes[row] = code
+            except TypeError:
+                self._columns[key] = None
+            else:
+                self._columns[key] = (codes, dictionary)
+        return self._columns[key]
+
+
+class _Collection:
+    """In-memory state of one collection.
+
+    Embeddings are a single ``(count, dimension)`` matrix, memory-mapped when
+    loaded from disk. In memory, rows are appended into a buffer with spare
+    capacity, so repeated adds copy each row a constant number of times.
+    Searches read ``rows`` once and use that view throughout; an add builds
+    the next view aside and publishes it with a single assignment.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        metadata: Dict[str, Any],
+        embeddings: np.ndarray,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        documents_bytes: int = 0
+    ):
+        self.dimension = dimension
+        self.metadata = metadata
+        self.rows = _Rows(embeddings, ids, texts, metadatas)
+        self.id_set = set(ids)
+        # Length of the persisted documents file
+        self.documents_bytes = documents_bytes
+        self._storage: Optional[np.ndarray] = None
+
+    @property
+    def count(self) -> int:
+        return self.rows.count
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.rows.embeddings.dtype
+
+    def append(
+        self,
+        embeddings: np.ndarray,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        matrix: Optional[np.ndarray] = None
+    ) -> None:
+        """Append rows and publish a new view.
+
+        Rows already published are never written, so a search holding the
+        previous view is unaffected.
+
+        Args:
+            embeddings: New rows, already in the storage dtype
+            ids: Document ids
+            texts: Document texts
+            metadatas: Document metadata
+            matrix: Full matrix including the new rows (e.g. a re-mapped
+                file); if None the rows are copied into the in-memory buffer
+        """
+        rows = self.rows
+        if matrix is not None:
+            self._storage = None
+        else:
+            count, needed = rows.count, rows.count + len(embeddings)
+            if self._storage is None or needed > len(self._storage):
+                # Grow geometrically; the first append also copies a memory-mapped matrix
+                capacity = max(needed, 2 * (len(self._storage) if self._storage is not None else count))
+                storage = np.empty((capacity, self.dimension), dtype=rows.embeddings.dtype)
+                storage[:count] = rows.embeddings
+                self._storage = storage
+            self._storage[count:needed] = embeddings
+            matrix = self._storage[:needed]
+        rows.ids.extend(ids)
+        rows.texts.extend(texts)
+        rows.metadatas.extend(metadatas)
+        self.id_set.update(ids)
+        self.rows = _Rows(matrix, rows.ids, rows.texts, rows.metadatas)
+
+
+class NumpyVectorDB(BaseVectorDB):
+    """Exact (brute-force) vector search over NumPy arrays.
+
+    Each collection is a directory holding ``embeddings.bin`` (raw rows, one
+    per document), ``documents.jsonl`` (id, text and metadata per line, in
+    row order) and ``collection.json``, whose row count and documents length
+    commit each add; adds append to both files. Embeddings are memory-mapped at load, so opening a
+    large collection is cheap and pages are shared between processes. A query
+    is one matrix-vector product plus ``argpartition``; metadata filters are
+    evaluated as boolean masks over dictionary-encoded columns.
+
+    Adds, creates and deletes are serialized by a lock; searches take no
+    lock and see each collection either before or after an add.
+
+    Filters use the Chroma ``where`` syntax: ``{"field": value}``,
+    ``{"field": {"$eq"|"$ne"|"$in"|"$nin": ...}}`` and ``{"$and"|"$or": [...]}``.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize NumPy vector DB.
+
+        Args:
+            config: Configuration dictionary with:
+                - persist_directory: Directory for persistent storage
+                - in_memory: Whether to skip persistence
+                - metric: Similarity metric ("cosine", "l2" or "ip")
+                - dtype: Storage dtype of embeddings ("float32" or "float16")
+                - mmap: Whether to memory-map embeddings at load
+        """
+        self.persist_directory = config.get("persist_directory", "data/vector_db_numpy")
+        self.in_memory = config.get("in_memory", False)
+        self.metric = config.get("metric", "cosine")
+        self.dtype = np.dtype(config.get("dtype", "float32"))
+        self.mmap = config.get("mmap", True)
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.RLock()
+        self._validate()
+        logger.info("NumPy vector DB initialized",
+                   persist_directory=self.persist_directory,
+                   in_memory=self.in_memory,
+                   metric=self.metric)
+
+    def _validate(self) -> None:
+        """Validate configuration values."""
+        if self.metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Unsupported metric: {self.metric}. Supported: {SUPPORTED_METRICS}")
+        if self.dtype not in (np.dtype(np.float32), np.dtype(np.float16)):
+            raise ValueError(f"Unsupported embedding dtype: {self.dtype}")
+
+    def initialize(self, config: Dict[str, Any]) -> None:
+        """Initialize the vector database connection.
+
+        Args:
+            config: Provider-specific configuration dictionary
+        """
+        self.persist_directory = config.get("persist_directory", self.persist_directory)
+        self.in_memory = config.get("in_memory", self.in_memory)
+        self.metric = config.get("metric", self.metric)
+        self.dtype = np.dtype(config.get("dtype", self.dtype))
+        self.mmap = config.get("mmap", self.mmap)
+        self._validate()
+        self._collections = {}
+
+    def _collection_dir(self, collection_name: str) -> Path:
+        """Directory of a persisted collection."""
+        return Path(self.persist_directory) / collection_name
+
+    def _get(self, collection_name: str) -> _Collection:
+        """Return a collection, loading it from disk on first access.
+
+        Raises:
+            ValueError: If collection does not exist
+        """
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+        with self._lock:
+            return self._load(collection_name)
+
+    def _load(self, collection_name: str) -> _Collection:
+        """Load a collection from disk (called with the lock held).
+
+        Raises:
+            ValueError: If collection does not exist
+        """
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+
+        directory = self._collection_dir(collection_name)
+        if self.in_memory or not (directory / COLLECTION_FILE).exists():
+            raise ValueError(f"Collection does not exist: {collection_name}")
+
+        with open(directory / COLLECTION_FILE, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        dimension = header["dimension"]
+
+        dtype = np.dtype(header.get("dtype", self.dtype))
+        count = header.get("count", 0)
+        documents_bytes = header.get("documents_bytes", 0)
+        ids, texts, metadatas = [], [], []
+        if count:
+            # Files may extend past the header after an interrupted add; only counted rows are read
+            embeddings = self._map_embeddings(directory, dtype, count, dimension)
+            with open(directory / DOCUMENTS_FILE, "rb") as f:
+                # Newlines inside values are escaped by JSON, so "\n" only ends records
+                lines = f.read(documents_bytes).split(b"\n")
+            for line in lines[:count]:
+                document = json.loads(line)
+                ids.append(document["id"])
+                texts.append(document["text"])
+                metadatas.append(document["metadata"])
+        else:
+            embeddings = np.empty((0, dimension), dtype=dtype)
+
+        collection = _Collection(
+            dimension, header.get("metadata", {}), embeddings, ids, texts, metadatas,
+            documents_bytes=documents_bytes
+        )
+        self._collections[collection_name] = collection
+        logger.info("Collection loaded", collection=collection_name, count=collection.count,
+                   memory_mapped=isinstance(embeddings, np.memmap))
+        return collection
+
+    def _map_embeddings(self, directory: Path, dtype: np.dtype, count: int, dimension: int) -> np.ndarray:
+        """Read (or memory-map) the first ``count`` rows of the embeddings file."""
+        path = directory / EMBEDDINGS_FILE
+        if self.mmap:
+            return np.memmap(path, dtype=dtype, mode="r", shape=(count, dimension))
+        return np.fromfile(path, dtype=dtype, count=count * dimension).reshape(count, dimension)
+
+    def _append_files(
+        self,
+        collection_name: str,
+        collection: _Collection,
+        embeddings: np.ndarray,
+        documents: List[VectorDocument]
+    ) -> None:
+        """Append rows to the collection files, before ``collection`` is updated.
+
+        Both files are first truncated to the sizes the header records, which
+        drops anything an interrupted add left behind.
+        """
+        directory = self._collection_dir(collection_name)
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = b"".join(
+            (json.dumps({"id": doc.id, "text": doc.text, "metadata": dict(doc.metadata)},
+                        ensure_ascii=False) + "\n").encode("utf-8")
+            for doc in documents
+        )
+
+        row_bytes = collection.dimension * collection.dtype.itemsize
+        for name, size, data in (
+            (EMBEDDINGS_FILE, collection.count * row_bytes, np.ascontiguousarray(embeddings).tobytes()),
+            (DOCUMENTS_FILE, collection.documents_bytes, lines),
+        ):
+            path = directory / name
+            with open(path, "r+b" if path.exists() else "wb") as f:
+                f.truncate(size)
+                f.seek(size)
+                f.write(data)
+        collection.documents_bytes += len(lines)
+
+    def _write_header(self, collection_name: str, collection: _Collection) -> None:
+        """Write the collection header, which commits an add (replaced atomically)."""
+        if self.in_memory:
+            return
+
+        directory = self._collection_dir(collection_name)
+        directory.mkdir(parents=True, exist_ok=True)
+        self._write_json(directory / COLLECTION_FILE, {
+            "dimension": collection.dimension,
+            "dtype": collection.dtype.name,
+            "count": collection.count,
+            "documents_bytes": collection.documents_bytes,
+            "metadata": collection.metadata,
+        })
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]) -> None:
+        """Write JSON through a temporary file and rename it into place."""
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @debug_log_method
+    def create_collection(
+        self,
+        collection_name: str,
+        embedding_dimension: int,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Create a new collection/index.
+
+        Args:
+            collection_name: Name of the collection to create
+            embedding_dimension: Dimension of embeddings (e.g., 384, 768)
+            metadata: Optional metadata for the collection
+        """
+        with self._lock:
+            self._create_collection(collection_name, embedding_dimension, metadata)
+
+    def _create_collection(
+        self,
+        collection_name: str,
+        embedding_dimension: int,
+        metadata: Optional[Dict[str, Any]]
+    ) -> None:
+        """Create a collection (called with the lock held)."""
+        if self.collection_exists(collection_name):
+            logger.warning("Collection already exists", collection=collection_name)
+            return
+
+        collection_metadata = dict(metadata or {})
+        collection_metadata["embedding_dimension"] = embedding_dimension
+        collection = _Collection(
+            embedding_dimension,
+            collection_metadata,
+            np.empty((0, embedding_dimension), dtype=self.dtype),
+            [], [], []
+        )
+        self._collections[collection_name] = collection
+        self._write_header(collection_name, collection)
+        logger.info("Collection created", collection=collection_name, dimension=embedding_dimension)
+
+    @debug_log_method
+    def add_documents(
+        self,
+        collection_name: str,
+        documents: Iterable[VectorDocument]
+    ) -> None:
+        """Add documents to the collection.
+
+        Documents whose id is already stored are skipped, as in Chroma.
+        The new rows are appended to the collection files once the whole
+        iterable is consumed, so the cost of an add does not grow with the
+        collection size.
+
+        Args:
+            collection_name: Name of the collection
+            documents: Documents to add (any iterable, e.g. a generator)
+
+        Raises:
+            ValueError: If collection does not exist or an embedding has the wrong dimension
+        """
+        with self._lock:
+            self._add_documents(collection_name, documents)
+
+    def _add_documents(self, collection_name: str, documents: Iterable[VectorDocument]) -> None:
+        """Add documents (called with the lock held)."""
+        collection = self._get(collection_name)
+
+        new_documents = []
+        seen = set()
+        total = 0
+        for doc in documents:
+            total += 1
+            if doc.id in collection.id_set or doc.id in seen:
+                continue
+            seen.add(doc.id)
+            new_documents.append(doc)
+
+        skipped = total - len(new_documents)
+        if skipped:
+            logger.warning("Skipping documents with existing ids", collection=collection_name, count=skipped)
+        if not new_documents:
+            return
+
+        embeddings = embedding_matrix(new_documents)
+        if embeddings.ndim != 2 or embeddings.shape[1] != collection.dimension:
+            raise ValueError(
+                f"Embedding dimension mismatch for {collection_name}: "
+                f"expected {collection.dimension}, got {embeddings.shape[-1]}"
+            )
+
+        embeddings = embeddings.astype(collection.dtype, copy=False)
+        matrix = None
+        if not self.in_memory:
+            self._append_files(collection_name, collection, embeddings, new_documents)
+            if self.mmap:
+                matrix = self._map_embeddings(
+                    self._collection_dir(collection_name), collection.dtype,
+                    collection.count + len(new_documents), collection.dimension
+                )
+        collection.append(
+            embeddings,
+            [doc.id for doc in new_documents],
+            [doc.text for doc in new_documents],
+            [dict(doc.metadata) for doc in new_documents],
+            matrix=matrix
+        )
+        self._write_header(collection_name, collection)
+        logger.info("Documents added", collection=collection_name, count=len(new_documents))
+
+    @debug_log_method
+    def search(
+        self,
+        collection_name: str,
+        query_embedding: Embedding,
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[VectorSearchResult]:
+        """Search for similar documents.
+
+        Args:
+            collection_name: Name of the collection to search
+            query_embedding: Query vector embedding
+            top_k: Number of results to return
+            filters: Optional metadata filters
+
+        Returns:
+            List of search results sorted by relevance
+
+        Raises:
+            ValueError: If collection does not exist or the query has the wrong dimension
+        """
+        collection = self._get(collection_name)
+        # One view for the whole query; a concurrent add publishes a new one
+        rows = collection.rows
+        if rows.count == 0 or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        if query.shape[0] != collection.dimension:
+            raise ValueError(
+                f"Query dimension mismatch for {collection_name}: "
+                f"expected {collection.dimension}, got {query.shape[0]}"
+            )
+
+        scores = self._scores(rows, query)
+
+        if filters:
+            mask = self._filter_mask(rows, filters)
+            candidates = np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return []
+            scores = scores[candidates]
+        else:
+            candidates = None
+
+        k = min(top_k, len(scores))
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        selected = candidates[top] if candidates is not None else top
+
+        search_results = [
+            VectorSearchResult(
+                document_id=rows.ids[row],
+                text=rows.texts[row],
+                score=float(score),
+                metadata=rows.metadatas[row]
+            )
+            for row, score in zip(selected.tolist(), scores[top].tolist())
+        ]
+
+        logger.debug("Search completed", collection=collection_name, results=len(search_results))
+        return search_results
+
+    def _scores(self, rows: _Rows, query: np.ndarray) -> np.ndarray:
+        """Similarity of the query to every stored embedding (higher is better).
+
+        ``cosine`` returns cosine similarity, ``ip`` the inner product and
+        ``l2`` ``1 / (1 + squared distance)``, the conversion used for Chroma
+        distances.
+        """
+        dots = rows.embeddings @ query.astype(rows.embeddings.dtype)
+        dots = dots.astype(np.float32)
+        if self.metric == "ip":
+            return dots
+
+        norms = rows.norms
+        query_norm = float(np.linalg.norm(query))
+        if self.metric == "cosine":
+            denominator = norms * query_norm
+            return np.divide(dots, denominator, out=np.zeros_like(dots), where=denominator > 0)
+
+        distances = np.maximum(norms * norms - 2.0 * dots + query_norm * query_norm, 0.0)
+        return 1.0 / (1.0 + distances)
+
+    def _filter_mask(self, rows: _Rows, filters: Dict[str, Any]) -> np.ndarray:
+        """Boolean mask of rows matching a Chroma-style ``where`` clause.
+
+        Raises:
+            ValueError: If the clause uses an unsupported operator
+        """
+        mask = np.ones(rows.count, dtype=bool)
+        for key, condition in filters.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._filter_mask(rows, clause)
+            elif key == "$or":
+                combined = np.zeros(rows.count, dtype=bool)
+                for clause in condition:
+                    combined |= self._filter_mask(rows, clause)
+                mask &= combined
+            elif isinstance(condition, dict):
+                for operator, value in condition.items():
+                    mask &= self._operator_mask(rows, key, operator, value)
+            else:
+                mask &= self._operator_mask(rows, key, "$eq", condition)
+            if not mask.any():
+                break
+        return mask
+
+    def _operator_mask(self, rows: _Rows, key: str, operator: str, value: Any) -> np.ndarray:
+        """Evaluate one ``field <operator> value`` condition."""
+        if operator in ("$eq", "$ne"):
+            matches = self._values_mask(rows, key, [value])
+        elif operator in ("$in", "$nin"):
+            matches = self._values_mask(rows, key, list(value))
+        else:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+
+        if operator in ("$ne", "$nin"):
+            # Documents lacking the field never match, as in Chroma
+            return ~matches & self._values_mask(rows, key, None)
+        return matches
+
+    def _values_mask(self, rows: _Rows, key: str, values: Optional[List[Any]]) -> np.ndarray:
+        """Rows whose ``key`` is one of ``values`` (any present value if None)."""
+        column = rows.column(key)
+        if column is None:
+            # Unhashable values: evaluate row by row
+            def matches(metadata: Dict[str, Any]) -> bool:
+                if key not in metadata:
+                    return False
+                return values is None or metadata[key] in values
+
+            return np.fromiter(
+                (matches(rows.metadatas[row]) for row in range(rows.count)), dtype=bool, count=rows.count
+            )
+
+        codes, dictionary = column
+        if values is None:
+            return codes != _MISSING
+        wanted = []
+        for value in values:
+            try:
+                code = dictionary.get(value)
+            except TypeError:
+                code = None
+            if code is not None:
+                wanted.append(code)
+        return np.isin(codes, wanted)
+
+    def delete_collection(self, collection_name: str) -> None:
+        """Delete a collection.
+
+        Args:
+            collection_name: Name of the collection to delete
+        """
+        with self._lock:
+            if not self.collection_exists(collection_name):
+                logger.warning("Collection does not exist", collection=collection_name)
+                return
+
+            # Drop memory maps before removing their files
+            self._collections.pop(collection_name, None)
+            if not self.in_memory:
+                shutil.rmtree(self._collection_dir(collection_name), ignore_errors=True)
+        logger.info("Collection deleted", collection=collection_name)
+
+    def collection_exists(self, collection_name: str) -> bool:
+        """Check if collection exists.
+
+        Args:
+            collection_name: Name of the collection
+
+        Returns:
+            True if collection exists, False otherwise
+        """
+        if collection_name in self._collections:
+            return True
+        if self.in_memory:
+            return False
+        return (self._collection_dir(collection_name) / COLLECTION_FILE).exists()
+
+    def get_collection_stats(self, collection_name: str) -> Dict[str, Any]:
+        """Get statistics about a collection.
+
+        Args:
+            collection_name: Name of the collection
+
+        Returns:
+            Dictionary with collection statistics (count, dimension, etc.)
+        """
+        collection = self._get(collection_name)
+        rows = collection.rows
+        return {
+            "count": rows.count,
+            "dimension": collection.dimension,
+            "metadata": collection.metadata,
+            "metric": self.metric,
+            "index_bytes": int(rows.embeddings.nbytes),
+        }
+
+    def close(self) -> None:
+        """Close connections and cleanup resources."""
+        # Releases memory maps; collections reload from disk on next access
+        self._collections = {}
+        logger.info("NumPy vector DB closed")
@@ -1,9 +1,9 @@
 """Pinecone vector database provider implementation (stub)."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 from ...utils.logging import get_logger
 from ...utils.debug_logging import debug_log_method
-from .base import BaseVectorDB, VectorDocument, VectorSearchResult
+from .base import BaseVectorDB, Embedding, VectorDocument, VectorSearchResult
 
 logger = get_logger(__name__)
 
@@ -77,15 +77,16 @@ class PineconeVectorDB(BaseVectorDB):
     def add_documents(
         self,
         collection_name: str,
-        documents: List[VectorDocument]
+        documents: Iterable[VectorDocument]
     ) -> None:
         """Add documents to the collection.
         
         Args:
             collection_name: Name of the collection
-            documents: List of documents to add
+            documents: Documents to add (any iterable, e.g. a generator)
         """
         # Stub implementation
+        documents = list(documents)
         logger.info("Pinecone document addition (stub)", collection=collection_name, count=len(documents))
         # TODO: Implement Pinecone upsert
         # vectors = [
@@ -102,7 +103,7 @@ class PineconeVectorDB(BaseVectorDB):
     def search(
         self,
         collection_name: str,
-        query_embedding: List[float],
+        query_embedding: Embedding,
         top_k: int = 10,
         filters: Optional[Dict[str, Any]] = None
     ) -> List[VectorSearchResult]:
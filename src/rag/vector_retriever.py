@@ -1,6 +1,9 @@
 """Vector-based retriever implementation."""
 
-from typing import List, Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
 from .base_retriever import BaseRetriever
 from ..core.base_agent import RetrievalResult
 from .vector_db.base import BaseVectorDB
@@ -10,6 +13,8 @@ from ..utils.debug_logging import debug_log_method
 
 logger = get_logger(__name__)
 
+DEFAULT_QUERY_CACHE_SIZE = 1024
+
 
 class VectorRetriever(BaseRetriever):
     """Vector-based retriever."""
@@ -18,7 +23,8 @@ class VectorRetriever(BaseRetriever):
         self,
         vector_db: BaseVectorDB,
         collection_name: str,
-        embedder: Embedder
+        embedder: Embedder,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE
     ):
         """Initialize vector retriever.
         
@@ -26,10 +32,85 @@ class VectorRetriever(BaseRetriever):
             vector_db: Vector DB instance
             collection_name: Name of the collection
             embedder: Embedder instance
+            query_cache_size: Maximum number of cached query embeddings (0 disables)
         """
         self.vector_db = vector_db
         self.collection_name = collection_name
         self.embedder = embedder
+        self.query_cache_size = max(0, query_cache_size)
+        # LRU of query embeddings keyed on (model name, normalized query)
+        self._query_cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Collapse whitespace so trivially different query strings share a cache entry."""
+        return " ".join(query.split())
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries, serving repeated ones from the LRU cache.
+
+        Misses are embedded in a single batch and inserted into the cache,
+        evicting the least recently used entries beyond ``query_cache_size``.
+
+        Args:
+            queries: Query strings
+
+        Returns:
+            Float32 array with one embedding row per query
+        """
+        if self.query_cache_size == 0:
+            return self.embedder.embed_array(queries)
+        
+        model_name = getattr(self.embedder, "model_name", "")
+        keys = [(model_name, self._normalize_query(query)) for query in queries]
+        rows: List[Optional[np.ndarray]] = [None] * len(queries)
+        with self._query_cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._query_cache.get(key)
+                if cached is not None:
+                    self._query_cache.move_to_end(key)
+                    rows[i] = cached
+            # Each distinct missing query is embedded once; duplicates count as hits
+            missing = list(dict.fromkeys(key for key, row in zip(keys, rows) if row is None))
+            self.query_cache_hits += len(queries) - len(missing)
+            self.query_cache_misses += len(missing)
+        
+        if missing:
+            embeddings = self.embedder.embed_array([text for _, text in missing])
+            if len(embeddings) != len(missing):
+                return embeddings
+            computed = dict(zip(missing, embeddings))
+            with self._query_cache_lock:
+                for key, embedding in computed.items():
+                    self._query_cache[key] = embedding
+                    self._query_cache.move_to_end(key)
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+            rows = [computed[key] if row is None else row for key, row in zip(keys, rows)]
+        
+        return np.stack(rows)
+    
+    def query_cache_stats(self) -> Dict[str, int]:
+        """Get query-embedding cache counters.
+
+        Returns:
+            Dictionary with hits, misses, current size and capacity
+        """
+        with self._query_cache_lock:
+            return {
+                "hits": self.query_cache_hits,
+                "misses": self.query_cache_misses,
+                "size": len(self._query_cache),
+                "capacity": self.query_cache_size,
+            }
+    
+    def clear_query_cache(self) -> None:
+        """Drop cached query embeddings (counters are kept)."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
     
     @debug_log_method
     def retrieve(
@@ -51,8 +132,8 @@ class VectorRetriever(BaseRetriever):
         logger.debug("Vector retrieval", query=query[:50], top_k=top_k)
         
         # Generate query embedding
-        query_embeddings = self.embedder.embed([query])
-        if not query_embeddings:
+        query_embeddings = self._embed_queries([query])
+        if len(query_embeddings) == 0:
             logger.warning("Failed to generate query embedding")
             return []
         
@@ -83,6 +164,53 @@ class VectorRetriever(BaseRetriever):
         
         return retrieval_results
     
+    @debug_log_method
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[RetrievalResult]]:
+        """Retrieve for several queries, embedding them in one batch.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            filters: Optional metadata filters applied to every query
+
+        Returns:
+            One list of RetrievalResult objects per query
+        """
+        logger.debug("Vector batch retrieval", query_count=len(queries), top_k=top_k)
+        
+        if not queries:
+            return []
+        
+        query_embeddings = self._embed_queries(queries)
+        if len(query_embeddings) != len(queries):
+            logger.warning("Failed to generate query embeddings")
+            return [[] for _ in queries]
+        
+        results = []
+        for query_embedding in query_embeddings:
+            matches = self.vector_db.search(
+                collection_name=self.collection_name,
+                query_embedding=query_embedding,
+                top_k=top_k,
+                filters=filters
+            )
+            results.append([
+                RetrievalResult(
+                    chunk_text=match.text,
+                    score=match.score,
+                    chunk_id=match.document_id,
+                    metadata=match.metadata
+                )
+                for match in matches
+            ])
+        
+        return results
+    
     def retrieve_with_scores(
         self,
         query: str,
@@ -2,20 +2,46 @@
 
 import functools
 import inspect
+import logging
 from typing import Any, Callable, TypeVar
+import numpy as np
 from .logging import get_logger
 
 F = TypeVar('F', bound=Callable[..., Any])
 
+# Longer lists and tuples are cut before formatting; only 25 characters are shown
+_MAX_ITEMS = 8
+
 
 def _truncate(value: Any, max_len: int = 25) -> str:
-    """Truncate value to max_len characters with ellipsis if needed."""
+    """Truncate value to max_len characters with ellipsis if needed.
+
+    Arrays are summarized by shape and dtype, and long sequences are cut
+    before formatting, so embeddings cost no more to log than scalars.
+    """
+    if isinstance(value, np.ndarray):
+        return f"ndarray(shape={value.shape}, dtype={value.dtype})"
+    if isinstance(value, (list, tuple)) and len(value) > _MAX_ITEMS:
+        str_val = str(type(value)(value[:_MAX_ITEMS]))
+        return str_val[:max_len] + "..."
     str_val = str(value)
     if len(str_val) > max_len:
         return str_val[:max_len] + "..."
     return str_val
 
 
+def _debug_enabled(logger: Any) -> bool:
+    """Whether the logger emits DEBUG records (stdlib-backed or native structlog)."""
+    for name in ("isEnabledFor", "is_enabled_for"):
+        check = getattr(logger, name, None)
+        if check is not None:
+            try:
+                return bool(check(logging.DEBUG))
+            except Exception:
+                break
+    return True
+
+
 def debug_log_method(func: F) -> F:
     """
     Decorator to add comprehensive debug logging to methods.
@@ -25,6 +51,9 @@ def debug_log_method(func: F) -> F:
     - Method exit with return value (truncated to 25 chars)
     - Exceptions raised with error message (truncated to 25 chars)
 
+    Nothing is formatted when DEBUG is disabled, so decorated hot-path
+    methods only pay for one level check.
+
     Usage:
         @debug_log_method
         def my_method(self, param1: str, param2: int) -> str:
@@ -38,6 +67,9 @@ def debug_log_method(func: F) -> F:
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        if not _debug_enabled(logger):
+            return func(*args, **kwargs)
+
         # Get class name if this is a method
         if args and hasattr(args[0], '__class__'):
             class_name = args[0].__class__.__name__
@@ -1,5 +1,7 @@
 """Tests for game API endpoints."""
 
+import threading
+
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch, MagicMock
@@ -22,6 +24,7 @@ def mock_session_manager():
     mock_session.created_at.isoformat.return_value = "2025-01-01T00:00:00"
     mock_session.state = {}
     mock_session.turns = []
+    mock_session.turn_lock = threading.Lock()
     mock_session.last_accessed.isoformat.return_value = "2025-01-01T00:00:00"
     mock_session.to_dict.return_value = {
         "session_id": "test-session-123",
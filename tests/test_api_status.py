@@ -58,6 +58,8 @@ def mock_retrieval_manager():
     bm25_retriever = Mock()
     bm25_retriever.is_loaded.return_value = True
     bm25_retriever.chunks = ["chunk1", "chunk2", "chunk3"]
+    bm25_retriever.index.nbytes = 4096
+    bm25_retriever.index.compressed = False
 
     # Add metadata with source information
     from src.ingestion.metadata_store import ChunkMetadata
@@ -79,11 +81,16 @@ def mock_retrieval_manager():
     vector_db.collection_exists.return_value = True
     vector_db.get_collection_stats.return_value = {"count": 100}
     vector_retriever.vector_db = vector_db
+    vector_retriever.query_cache_stats.return_value = {"hits": 3, "misses": 2, "size": 2, "capacity": 1024}
 
     # Mock hybrid retriever
     hybrid_retriever = Mock()
     hybrid_retriever.bm25_retriever = bm25_retriever
     hybrid_retriever.vector_retriever = vector_retriever
+    hybrid_retriever.depth_stats.return_value = {
+        "queries": 4, "mean_depth": 15.0, "mean_rounds": 1.5, "expanded_queries": 2
+    }
+    hybrid_retriever.reranker = None
 
     manager.hybrid_retriever = hybrid_retriever
     manager.cache = {"query1": "result1", "query2": "result2"}
@@ -183,6 +190,8 @@ class TestStatusEndpoints:
         assert data["loaded_corpora"] == ["data/test_data/test_corpus2.txt"]
         assert data["total_chunks"] == 3  # From mock BM25 retriever
         assert data["bm25_status"] == "connected"
+        assert data["bm25_index_bytes"] == 4096
+        assert data["bm25_compressed"] is False
         assert data["vector_db_status"] == "connected"
         assert data["vector_db_provider"] == "chroma"
         assert data["collection_name"] == "test_collection"
@@ -294,6 +303,12 @@ class TestStatusEndpoints:
         assert data["query_rewriting_enabled"] is True
         assert data["cache_enabled"] is True
         assert data["cached_queries"] == 2
+        assert data["query_embedding_cache_hits"] == 3
+        assert data["query_embedding_cache_misses"] == 2
+        assert data["query_embedding_cache_size"] == 2
+        assert data["hybrid_queries"] == 4
+        assert data["candidate_depth_mean"] == 15.0
+        assert data["candidate_depth_expanded_queries"] == 2
 
     def test_get_retrieval_status_not_initialized(self):
         """Test retrieval status when not initialized."""
@@ -17,6 +17,7 @@ from src.core.orchestrator import GameOrchestrator
 from src.core.retrieval_manager import RetrievalManager
 from src.core.base_agent import BaseAgent, AgentContext, AgentOutput, RetrievalResult
 from src.rag.base_retriever import BaseRetriever
+from src.rag.hybrid_retriever import HybridRetriever
 from src.utils.logging import setup_logging, get_logger
 
 
@@ -386,6 +387,30 @@ class TestLogging:
         # Should not raise an exception
         assert logger1 is not None
         assert logger2 is not None
+    
+    def test_debug_log_method_skips_formatting_when_disabled(self):
+        """Test arguments are only formatted when DEBUG is enabled, and arrays are summarized."""
+        import numpy as np
+        from src.utils import debug_logging
+        from src.utils.debug_logging import debug_log_method, _truncate
+        
+        @debug_log_method
+        def identity(value):
+            return value
+        
+        vector = np.zeros(384, dtype=np.float32)
+        assert _truncate(vector) == "ndarray(shape=(384,), dtype=float32)"
+        assert _truncate(list(range(1000))) == "[0, 1, 2, 3, 4, 5, 6, 7]..."
+        assert _truncate("short") == "short"
+        
+        with patch.object(debug_logging, "_truncate", wraps=_truncate) as truncate:
+            setup_logging(log_level="INFO")
+            assert identity(vector) is vector
+            assert truncate.call_count == 0
+            setup_logging(log_level="DEBUG")
+            identity(vector)
+            assert truncate.call_count == 2
+        setup_logging()
 
 
 class TestSession:
@@ -411,7 +436,28 @@ class TestSession:
         game_session.add_turn(turn)
         assert len(game_session.turns) == 1
         assert game_session.turns[0].turn_number == 1
-    
+
+    def test_turn_lock_lives_with_session(self, session_config):
+        """Test each session owns its turn lock, freed with the session."""
+        import gc
+        import weakref
+
+        manager = SessionManager(session_config)
+        first = manager.create_session()
+        second = manager.create_session()
+        assert first.turn_lock is not second.turn_lock
+        assert "turn_lock" not in repr(first)
+
+        with first.turn_lock:
+            assert second.turn_lock.acquire(blocking=False)
+            second.turn_lock.release()
+
+        session_ref = weakref.ref(first)
+        manager.delete_session(first.session_id)
+        del first
+        gc.collect()
+        assert session_ref() is None
+
     def test_sliding_window_memory(self, session_config):
         """Test sliding window memory application."""
         session_config.memory_window_size = 3
@@ -633,6 +679,41 @@ class TestRetrievalManager:
         # Next call should hit retriever again
         manager.retrieve("query1")
         assert mock_retriever.retrieve.call_count == 2
+    
+    def test_retrieve_many(self, mock_retriever):
+        """Test batched retrieval sends only uncached queries to the retriever."""
+        mock_retriever.retrieve_many = Mock(side_effect=lambda queries, top_k: [
+            [RetrievalResult(chunk_text=query, score=1.0, chunk_id=query)] for query in queries
+        ])
+        manager = RetrievalManager(mock_retriever)
+        manager.retrieve("cached", top_k=5)
+        
+        results = manager.retrieve_many(["first", "cached", "second"], top_k=5)
+        
+        assert [r[0].chunk_text for r in results] == ["first", "Mock chunk", "second"]
+        mock_retriever.retrieve_many.assert_called_once_with(["first", "second"], 5)
+        assert manager.retrieve("second", top_k=5)[0].chunk_text == "second"
+    
+    def test_append_corpus(self, mock_retriever):
+        """Test appending updates the live BM25 retriever and drops cached results."""
+        hybrid = HybridRetriever(Mock(), Mock())
+        hybrid.retrieve = Mock(return_value=[RetrievalResult(chunk_text="old", score=1.0, chunk_id="c0")])
+        manager = RetrievalManager(hybrid)
+        manager.retrieve("query")
+        pipeline = Mock()
+        pipeline.append.return_value = Mock(total_chunks=2)
+        
+        result = manager.append_corpus(pipeline, "new.txt", collection_name="corpus")
+        
+        assert result.total_chunks == 2
+        pipeline.append.assert_called_once_with(
+            corpus_path="new.txt", bm25_retriever=hybrid.bm25_retriever, collection_name="corpus"
+        )
+        manager.retrieve("query")
+        assert hybrid.retrieve.call_count == 2
+        
+        with pytest.raises(ValueError):
+            RetrievalManager(mock_retriever).append_corpus(pipeline, "new.txt")
 
 
 class TestBaseAgent:
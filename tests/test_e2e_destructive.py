@@ -133,7 +133,7 @@ class TestEndToEndDestructive:
 
         # DEBUG: Get raw BM25 scores first
         import numpy as np
-        tokenized_query = bm25_query.lower().split()
+        tokenized_query = bm25_retriever.index.analyzer.analyze(bm25_query)
         raw_scores = bm25_retriever.index.get_scores(tokenized_query)
         print(f"\nDEBUG - Raw BM25 scores for '{bm25_query}':")
         print(f"  Max raw score: {np.max(raw_scores):.6f}")
@@ -4,19 +4,30 @@ import pytest
 import tempfile
 import shutil
 from pathlib import Path
+from contextlib import contextmanager
 from unittest.mock import Mock, patch
 
 from src.ingestion.chunker import Chunker, Chunk
 from src.ingestion.embedder import Embedder
+from src.ingestion.embedding_dispatcher import EmbeddingDispatcher
 from src.ingestion.bm25_indexer import BM25Indexer
+from src.rag.analyzer import Analyzer
+from src.rag.bm25_engine import BM25Engine, load_bm25_index, is_bm25_index_file, resolve_bm25_index_path
+from src.rag.bm25_segments import SegmentedBM25Index
+from src.rag.bm25_compressed import CompressedBM25Engine, encode_varint, decode_varint
 from src.ingestion.metadata_store import MetadataStore, ChunkMetadata
 from src.ingestion.pipeline import IngestionPipeline, IngestionResult
 from src.rag.vector_retriever import VectorRetriever
 from src.rag.bm25_retriever import BM25Retriever
+from src.rag.metadata_index import MetadataIndex
 from src.rag.hybrid_retriever import HybridRetriever
+from src.rag.reranker import CrossEncoderReranker
 from src.rag.vector_db.chroma_provider import ChromaVectorDB
 from src.rag.vector_db.factory import VectorDBFactory
+from src.rag.vector_db.numpy_provider import NumpyVectorDB
+from src.rag.vector_db.base import VectorDocument, embedding_matrix
 from src.core.base_agent import RetrievalResult
+from src.core.config import RetrievalConfig
 
 
 @pytest.fixture
@@ -77,6 +88,83 @@ def vector_db(test_indices_dir, request):
     db.close()
 
 
+@pytest.fixture
+def bow_model_path(tmp_path):
+    """Small bag-of-words sentence-transformers model saved locally (no download)."""
+    from sentence_transformers import SentenceTransformer, models
+    vocab = ["gandalf", "wizard", "frodo", "ring", "bree", "pony", "shire", "hobbit"]
+    model_path = tmp_path / "bow_model"
+    SentenceTransformer(modules=[models.BoW(vocab=vocab)], device="cpu").save(str(model_path))
+    return str(model_path)
+
+
+@pytest.fixture
+def bm25_index_files(tmp_path, test_corpus_file):
+    """Build a BM25 index and chunk metadata from the test corpus (no embeddings)."""
+    text = Path(test_corpus_file).read_text(encoding="utf-8")
+    chunks = Chunker().chunk(text, strategy="sliding_window", chunk_size=200, chunk_overlap=50)
+    
+    indexer = BM25Indexer()
+    index_path = str(tmp_path / "bm25_index.bm25")
+    indexer.save_index(indexer.build_index([chunk.text for chunk in chunks]), index_path)
+    
+    metadata_path = str(tmp_path / "chunks.json")
+    MetadataStore().save_metadata([
+        ChunkMetadata(
+            chunk_id=chunk.id,
+            text=chunk.text,
+            start_pos=chunk.start_pos,
+            end_pos=chunk.end_pos,
+            chunk_index=i,
+            source=test_corpus_file,
+            additional_metadata={**chunk.metadata, "part": i % 2}
+        )
+        for i, chunk in enumerate(chunks)
+    ], metadata_path)
+    return index_path, metadata_path
+
+
+@pytest.fixture(scope="module")
+def cross_encoder_path(tmp_path_factory):
+    """Tiny randomly initialized BERT cross-encoder saved locally."""
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizer
+    model_dir = tmp_path_factory.mktemp("cross_encoder")
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]",
+             "gandalf", "wizard", "frodo", "ring", "bree", "pony", "the", "a"]
+    (model_dir / "vocab.txt").write_text("\n".join(vocab))
+    BertTokenizer(str(model_dir / "vocab.txt")).save_pretrained(str(model_dir))
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=8, num_hidden_layers=1,
+        num_attention_heads=2, intermediate_size=16, num_labels=1
+    )
+    BertForSequenceClassification(config).save_pretrained(str(model_dir))
+    return str(model_dir)
+
+
+@pytest.fixture(scope="module")
+def sentence_transformer_path(tmp_path_factory):
+    """Tiny randomly initialized BERT sentence-transformer saved locally."""
+    import re
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizer
+    model_dir = tmp_path_factory.mktemp("sentence_transformer")
+    words = set()
+    for name in ("test_corpus.txt", "test_corpus2.txt"):
+        text = (Path(__file__).parent.parent / "data" / "test_data" / name).read_text(encoding="utf-8")
+        words.update(word.lower() for word in re.findall(r"[A-Za-z]+", text))
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(words)
+    (model_dir / "vocab.txt").write_text("\n".join(vocab))
+    BertTokenizer(str(model_dir / "vocab.txt")).save_pretrained(str(model_dir))
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1,
+        num_attention_heads=2, intermediate_size=32
+    )
+    BertModel(config).save_pretrained(str(model_dir))
+    transformer = models.Transformer(str(model_dir), max_seq_length=128)
+    SentenceTransformer(modules=[transformer, models.Pooling(16), models.Normalize()]).save(str(model_dir / "st"))
+    return str(model_dir / "st")
+
+
 class TestChunker:
     """Test Chunker functionality."""
     
@@ -157,12 +245,183 @@ class TestEmbedder:
         assert len(embeddings) == len(texts)
         assert all(len(emb) == embedder.dimension for emb in embeddings)
     
+    def test_embed_array(self, embedder):
+        """Test the float32 array path matches the list path."""
+        import numpy as np
+        texts = [f"This is sentence {i}." for i in range(5)]
+        embeddings = embedder.embed_array(texts, batch_size=2)
+        
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape == (len(texts), embedder.dimension)
+        assert embeddings.flags["C_CONTIGUOUS"]
+        assert np.allclose(embeddings, embedder.embed(texts), atol=1e-5)
+        assert embedder.embed_array([]).shape == (0, embedder.dimension)
+    
+    @pytest.mark.parametrize("quantization", [None, "avx2"])
+    def test_onnx_backend_parity(self, embedder, quantization, tmp_path):
+        """ONNX Runtime embeddings match the PyTorch path in cosine similarity."""
+        pytest.importorskip("optimum.onnxruntime")
+        import numpy as np
+        onnx_embedder = Embedder(
+            model_name=embedder.model_name,
+            backend="onnx",
+            quantization=quantization,
+            onnx_dir=str(tmp_path)
+        )
+        texts = [
+            "Gandalf the Grey arrived in Hobbiton.",
+            "The Prancing Pony is an inn at Bree.",
+            "Frodo carried the ring to Mordor.",
+        ]
+        expected = embedder.embed_array(texts)
+        actual = onnx_embedder.embed_array(texts)
+        
+        assert actual.shape == expected.shape
+        cosine = np.sum(expected * actual, axis=1) / (
+            np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+        )
+        assert cosine.min() > (0.999 if quantization is None else 0.98)
+    
+    def test_invalid_backend(self):
+        """Test unsupported backend settings are rejected before loading a model."""
+        with pytest.raises(ValueError):
+            Embedder(model_name="sentence-transformers/all-MiniLM-L6-v2", backend="tensorrt")
+        with pytest.raises(ValueError):
+            Embedder(model_name="sentence-transformers/all-MiniLM-L6-v2", quantization="avx2")
+    
     def test_embed_empty_list(self, embedder):
         """Test embedding empty list."""
         embeddings = embedder.embed([])
         assert len(embeddings) == 0
 
 
+class TestEmbeddingDispatcher:
+    """Test EmbeddingDispatcher micro-batching."""
+    
+    @pytest.fixture
+    def model(self):
+        """Mock embedder whose embedding encodes the text length."""
+        import numpy as np
+        import time
+        embedder = Mock(spec=Embedder)
+        embedder.model_name = "mock-embedder"
+        embedder.dimension = 2
+        
+        def embed_array(texts, batch_size=32):
+            time.sleep(0.01)  # let concurrent requests queue up
+            return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+        
+        embedder.embed_array.side_effect = embed_array
+        return embedder
+    
+    def test_coalesces_threaded_requests(self, model):
+        """Concurrent single-query callers share model calls and get their own rows."""
+        from concurrent.futures import ThreadPoolExecutor
+        dispatcher = EmbeddingDispatcher(model, max_batch_size=8, max_wait_ms=20)
+        queries = ["q" * (i + 1) for i in range(24)]
+        with ThreadPoolExecutor(max_workers=24) as pool:
+            results = list(pool.map(lambda q: dispatcher.embed_array([q]), queries))
+        dispatcher.close()
+        
+        assert [result.tolist() for result in results] == [[[len(q), 1.0]] for q in queries]
+        assert all(len(call[0][0]) <= 8 for call in model.embed_array.call_args_list)
+        stats = dispatcher.stats()
+        assert stats["requests"] == 24 and stats["texts"] == 24
+        assert stats["batches"] == model.embed_array.call_count < 24
+        with pytest.raises(RuntimeError):
+            dispatcher.embed_array(["closed"])
+    
+    def test_async_callers_and_errors(self, model):
+        """Coroutines await batched embeddings; model errors reach every caller."""
+        import asyncio
+        dispatcher = EmbeddingDispatcher(model, max_batch_size=16, max_wait_ms=20)
+        
+        async def run():
+            return await asyncio.gather(*(dispatcher.embed_array_async(["a" * n]) for n in range(1, 6)))
+        
+        results = asyncio.run(run())
+        assert [result[0, 0] for result in results] == [1, 2, 3, 4, 5]
+        assert model.embed_array.call_count == 1
+        
+        model.embed_array.side_effect = RuntimeError("model failure")
+        with pytest.raises(RuntimeError, match="model failure"):
+            dispatcher.embed_array(["boom"])
+        dispatcher.close()
+
+
+class TestParallelEmbedding:
+    """Test multi-process embedding during ingestion."""
+    
+    @pytest.fixture
+    def bow_embedder(self, bow_model_path):
+        return Embedder(model_name=bow_model_path)
+    
+    def test_adaptive_batch_size(self):
+        """Short texts get large batches, long texts small ones."""
+        from src.ingestion.embedder import adaptive_batch_size, MIN_BATCH_SIZE, MAX_BATCH_SIZE
+        assert adaptive_batch_size(["hi"] * 10) == MAX_BATCH_SIZE
+        assert adaptive_batch_size(["x" * 400] * 10) == 81
+        assert adaptive_batch_size(["x" * 10000] * 10, max_seq_length=512) == 16
+        assert adaptive_batch_size(["x" * 10000], max_seq_length=4096) == MIN_BATCH_SIZE
+    
+    def test_multi_process_ingestion(self, bow_embedder, chunker, metadata_store, test_corpus_file, tmp_path):
+        """Worker processes produce the in-process embeddings and report throughput."""
+        import numpy as np
+        vector_db = NumpyVectorDB({"in_memory": True})
+        pipeline = IngestionPipeline(
+            chunker=chunker,
+            bm25_indexer=BM25Indexer(),
+            embedder=bow_embedder,
+            vector_db=vector_db,
+            metadata_store=metadata_store,
+            embedding_workers=2,
+            embedding_batch_size=4
+        )
+        result = pipeline.ingest(
+            corpus_path=test_corpus_file,
+            collection_name="parallel",
+            chunk_size=200,
+            chunk_overlap=50,
+            indices_dir=str(tmp_path)
+        )
+        
+        assert result.statistics["embedding_workers"] == 2
+        assert result.statistics["embedding_batch_size"] == 4
+        assert result.statistics["embedding_chunks_per_second"] > 0
+        stored = vector_db._get("parallel").rows
+        assert np.allclose(stored.embeddings, bow_embedder.embed_array(stored.texts))
+
+
+class TestEmbeddingCache:
+    """Test the persistent content-addressed embedding cache."""
+    
+    def test_unchanged_texts_are_not_re_embedded(self, bow_model_path, tmp_path):
+        """Cached texts are read back; only new texts reach the model."""
+        import numpy as np
+        cache_path = str(tmp_path / "cache" / "embeddings.sqlite")
+        embedder = Embedder(model_name=bow_model_path, embedding_cache_path=cache_path)
+        texts = ["gandalf the wizard", "frodo and the ring", "the pony at bree"]
+        
+        stats = {}
+        first = embedder.embed_documents(texts, stats=stats)
+        assert stats == {"cache_hits": 0, "cache_misses": 3}
+        assert np.allclose(first, embedder.embed_array(texts))
+        embedder.cache.close()
+        
+        # A fresh embedder (re-ingestion) reuses the persisted vectors
+        embedder = Embedder(model_name=bow_model_path, embedding_cache_path=cache_path)
+        changed = texts[:2] + ["hobbit of the shire", "gandalf the wizard"]
+        with patch.object(embedder.model, "encode", wraps=embedder.model.encode) as encode:
+            second = embedder.embed_documents(changed, stats=stats)
+        assert stats == {"cache_hits": 3, "cache_misses": 1}
+        assert encode.call_args[0][0] == ["hobbit of the shire"]
+        assert np.allclose(second, embedder.embed_array(changed))
+        assert len(embedder.cache) == 4
+        
+        # Another model never sees these vectors
+        assert embedder.cache.get_many("other-model", texts, embedder.dimension) == [None] * 3
+
+
 class TestBM25Indexer:
     """Test BM25Indexer functionality."""
     
@@ -200,6 +459,401 @@ class TestBM25Indexer:
             bm25_indexer.build_index([])
 
 
+class TestBM25Engine:
+    """Test BM25Engine inverted index."""
+    
+    @pytest.fixture
+    def tokenized_corpus(self, test_corpus_file):
+        """Tokenize the test corpus into fixed-size chunks."""
+        text = Path(test_corpus_file).read_text(encoding="utf-8")
+        return [text[i:i + 300].lower().split() for i in range(0, len(text), 250)]
+    
+    def test_scores_match_bm25okapi(self, tokenized_corpus):
+        """Test engine scores are identical to rank_bm25's BM25Okapi."""
+        from rank_bm25 import BM25Okapi
+        
+        okapi = BM25Okapi(tokenized_corpus)
+        engine = BM25Engine.from_tokenized(tokenized_corpus)
+        
+        for query in ["gandalf the grey", "the the of", "unknownterm"]:
+            tokens = query.split()
+            assert engine.get_scores(tokens) == pytest.approx(okapi.get_scores(tokens))
+    
+    def test_top_k_only_scores_matching_chunks(self, tokenized_corpus):
+        """Test top-k returns matching chunks in descending score order."""
+        engine = BM25Engine.from_tokenized(tokenized_corpus)
+        tokens = ["prancing", "pony", "inn"]
+        
+        doc_ids, scores = engine.get_top_k(tokens, 3)
+        full_scores = engine.get_scores(tokens)
+        
+        assert len(doc_ids) <= 3
+        assert all(scores > 0)
+        assert list(scores) == sorted(scores, reverse=True)
+        assert scores[0] == pytest.approx(full_scores.max())
+        assert engine.get_top_k(["unknownterm"], 3)[0].size == 0
+    
+    def test_from_okapi_conversion(self, tokenized_corpus):
+        """Test converting a legacy BM25Okapi index."""
+        from rank_bm25 import BM25Okapi
+        
+        okapi = BM25Okapi(tokenized_corpus)
+        engine = BM25Engine.from_okapi(okapi)
+        
+        tokens = ["gandalf", "wizard"]
+        assert engine.get_scores(tokens) == pytest.approx(okapi.get_scores(tokens))
+
+
+    def test_save_and_memory_map_index(self, tokenized_corpus, tmp_path):
+        """Test the flat index format round-trips through a memory map."""
+        import numpy as np
+        
+        engine = BM25Engine.from_tokenized(tokenized_corpus + [["naïve", "café"]])
+        index_path = str(tmp_path / "index.bm25")
+        engine.save(index_path)
+        
+        assert is_bm25_index_file(index_path)
+        loaded = BM25Engine.load(index_path, mmap=True)
+        
+        assert isinstance(loaded.doc_ids, np.memmap)
+        assert loaded.vocabulary == engine.vocabulary
+        for tokens in (["gandalf", "wizard"], ["café"]):
+            assert np.array_equal(loaded.get_scores(tokens), engine.get_scores(tokens))
+    
+    def test_load_rejects_unknown_file(self, tmp_path):
+        """Test loading a file that is not a BM25 index."""
+        bad_path = tmp_path / "bad.bm25"
+        bad_path.write_bytes(b"not an index at all")
+        
+        assert not is_bm25_index_file(str(bad_path))
+        with pytest.raises(ValueError):
+            BM25Engine.load(str(bad_path))
+    
+    def test_load_legacy_pickle(self, tokenized_corpus, tmp_path):
+        """Test legacy pickled BM25Okapi indices still load."""
+        import pickle
+        from rank_bm25 import BM25Okapi
+        
+        okapi = BM25Okapi(tokenized_corpus)
+        legacy_path = tmp_path / "legacy.pkl"
+        legacy_path.write_bytes(pickle.dumps(okapi))
+        
+        engine = load_bm25_index(str(legacy_path))
+        
+        assert isinstance(engine, BM25Engine)
+        assert engine.get_scores(["gandalf"]) == pytest.approx(okapi.get_scores(["gandalf"]))
+        assert engine.analyzer.to_config() == Analyzer.whitespace().to_config()
+    
+    def test_resolve_legacy_index_path(self, tokenized_corpus, tmp_path):
+        """Test a missing .bm25 index falls back to the legacy .pkl file."""
+        configured = str(tmp_path / "bm25_index.bm25")
+        assert resolve_bm25_index_path(configured) == configured
+        
+        legacy_path = tmp_path / "bm25_index.pkl"
+        BM25Engine.from_tokenized(tokenized_corpus).save(str(legacy_path))
+        assert resolve_bm25_index_path(configured) == str(legacy_path)
+        
+        BM25Engine.from_tokenized(tokenized_corpus).save(configured)
+        assert resolve_bm25_index_path(configured) == configured
+    
+    def test_score_candidates_batch(self, tokenized_corpus):
+        """Test batched sparse scoring matches per-query scoring."""
+        engine = BM25Engine.from_tokenized(tokenized_corpus)
+        queries = [["gandalf"], ["prancing", "pony", "pony"], [], ["unknownterm"]]
+        
+        batch = engine.score_candidates_batch(queries)
+        
+        assert len(batch) == len(queries)
+        for query, (candidates, scores) in zip(queries, batch):
+            expected_candidates, expected_scores = engine.score_candidates(query)
+            assert candidates.tolist() == expected_candidates.tolist()
+            assert scores == pytest.approx(expected_scores)
+    
+    def test_score_candidates_restricted_to_eligible(self, tokenized_corpus):
+        """Test an eligible mask skips other postings on every index type."""
+        import numpy as np
+        engine = BM25Engine.from_tokenized(tokenized_corpus)
+        segmented = SegmentedBM25Index(BM25Engine.from_tokenized(tokenized_corpus[:3]))
+        segmented.add_documents([" ".join(doc) for doc in tokenized_corpus[3:]])
+        eligible = np.arange(engine.corpus_size) % 2 == 1
+        queries = [["gandalf"], ["prancing", "pony", "pony"], ["unknownterm"]]
+        
+        for index in (engine, CompressedBM25Engine.from_engine(engine), segmented):
+            batch = index.score_candidates_batch(queries, eligible)
+            for query, (batch_candidates, batch_scores) in zip(queries, batch):
+                all_candidates, all_scores = index.score_candidates(query)
+                keep = eligible[all_candidates]
+                candidates, scores = index.score_candidates(query, eligible)
+                assert candidates.tolist() == all_candidates[keep].tolist()
+                assert scores == pytest.approx(all_scores[keep])
+                assert batch_candidates.tolist() == candidates.tolist()
+                assert batch_scores == pytest.approx(scores)
+    
+    def test_get_top_k_pruned_matches_exhaustive(self, tokenized_corpus):
+        """Test MaxScore pruning returns the exhaustive top-k."""
+        import numpy as np
+        from src.rag.bm25_engine import top_k_order
+        
+        engine = BM25Engine.from_tokenized(tokenized_corpus)
+        vocabulary = sorted({token for doc in tokenized_corpus for token in doc})
+        rng = np.random.default_rng(0)
+        eligible = np.arange(engine.corpus_size) % 2 == 0
+        
+        for _ in range(50):
+            query = list(rng.choice(vocabulary, size=8))
+            for mask in (None, eligible):
+                candidates, scores = engine.score_candidates(query)
+                keep = scores > 0 if mask is None else (scores > 0) & mask[candidates]
+                candidates, scores = candidates[keep], scores[keep]
+                order = top_k_order(scores, 3)
+                
+                stats = {}
+                result = engine.get_top_k_pruned(query, 3, eligible=mask, stats=stats)
+                if result is None:
+                    continue
+                ids, pruned_scores = result
+                assert ids.tolist() == candidates[order].tolist()
+                assert pruned_scores == pytest.approx(scores[order])
+                assert stats["postings_evaluated"] <= stats["postings_total"]
+    
+    def test_get_top_k_pruned_negative_idf(self):
+        """Test pruning is refused when a term has a negative IDF."""
+        engine = BM25Engine.from_tokenized([["common", "usual"], ["common", "usual"], ["common", "usual", "rare"]])
+        
+        assert engine.idf[engine.vocabulary["common"]] < 0
+        assert engine.get_top_k_pruned(["common", "rare"], 1) is None
+
+
+class TestPhraseMatching:
+    """Test positional postings and phrase matching."""
+    
+    @pytest.fixture
+    def documents(self):
+        """Documents mentioning Victor and Frankenstein together and apart."""
+        return [
+            "Victor met Elizabeth at the Frankenstein house.",
+            "The creature cursed Victor Frankenstein in the frozen north, far from any home.",
+            "Victor Frankenstein studied at Ingolstadt. Later Victor returned; Frankenstein was tired.",
+            "Robert Walton sailed north.",
+            "Elizabeth waited in Geneva.",
+            "Justine was accused.",
+            "Clerval travelled to England.",
+        ]
+    
+    def test_phrase_frequencies(self, documents, tmp_path):
+        """Test exact and sloppy phrase counts, also after a save/load round trip."""
+        analyzer = Analyzer()
+        engine = BM25Engine.from_tokenized(analyzer.analyze_batch(documents), analyzer=analyzer, store_positions=True)
+        path = str(tmp_path / "index.bm25")
+        engine.save(path)
+        doc_ids = [4, 2, 1, 0]
+        
+        for index in (engine, BM25Engine.load(path), CompressedBM25Engine.from_engine(engine)):
+            assert index.has_positions
+            assert index.phrase_frequencies(["victor", "frankenstein"], doc_ids).tolist() == [0, 1, 1, 0]
+            assert index.phrase_frequencies(["victor", "frankenstein"], doc_ids, slop=1).tolist() == [0, 2, 1, 0]
+            assert index.phrase_frequencies(["victor", "unknownterm"], doc_ids).tolist() == [0, 0, 0, 0]
+        
+        without_positions = BM25Engine.from_tokenized(analyzer.analyze_batch(documents))
+        assert not without_positions.has_positions
+        with pytest.raises(ValueError):
+            without_positions.phrase_frequencies(["victor", "frankenstein"], doc_ids)
+    
+    def test_segments_keep_positions(self, documents):
+        """Test appended and merged segments answer phrase queries like a rebuilt index."""
+        analyzer = Analyzer()
+        full = BM25Engine.from_tokenized(analyzer.analyze_batch(documents), analyzer=analyzer, store_positions=True)
+        base = BM25Engine.from_tokenized(analyzer.analyze_batch(documents[:2]), analyzer=analyzer, store_positions=True)
+        index = SegmentedBM25Index(base, max_buffer_docs=1, max_segments=100)
+        index.add_documents(documents[2:])
+        doc_ids = list(range(len(documents)))
+        
+        expected = full.phrase_frequencies(["victor", "frankenstein"], doc_ids, slop=1).tolist()
+        assert index.phrase_frequencies(["victor", "frankenstein"], doc_ids, slop=1).tolist() == expected
+        assert index.merge().positions.tolist() == full.positions.tolist()
+    
+    def test_retriever_boosts_quoted_phrase(self, documents, tmp_path):
+        """Test a quoted phrase lifts the chunk containing it above a chunk with scattered terms."""
+        indexer = BM25Indexer()
+        index_path = str(tmp_path / "bm25_index.bm25")
+        indexer.save_index(indexer.build_index(documents[:2] + documents[3:]), index_path)
+        metadata_path = str(tmp_path / "chunks.json")
+        MetadataStore().save_metadata([
+            ChunkMetadata(chunk_id=f"chunk_{i}", text=text, start_pos=0, end_pos=len(text), chunk_index=i, source="test")
+            for i, text in enumerate(documents[:2] + documents[3:])
+        ], metadata_path)
+        
+        plain = BM25Retriever(index_path=index_path, metadata_path=metadata_path, phrase_boost=0)
+        boosted = BM25Retriever(index_path=index_path, metadata_path=metadata_path, phrase_boost=1.0)
+        
+        assert plain.retrieve('"Victor Frankenstein"', top_k=2)[0].chunk_id == "chunk_0"
+        assert boosted.retrieve('"Victor Frankenstein"', top_k=2)[0].chunk_id == "chunk_1"
+        assert boosted.retrieve_many(['"Victor Frankenstein"'], top_k=2)[0][0].chunk_id == "chunk_1"
+        # Unquoted queries are unaffected
+        assert boosted.retrieve("Victor Frankenstein", top_k=2)[0].chunk_id == "chunk_0"
+
+
+class TestCompressedBM25Engine:
+    """Test CompressedBM25Engine postings compression."""
+    
+    @pytest.fixture
+    def engine(self, test_corpus_file):
+        """Exact engine over overlapping windows of the test corpus."""
+        text = Path(test_corpus_file).read_text(encoding="utf-8")
+        analyzer = Analyzer()
+        documents = [text[i:i + 300] for i in range(0, len(text), 250)]
+        return BM25Engine.from_tokenized(analyzer.analyze_batch(documents), analyzer=analyzer)
+    
+    def test_varint_round_trip(self):
+        """Test varint encoding of one- to five-byte values."""
+        values = [0, 1, 127, 128, 300, 2 ** 21, 2 ** 31 - 1, 5]
+        encoded, lengths = encode_varint(values)
+        
+        assert lengths.tolist() == [1, 1, 1, 2, 2, 4, 5, 1]
+        assert decode_varint(encoded, len(values)).tolist() == values
+    
+    def test_decompress_is_lossless(self, engine):
+        """Test decompression restores the exact postings."""
+        restored = CompressedBM25Engine.from_engine(engine).decompress()
+        
+        assert restored.offsets.tolist() == engine.offsets.tolist()
+        assert restored.doc_ids.tolist() == engine.doc_ids.tolist()
+        assert restored.term_freqs.tolist() == engine.term_freqs.tolist()
+        assert restored.get_scores(["gandalf", "pony"]) == pytest.approx(engine.get_scores(["gandalf", "pony"]))
+    
+    def test_quantized_scores(self, engine):
+        """Test quantized scores match exact scores within half a quantization step."""
+        compressed = CompressedBM25Engine.from_engine(engine)
+        
+        for query in (["gandalf"], ["prancing", "pony", "pony"], ["the", "inn", "wizard"]):
+            candidates, scores = compressed.score_candidates(query)
+            expected_candidates, expected_scores = engine.score_candidates(query)
+            assert candidates.tolist() == expected_candidates.tolist()
+            assert scores == pytest.approx(expected_scores, abs=len(query) * engine.idf.max() * 2.5 / 510)
+        
+        posting_bytes = compressed.doc_id_bytes.nbytes + compressed.term_freq_bytes.nbytes + compressed.impacts.nbytes
+        assert posting_bytes < (engine.doc_ids.nbytes + engine.term_freqs.nbytes) / 2
+    
+    def test_save_and_load(self, engine, tmp_path):
+        """Test compressed files load compressed, or decompressed through BM25Engine.load."""
+        path = str(tmp_path / "index.bm25")
+        compressed = CompressedBM25Engine.from_engine(engine)
+        compressed.save(path)
+        
+        loaded = load_bm25_index(path)
+        assert isinstance(loaded, CompressedBM25Engine)
+        assert loaded.analyzer.to_config() == engine.analyzer.to_config()
+        assert loaded.get_scores(["gandalf"]).tolist() == compressed.get_scores(["gandalf"]).tolist()
+        assert BM25Engine.load(path).doc_ids.tolist() == engine.doc_ids.tolist()
+
+
+class TestSegmentedBM25Index:
+    """Test SegmentedBM25Index appends and merges."""
+    
+    @pytest.fixture
+    def documents(self, test_corpus_file):
+        """Overlapping windows over the test corpus."""
+        text = Path(test_corpus_file).read_text(encoding="utf-8")
+        return [text[i:i + 300] for i in range(0, len(text), 250)]
+    
+    def test_appends_match_full_rebuild(self, documents):
+        """Test global statistics keep scores equal to a single rebuilt index."""
+        analyzer = Analyzer()
+        full = BM25Engine.from_tokenized(analyzer.analyze_batch(documents), analyzer=analyzer)
+        base = BM25Engine.from_tokenized(analyzer.analyze_batch(documents[:4]), analyzer=analyzer)
+        index = SegmentedBM25Index(base, max_buffer_docs=2, max_segments=100)
+        
+        for start in range(4, len(documents), 3):
+            index.add_documents(documents[start:start + 3])
+        
+        assert index.segment_count > 2
+        assert index.corpus_size == full.corpus_size
+        assert index.vocabulary_size == full.vocabulary_size
+        for query in (["gandalf"], ["prancing", "pony", "the"], ["unknownterm"]):
+            assert index.get_scores(query) == pytest.approx(full.get_scores(query))
+            assert index.get_top_k(query, 3)[0].tolist() == full.get_top_k(query, 3)[0].tolist()
+    
+    def test_compressed_flag(self, documents):
+        """Test the index reports the postings format it was opened in."""
+        analyzer = Analyzer()
+        engine = BM25Engine.from_tokenized(analyzer.analyze_batch(documents[:4]), analyzer=analyzer)
+        compressed = CompressedBM25Engine.from_engine(engine)
+        
+        assert not engine.compressed and compressed.compressed
+        assert not SegmentedBM25Index(engine).compressed
+        index = SegmentedBM25Index(compressed)
+        index.add_documents(documents[4:6])
+        assert index.compressed
+    
+    def test_merge_and_save(self, documents, tmp_path):
+        """Test merging segments and saving in the flat format."""
+        analyzer = Analyzer()
+        full = BM25Engine.from_tokenized(analyzer.analyze_batch(documents), analyzer=analyzer)
+        index = SegmentedBM25Index(analyzer=analyzer, max_buffer_docs=2, max_segments=2)
+        for document in documents:
+            index.add_documents([document])
+        index_path = tmp_path / "segmented.bm25"
+        
+        index.save(str(index_path))
+        loaded = load_bm25_index(str(index_path))
+        
+        assert index.segment_count == 1
+        assert loaded.corpus_size == full.corpus_size
+        assert loaded.get_scores(["gandalf", "wizard"]) == pytest.approx(full.get_scores(["gandalf", "wizard"]))
+
+
+class TestAnalyzer:
+    """Test Analyzer text analysis."""
+    
+    def test_punctuation_and_folding(self):
+        """Test punctuation splitting, casefolding and accent stripping."""
+        analyzer = Analyzer()
+        
+        assert analyzer.analyze("Frankenstein, the Naïve CAFÉ-owner!") == [
+            "frankenstein", "the", "naive", "cafe", "owner"
+        ]
+    
+    def test_whitespace_matches_legacy(self):
+        """Test whitespace analyzer reproduces lower().split()."""
+        text = "Gandalf, the Grey. Café"
+        
+        assert Analyzer.whitespace().analyze(text) == text.lower().split()
+    
+    def test_stopwords_and_stemming(self):
+        """Test stopword removal and Porter stemming."""
+        analyzer = Analyzer(stopwords="english", stemming=True)
+        
+        assert analyzer.analyze("The wizards were running to the hills") == ["wizard", "run", "hill"]
+    
+    def test_batch_matches_single(self):
+        """Test the batch fast path gives the same terms as analyze()."""
+        analyzer = Analyzer(stopwords=["the"])
+        texts = ["The Prancing Pony", "", "Ångström\x1eunit", "naïve café"]
+        
+        assert analyzer.analyze_batch(texts) == [analyzer.analyze(text) for text in texts]
+    
+    def test_config_round_trip(self):
+        """Test analyzer settings survive to_config/from_config."""
+        analyzer = Analyzer(stopwords=["foo"], stemming=True)
+        restored = Analyzer.from_config(analyzer.to_config())
+        
+        assert restored.to_config() == analyzer.to_config()
+        assert restored.analyze("Foo runners") == ["runner"]
+    
+    def test_analyzer_persisted_with_index(self, tmp_path):
+        """Test the index stores its analyzer and queries use it."""
+        analyzer = Analyzer(stopwords="english")
+        indexer = BM25Indexer(analyzer=analyzer)
+        index = indexer.build_index(["Gandalf, the wizard.", "The Prancing Pony's ale", "Frodo and Sam"])
+        index_path = tmp_path / "bm25.bm25"
+        indexer.save_index(index, str(index_path))
+        
+        loaded = load_bm25_index(str(index_path))
+        
+        assert loaded.analyzer.to_config() == analyzer.to_config()
+        assert loaded.get_scores(loaded.analyzer.analyze("GANDALF!"))[0] > 0
+
+
 class TestMetadataStore:
     """Test MetadataStore functionality."""
     
@@ -297,6 +951,74 @@ class TestIngestionPipeline:
         stats = vector_db.get_collection_stats("test_collection")
         assert stats["count"] == result.total_chunks
     
+    def test_append_pipeline(self, chunker, metadata_store, vector_db, test_corpus_file, tmp_path):
+        """Test appending a corpus extends every index and the live retriever."""
+        import numpy as np
+        embedder = Mock(spec=Embedder)
+        embedder.model_name = "mock-embedder"
+        embedder.dimension = 4
+        embedder.max_seq_length = 256
+        
+        def iter_embed_documents(texts, batch_size=32, workers=1, slice_size=1024, stats=None):
+            for start in range(0, len(texts), slice_size):
+                yield np.tile(
+                    np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32),
+                    (len(texts[start:start + slice_size]), 1)
+                )
+        
+        embedder.iter_embed_documents.side_effect = iter_embed_documents
+        pipeline = IngestionPipeline(
+            chunker=chunker,
+            bm25_indexer=BM25Indexer(),
+            embedder=embedder,
+            vector_db=vector_db,
+            metadata_store=metadata_store,
+            embedding_stream_size=3
+        )
+        initial = pipeline.ingest(
+            corpus_path=test_corpus_file,
+            collection_name="append_collection",
+            overwrite=True,
+            chunk_size=200,
+            chunk_overlap=50,
+            indices_dir=str(tmp_path)
+        )
+        retriever = BM25Retriever(index_path=initial.bm25_index_path, metadata_path=initial.metadata_path)
+        appendix = tmp_path / "appendix.txt"
+        appendix.write_text("Tom Bombadil is master of wood, water and hill.", encoding="utf-8")
+        
+        result = pipeline.append(
+            corpus_path=str(appendix),
+            collection_name="append_collection",
+            chunk_size=200,
+            chunk_overlap=50,
+            indices_dir=str(tmp_path),
+            bm25_retriever=retriever
+        )
+        
+        total = initial.total_chunks + result.total_chunks
+        assert vector_db.get_collection_stats("append_collection")["count"] == total
+        assert len(metadata_store.load_metadata(result.metadata_path)) == total
+        assert load_bm25_index(result.bm25_index_path).corpus_size == total
+        appended_ids = {f"chunk_{i}" for i in range(initial.total_chunks, total)}
+        live_results = retriever.retrieve("Bombadil", top_k=3)
+        assert {r.chunk_id for r in live_results} <= appended_ids
+        reloaded = BM25Retriever(index_path=result.bm25_index_path, metadata_path=result.metadata_path)
+        assert [r.chunk_id for r in reloaded.retrieve("Bombadil", top_k=3)] == [r.chunk_id for r in live_results]
+
+        # A failed embedding leaves the BM25 index and metadata untouched, so a retry works
+        embedder.iter_embed_documents.side_effect = RuntimeError("embedding failed")
+        with pytest.raises(RuntimeError):
+            pipeline.append(corpus_path=str(appendix), collection_name="append_collection",
+                            chunk_size=200, chunk_overlap=50, indices_dir=str(tmp_path))
+        assert load_bm25_index(result.bm25_index_path).corpus_size == total
+        assert len(metadata_store.load_metadata(result.metadata_path)) == total
+
+        embedder.iter_embed_documents.side_effect = iter_embed_documents
+        retried = pipeline.append(corpus_path=str(appendix), collection_name="append_collection",
+                                  chunk_size=200, chunk_overlap=50, indices_dir=str(tmp_path))
+        assert load_bm25_index(retried.bm25_index_path).corpus_size == total + retried.total_chunks
+    
     def test_ingest_pipeline_nonexistent_file(self, chunker, embedder, bm25_indexer, metadata_store, vector_db):
         """Test ingestion with nonexistent file."""
         pipeline = IngestionPipeline(
@@ -311,6 +1033,254 @@ class TestIngestionPipeline:
             pipeline.ingest("nonexistent.txt", collection_name="test")
 
 
+class TestChromaVectorDB:
+    """Test ChromaVectorDB batched writes."""
+    
+    @pytest.mark.parametrize("writer_thread", [False, True])
+    def test_streamed_batched_add(self, writer_thread):
+        """Test a document generator is written in batches of batch_size."""
+        db = ChromaVectorDB({"in_memory": True, "batch_size": 4, "writer_thread": writer_thread})
+        db.create_collection("streamed", embedding_dimension=3)
+        consumed = []
+        
+        def documents():
+            for i in range(10):
+                consumed.append(i)
+                yield VectorDocument(id=f"doc_{i}", text=f"text {i}", embedding=[float(i), 1.0, 0.0], metadata={"i": i})
+        
+        collection = db._get_collection("streamed")
+        with patch.object(collection, "add", wraps=collection.add) as add:
+            db.add_documents("streamed", documents())
+        
+        assert [len(call.kwargs["ids"]) for call in add.call_args_list] == [4, 4, 2]
+        assert consumed == list(range(10))
+        assert db.get_collection_stats("streamed")["count"] == 10
+        db.close()
+    
+    def test_writer_errors_propagate(self):
+        """Test a failed write on the writer thread is raised to the caller."""
+        db = ChromaVectorDB({"in_memory": True, "batch_size": 2, "writer_thread": True})
+        db.create_collection("failing", embedding_dimension=3)
+        documents = (
+            VectorDocument(id=f"doc_{i}", text="t", embedding=[1.0, 0.0, 0.0], metadata={"i": i})
+            for i in range(6)
+        )
+        collection = db._get_collection("failing")
+        with patch.object(collection, "add", side_effect=RuntimeError("disk full")):
+            with pytest.raises(RuntimeError, match="disk full"):
+                db.add_documents("failing", documents)
+        db.close()
+    
+    def test_search_uses_cached_collection_handle(self):
+        """Test searches neither list collections nor refetch the handle."""
+        db = ChromaVectorDB({"in_memory": True})
+        db.create_collection("cached_handles", embedding_dimension=3)
+        db.add_documents("cached_handles", [
+            VectorDocument(id=f"doc_{i}", text=f"text {i}", embedding=[float(i), 1.0, 0.0], metadata={"i": i})
+            for i in range(3)
+        ])
+        
+        with patch.object(db.client, "list_collections", wraps=db.client.list_collections) as list_collections, \
+                patch.object(db.client, "get_collection", wraps=db.client.get_collection) as get_collection:
+            for _ in range(5):
+                assert len(db.search("cached_handles", [2.0, 1.0, 0.0], top_k=2)) == 2
+            assert db.get_collection_stats("cached_handles")["count"] == 3
+        assert list_collections.call_count == 0
+        assert get_collection.call_count == 0
+        
+        # Deleting invalidates the handle; a recreated collection starts empty
+        db.delete_collection("cached_handles")
+        with pytest.raises(ValueError):
+            db.search("cached_handles", [1.0, 0.0, 0.0])
+        db.create_collection("cached_handles", embedding_dimension=3)
+        assert db.search("cached_handles", [1.0, 0.0, 0.0]) == []
+        db.close()
+    
+    @pytest.mark.parametrize("space", ["cosine", "l2", "ip"])
+    def test_hnsw_space_scores_match_exact_search(self, space):
+        """Test scores are converted from the collection's space like NumPy's exact metrics."""
+        import numpy as np
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((20, 8)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        documents = [
+            VectorDocument(id=f"doc_{i}", text=f"text {i}", embedding=embedding, metadata={"i": i})
+            for i, embedding in enumerate(embeddings)
+        ]
+        chroma = ChromaVectorDB({"in_memory": True, "hnsw_space": space})
+        chroma.create_collection(f"space_{space}", embedding_dimension=8)
+        chroma.add_documents(f"space_{space}", documents)
+        exact = NumpyVectorDB({"in_memory": True, "metric": space})
+        exact.create_collection(f"space_{space}", embedding_dimension=8)
+        exact.add_documents(f"space_{space}", documents)
+        
+        query = embeddings[3] + 0.1
+        approximate = chroma.search(f"space_{space}", query, top_k=5)
+        expected = exact.search(f"space_{space}", query, top_k=5)
+        assert chroma.get_collection_stats(f"space_{space}")["space"] == space
+        assert [r.document_id for r in approximate] == [r.document_id for r in expected]
+        assert np.allclose([r.score for r in approximate], [r.score for r in expected], atol=1e-4)
+        chroma.close()
+    
+    def test_search_ef_applied_to_existing_collection(self, tmp_path):
+        """Test hnsw_search_ef retunes a persisted collection and set_search_ef changes it."""
+        db = ChromaVectorDB({"persist_directory": str(tmp_path), "hnsw_search_ef": 50})
+        db.create_collection("tuned", embedding_dimension=3)
+        assert db.get_collection_stats("tuned")["search_ef"] == 50
+        db.close()
+        
+        db = ChromaVectorDB({"persist_directory": str(tmp_path), "hnsw_search_ef": 80})
+        assert db.get_collection_stats("tuned")["search_ef"] == 80
+        db.set_search_ef("tuned", 120)
+        assert db.get_collection_stats("tuned")["search_ef"] == 120
+        db.close()
+    
+    def test_invalid_hnsw_space(self):
+        """Test an unsupported space is rejected."""
+        with pytest.raises(ValueError):
+            ChromaVectorDB({"in_memory": True, "hnsw_space": "hamming"})
+
+
+class TestNumpyVectorDB:
+    """Test NumpyVectorDB exact search and persistence."""
+    
+    @pytest.fixture
+    def documents(self):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(40, 8)).astype(np.float32)
+        return [
+            VectorDocument(
+                id=f"doc_{i}",
+                text=f"text {i}",
+                embedding=embeddings[i].tolist(),
+                metadata={"part": i % 3, "source": "a" if i < 20 else "b"}
+            )
+            for i in range(40)
+        ]
+    
+    def test_exact_search_matches_brute_force(self, documents, tmp_path):
+        """Cosine top-k equals a brute-force ranking, with and without filters."""
+        import numpy as np
+        db = VectorDBFactory.create("numpy", {"persist_directory": str(tmp_path)})
+        assert isinstance(db, NumpyVectorDB)
+        db.create_collection("test", embedding_dimension=8)
+        db.add_documents("test", documents[:25])
+        db.add_documents("test", documents[20:])  # overlapping ids are skipped
+        assert db.get_collection_stats("test")["count"] == 40
+        
+        matrix = np.array([doc.embedding for doc in documents])
+        query = np.random.default_rng(1).normal(size=8)
+        cosine = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+        
+        results = db.search("test", query.tolist(), top_k=5)
+        assert [r.document_id for r in results] == [f"doc_{i}" for i in np.argsort(-cosine)[:5]]
+        assert np.allclose([r.score for r in results], np.sort(cosine)[::-1][:5], atol=1e-5)
+        
+        results = db.search("test", query.tolist(), top_k=40, filters={"part": 1, "source": "b"})
+        expected = [i for i in np.argsort(-cosine) if i % 3 == 1 and i >= 20]
+        assert [r.document_id for r in results] == [f"doc_{i}" for i in expected]
+        
+        results = db.search("test", query.tolist(), top_k=40,
+                            filters={"$or": [{"part": {"$in": [0, 2]}}, {"source": {"$ne": "a"}}]})
+        assert {r.document_id for r in results} == {
+            f"doc_{i}" for i in range(40) if i % 3 != 1 or i >= 20
+        }
+        assert db.search("test", query.tolist(), filters={"part": 7}) == []
+    
+    def test_persists_and_memory_maps(self, documents, tmp_path):
+        """Collections reload from their files as memory maps."""
+        import numpy as np
+        db = NumpyVectorDB({"persist_directory": str(tmp_path), "metric": "l2"})
+        db.create_collection("test", embedding_dimension=8)
+        db.add_documents("test", documents)
+        query = documents[3].embedding
+        expected = db.search("test", query, top_k=3)
+        assert expected[0].document_id == "doc_3"
+        assert expected[0].score == pytest.approx(1.0)
+        db.close()
+        
+        reopened = NumpyVectorDB({"persist_directory": str(tmp_path), "metric": "l2"})
+        assert reopened.collection_exists("test")
+        assert reopened.search("test", query, top_k=3) == expected
+        assert isinstance(reopened._get("test").rows.embeddings, np.memmap)
+        
+        with pytest.raises(ValueError):
+            reopened.add_documents("test", [VectorDocument("x", "x", [0.0] * 4, {})])
+        reopened.delete_collection("test")
+        assert not reopened.collection_exists("test")
+        assert not (tmp_path / "test").exists()
+        with pytest.raises(ValueError):
+            reopened.search("test", query)
+    
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_incremental_adds(self, documents, tmp_path, mmap):
+        """Adds append to the files; interrupted adds are ignored."""
+        config = {"persist_directory": str(tmp_path), "mmap": mmap}
+        db = NumpyVectorDB(config)
+        db.create_collection("test", embedding_dimension=8)
+        for start in range(0, 28, 7):
+            db.add_documents("test", documents[start:start + 7])
+        embeddings_file = tmp_path / "test" / "embeddings.bin"
+        assert embeddings_file.stat().st_size == 28 * 8 * 4
+        query = documents[12].embedding
+        expected = db.search("test", query, top_k=5)
+        db.close()
+        
+        # Rows written without a committed header are invisible and overwritten by the next add
+        with open(embeddings_file, "ab") as f:
+            f.write(b"\x00" * 64)
+        with open(tmp_path / "test" / "documents.jsonl", "ab") as f:
+            f.write(b'{"id": "torn"')
+        reopened = NumpyVectorDB(config)
+        assert reopened.get_collection_stats("test")["count"] == 28
+        assert reopened.search("test", query, top_k=5) == expected
+        reopened.add_documents("test", documents[28:])
+        reopened.close()
+        reloaded = NumpyVectorDB(config)
+        assert reloaded.get_collection_stats("test")["count"] == len(documents)
+        assert reloaded.search("test", documents[35].embedding, top_k=1)[0].document_id == "doc_35"
+    
+    @pytest.mark.parametrize("in_memory", [True, False])
+    def test_add_during_search(self, documents, tmp_path, in_memory):
+        """A search running while documents are added sees the collection before the add."""
+        db = NumpyVectorDB({"persist_directory": str(tmp_path), "in_memory": in_memory})
+        db.create_collection("test", embedding_dimension=8)
+        db.add_documents("test", documents[:20])
+        
+        scores = db._scores
+        
+        def add_mid_search(rows, query):
+            if db.get_collection_stats("test")["count"] == 20:
+                db.add_documents("test", documents[20:])
+            return scores(rows, query)
+        
+        query = documents[25].embedding
+        with patch.object(db, "_scores", side_effect=add_mid_search):
+            results = db.search("test", query, top_k=40, filters={"part": {"$in": [0, 1, 2]}})
+        assert {r.document_id for r in results} == {f"doc_{i}" for i in range(20)}
+        assert db.get_collection_stats("test")["count"] == 40
+        assert db.search("test", query, top_k=1)[0].document_id == "doc_25"
+    
+    def test_array_and_list_embeddings_agree(self, documents):
+        """Float32 array embeddings and list embeddings give identical results."""
+        import numpy as np
+        matrix = embedding_matrix(documents)
+        assert matrix.dtype == np.float32 and matrix.shape == (40, 8)
+        
+        as_lists = NumpyVectorDB({"in_memory": True})
+        as_arrays = NumpyVectorDB({"in_memory": True})
+        for db in (as_lists, as_arrays):
+            db.create_collection("test", embedding_dimension=8)
+        as_lists.add_documents("test", documents)
+        as_arrays.add_documents("test", [
+            VectorDocument(doc.id, doc.text, row, doc.metadata) for doc, row in zip(documents, matrix)
+        ])
+        
+        query = matrix[7]
+        assert as_arrays.search("test", query, top_k=5) == as_lists.search("test", query.tolist(), top_k=5)
+
+
 class TestVectorRetriever:
     """Test VectorRetriever functionality."""
     
@@ -363,6 +1333,36 @@ class TestVectorRetriever:
         # Verify results are sorted by score (descending)
         scores = [r.score for r in results]
         assert scores == sorted(scores, reverse=True)
+    
+    def test_query_embedding_cache(self):
+        """Repeated queries are served from the LRU cache without re-embedding."""
+        import numpy as np
+        embedder = Mock(spec=Embedder)
+        embedder.model_name = "mock-embedder"
+        embedder.embed_array.side_effect = lambda texts, batch_size=32: np.array(
+            [[len(text), 1.0, 0.0] for text in texts], dtype=np.float32
+        )
+        vector_db = NumpyVectorDB({"in_memory": True})
+        vector_db.create_collection("test", embedding_dimension=3)
+        vector_db.add_documents("test", [
+            VectorDocument(f"doc_{i}", f"text {i}", [float(i), 1.0, 0.0], {}) for i in range(5)
+        ])
+        retriever = VectorRetriever(vector_db=vector_db, collection_name="test",
+                                    embedder=embedder, query_cache_size=2)
+        
+        first = retriever.retrieve("Gandalf  persona", top_k=2)
+        assert retriever.retrieve(" Gandalf persona ", top_k=2) == first
+        assert embedder.embed_array.call_count == 1
+        
+        batches = retriever.retrieve_many(["Gandalf persona", "Bree", "Bree", "Shire"], top_k=2)
+        assert batches[0] == first
+        # Only the two distinct misses are embedded, in one batch
+        assert embedder.embed_array.call_args[0][0] == ["Bree", "Shire"]
+        assert retriever.query_cache_stats() == {"hits": 3, "misses": 3, "size": 2, "capacity": 2}
+        
+        # "Gandalf persona" was evicted (least recently used)
+        retriever.retrieve("Gandalf persona", top_k=2)
+        assert retriever.query_cache_stats()["misses"] == 4
 
 
 class TestBM25Retriever:
@@ -418,9 +1418,367 @@ class TestBM25Retriever:
         assert scores == sorted(scores, reverse=True)
 
 
+    def test_bm25_top_k_matches_full_ranking(self, bm25_index_files):
+        """Test partial top-k selection equals ranking every chunk."""
+        index_path, metadata_path = bm25_index_files
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        
+        query = "gandalf the grey wizard"
+        full_scores = retriever.index.get_scores(query.split())
+        expected_order = sorted(range(len(full_scores)), key=lambda i: full_scores[i], reverse=True)
+        
+        results = retriever.retrieve(query, top_k=5)
+        
+        assert [r.metadata["chunk_index"] for r in results] == expected_order[:5]
+        assert results[0].score == pytest.approx(1.0)
+    
+    def test_bm25_pads_with_zero_score_chunks(self, bm25_index_files):
+        """Test chunks without query terms fill remaining slots in chunk order."""
+        index_path, metadata_path = bm25_index_files
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        
+        results = retriever.retrieve("unknownterm", top_k=3)
+        
+        assert [r.metadata["chunk_index"] for r in results] == [0, 1, 2]
+        assert all(r.score == 0 for r in results)
+    
+    def test_bm25_retrieval_with_filters(self, bm25_index_files):
+        """Test metadata filters restrict results before top-k selection."""
+        index_path, metadata_path = bm25_index_files
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        
+        results = retriever.retrieve("gandalf", top_k=5, filters={"part": 1})
+        
+        assert len(results) > 0
+        assert all(r.metadata["part"] == 1 for r in results)
+        assert retriever.retrieve("gandalf", top_k=5, filters={"missing_key": 1}) == []
+        
+        # The filter restricts scoring itself, not just the scored candidates
+        with patch.object(retriever.index, "score_candidates", wraps=retriever.index.score_candidates) as score:
+            retriever.retrieve("gandalf", top_k=5, filters={"part": 1})
+        mask = score.call_args.args[1]
+        assert mask.tolist() == [i % 2 == 1 for i in range(len(mask))]
+
+    def test_bm25_retrieval_with_combined_filters(self, bm25_index_files):
+        """Test attribute and additional_metadata filters are ANDed."""
+        index_path, metadata_path = bm25_index_files
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        source = retriever._snapshot.doc_metadata[0].source
+        
+        results = retriever.retrieve("gandalf", top_k=50, filters={"source": source, "part": 0})
+        
+        assert len(results) > 0
+        assert all(r.metadata["source"] == source and r.metadata["part"] == 0 for r in results)
+        assert retriever.retrieve("gandalf", top_k=5, filters={"source": "other.txt"}) == []
+    
+    def test_bm25_add_chunks(self, bm25_index_files):
+        """Test chunks appended to a live retriever are searchable immediately."""
+        index_path, metadata_path = bm25_index_files
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        start = retriever.index.corpus_size
+        new_chunks = [
+            ChunkMetadata(
+                chunk_id=f"chunk_{start + i}",
+                text=text,
+                start_pos=0,
+                end_pos=len(text),
+                chunk_index=start + i,
+                source="appendix.txt"
+            )
+            for i, text in enumerate(["Tom Bombadil sings in the Old Forest.", "Goldberry waits at home."])
+        ]
+        
+        retriever.add_chunks(new_chunks)
+        
+        results = retriever.retrieve("Bombadil", top_k=1)
+        assert results[0].chunk_id == f"chunk_{start}"
+        assert results[0].score == 1.0
+        assert [r.chunk_id for r in retriever.retrieve("home", top_k=5, filters={"source": "appendix.txt"})] == [
+            f"chunk_{start + 1}", f"chunk_{start}"
+        ]
+        with pytest.raises(ValueError):
+            retriever.add_chunks(new_chunks)
+
+    def test_bm25_add_chunks_during_query(self, bm25_index_files):
+        """Test a query keeps its index/metadata snapshot while chunks are appended."""
+        index_path, metadata_path = bm25_index_files
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        start = retriever.index.corpus_size
+
+        def chunk(i, text):
+            return ChunkMetadata(chunk_id=f"chunk_{i}", text=text, start_pos=0, end_pos=len(text),
+                                 chunk_index=i, source="appendix.txt")
+
+        retriever.add_chunks([chunk(start, "Tom Bombadil sings in the Old Forest.")])
+        segmented = retriever.index
+        late = [chunk(start + 1 + i, f"Bombadil verse {i}.") for i in range(20)]
+        scoring_mask = retriever._scoring_mask
+
+        def append_then_mask(eligible):
+            retriever.add_chunks(late)
+            return scoring_mask(eligible)
+
+        # Append between reading the filter mask and scoring the index
+        with patch.object(retriever, "_scoring_mask", side_effect=append_then_mask):
+            results = retriever.retrieve("Bombadil", top_k=3, filters={"source": "appendix.txt"})
+
+        assert [r.chunk_id for r in results] == [f"chunk_{start}"]
+        assert segmented.corpus_size == start + 1
+        assert retriever.index.corpus_size == start + 1 + len(late)
+        assert len(retriever.retrieve("Bombadil", top_k=30, filters={"source": "appendix.txt"})) == 1 + len(late)
+
+    def test_bm25_retrieve_many(self, bm25_index_files):
+        """Test batched retrieval returns the same results as retrieve."""
+        index_path, metadata_path = bm25_index_files
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        queries = ["Gandalf the wizard", "prancing pony", "unknownterm", ""]
+        
+        for filters in (None, {"part": 1}):
+            batches = retriever.retrieve_many(queries, top_k=4, filters=filters)
+            
+            assert len(batches) == len(queries)
+            for query, batch in zip(queries, batches):
+                expected = retriever.retrieve(query, top_k=4, filters=filters)
+                assert [r.chunk_id for r in batch] == [r.chunk_id for r in expected]
+                assert [r.score for r in batch] == pytest.approx([r.score for r in expected])
+    
+    def test_bm25_compressed_index(self, bm25_index_files):
+        """Test retrieval and appends over an index saved with compressed postings."""
+        index_path, metadata_path = bm25_index_files
+        exact = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        indexer = BM25Indexer(compressed=True)
+        indexer.save_index(indexer.load_index(index_path), index_path)
+        
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        assert isinstance(retriever.index, CompressedBM25Engine)
+        results = retriever.retrieve("Gandalf wizard", top_k=3)
+        assert [r.chunk_id for r in results] == [r.chunk_id for r in exact.retrieve("Gandalf wizard", top_k=3)]
+        
+        start = retriever.index.corpus_size
+        retriever.add_chunks([ChunkMetadata(
+            chunk_id="chunk_new", text="Radagast the brown wizard", start_pos=0, end_pos=25,
+            chunk_index=start, source="appended.txt"
+        )])
+        assert retriever.retrieve("Radagast", top_k=1)[0].chunk_id == "chunk_new"
+    
+    def test_bm25_pruned_retrieval_matches_exhaustive(self, bm25_index_files):
+        """Test long queries return identical results with and without pruning."""
+        from src.rag import bm25_retriever
+        
+        index_path, metadata_path = bm25_index_files
+        retriever = BM25Retriever(index_path=index_path, metadata_path=metadata_path)
+        query = "Gandalf wizard Prancing Pony hobbits Bree Shire ring"
+        
+        tokens = retriever.index.analyzer.analyze(query)
+        snapshot = retriever._snapshot
+        assert retriever._retrieve_pruned(snapshot, tokens, retriever._eligible(snapshot, None), 3) is not None
+        
+        pruned = retriever.retrieve(query, top_k=3)
+        with patch.object(bm25_retriever, "PRUNING_MIN_TERMS", 10 ** 6):
+            exhaustive = retriever.retrieve(query, top_k=3)
+        
+        assert [r.chunk_id for r in pruned] == [r.chunk_id for r in exhaustive]
+        assert [r.score for r in pruned] == pytest.approx([r.score for r in exhaustive])
+
+
+class TestMetadataIndex:
+    """Test MetadataIndex filter bitmaps."""
+    
+    @pytest.fixture
+    def records(self):
+        """Chunk metadata with a gap and mixed additional metadata."""
+        return [
+            ChunkMetadata("c0", "a", 0, 1, 0, "book1.txt", {"strategy": "sentence", "chapter": 1}),
+            None,
+            ChunkMetadata("c2", "b", 1, 2, 2, "book2.txt", {"strategy": "paragraph", "tags": ["x"]}),
+            ChunkMetadata("c3", "c", 2, 3, 3, "book1.txt", {"source": "override.txt"}),
+        ]
+    
+    def test_field_masks(self, records):
+        """Test attribute, additional_metadata and shadowed fields."""
+        index = MetadataIndex(records)
+        
+        assert index.mask({"source": "book1.txt"}).tolist() == [True, False, False, False]
+        assert index.mask({"source": "override.txt"}).tolist() == [False, False, False, True]
+        assert index.mask({"strategy": "sentence", "chapter": 1}).tolist() == [True, False, False, False]
+        assert not index.mask({"chapter": 2}).any()
+        assert not index.mask({"missing": 1}).any()
+    
+    def test_unhashable_values_fall_back_to_scan(self, records):
+        """Test fields holding unhashable values are still filterable."""
+        index = MetadataIndex(records)
+        
+        assert "tags" not in index.indexed_fields
+        assert index.mask({"tags": ["x"]}).tolist() == [False, False, True, False]
+        assert index.mask({"text": "b"}).tolist() == [False, False, True, False]
+
+
 class TestHybridRetriever:
     """Test HybridRetriever functionality."""
     
+    def test_hybrid_retrieve_many(self):
+        """Test batched hybrid retrieval fuses each query like retrieve."""
+        def leg_results(prefix):
+            def retrieve(query, top_k=10, filters=None):
+                return [
+                    RetrievalResult(chunk_text=f"{prefix}{i}", score=1.0 - i / 10, chunk_id=f"{query}_{prefix}{i}")
+                    for i in range(3)
+                ]
+            return retrieve
+        
+        bm25_retriever = Mock(spec=BM25Retriever)
+        bm25_retriever.retrieve.side_effect = leg_results("b")
+        bm25_retriever.retrieve_many.side_effect = lambda queries, top_k, filters: [
+            leg_results("b")(q) for q in queries
+        ]
+        vector_retriever = Mock(spec=VectorRetriever)
+        vector_retriever.retrieve.side_effect = leg_results("v")
+        vector_retriever.retrieve_many.side_effect = lambda queries, top_k, filters: [
+            leg_results("v")(q) for q in queries
+        ]
+        hybrid_retriever = HybridRetriever(bm25_retriever, vector_retriever)
+        
+        batches = hybrid_retriever.retrieve_many(["q1", "q2"], top_k=4)
+        
+        assert bm25_retriever.retrieve_many.call_count == 1
+        assert vector_retriever.retrieve_many.call_count == 1
+        for query, batch in zip(["q1", "q2"], batches):
+            expected = hybrid_retriever.retrieve(query, top_k=4)
+            assert [r.chunk_id for r in batch] == [r.chunk_id for r in expected]
+    
+    @staticmethod
+    def _slow_leg(prefix, delay=0.0, error=None):
+        """Mock retriever whose retrieve sleeps, then returns or raises."""
+        import time
+        
+        def retrieve(query, top_k=10, filters=None):
+            time.sleep(delay)
+            if error is not None:
+                raise error
+            return [
+                RetrievalResult(chunk_text=f"{prefix}{i}", score=1.0 - i / 10, chunk_id=f"{prefix}{i}")
+                for i in range(3)
+            ]
+        
+        retriever = Mock()
+        retriever.retrieve.side_effect = retrieve
+        return retriever
+    
+    @pytest.mark.parametrize("strategy", ["rrf", "weighted"])
+    def test_fusion_score_provenance(self, strategy):
+        """Test fused results carry per-leg raw/normalized scores and ranks."""
+        bm25_results = [
+            RetrievalResult(chunk_text="a", score=9.0, chunk_id="a", metadata={"source": "x"}),
+            RetrievalResult(chunk_text="b", score=6.0, chunk_id="b"),
+            RetrievalResult(chunk_text="c", score=3.0, chunk_id="c"),
+        ]
+        vector_results = [
+            RetrievalResult(chunk_text="c", score=0.9, chunk_id="c"),
+            RetrievalResult(chunk_text="d", score=0.5, chunk_id="d"),
+        ]
+        hybrid_retriever = HybridRetriever(Mock(), Mock(), fusion_strategy=strategy, rrf_k=60)
+        fuse = hybrid_retriever._fuse_rrf if strategy == "rrf" else hybrid_retriever._fuse_weighted
+        
+        results = {r.chunk_id: r for r in fuse(bm25_results, vector_results, top_k=3)}
+        
+        assert len(results) == 3
+        c = results["c"]
+        assert (c.metadata["bm25_score"], c.metadata["bm25_rank"], c.metadata["bm25_score_normalized"]) == (3.0, 3, 0.0)
+        assert (c.metadata["vector_score"], c.metadata["vector_rank"], c.metadata["vector_score_normalized"]) == (0.9, 1, 1.0)
+        if strategy == "rrf":
+            assert c.score == pytest.approx(1 / 63 + 1 / 61)
+            assert list(results) == ["c", "a", "b"]
+        else:
+            assert c.score == pytest.approx(0.5)
+            assert list(results) == ["a", "c", "b"]  # a and c tie; BM25 order first
+        a = results["a"]
+        assert a.metadata["source"] == "x"
+        assert a.metadata["vector_score"] is None and a.metadata["vector_rank"] is None
+        assert "bm25_score" not in bm25_results[0].metadata
+    
+    def test_adaptive_candidate_depth(self):
+        """Test depth stays small when legs agree and expands when they disagree."""
+        def leg(reverse):
+            def retrieve(query, top_k=10, filters=None):
+                ids = list(range(40))
+                if reverse and query == "ambiguous":
+                    ids.reverse()
+                return [
+                    RetrievalResult(chunk_text=f"d{i}", score=1.0 - rank / 100, chunk_id=f"d{i}")
+                    for rank, i in enumerate(ids[:top_k])
+                ]
+            retriever = Mock()
+            retriever.retrieve.side_effect = retrieve
+            retriever.retrieve_many.side_effect = lambda queries, top_k, filters: [
+                retrieve(q, top_k) for q in queries
+            ]
+            return retriever
+        
+        bm25_retriever, vector_retriever = leg(False), leg(True)
+        adaptive = HybridRetriever(bm25_retriever, vector_retriever, adaptive_depth=True)
+        
+        adaptive.retrieve("easy", top_k=5)
+        assert bm25_retriever.retrieve.call_args.kwargs["top_k"] == 5
+        assert adaptive.depth_stats() == {"queries": 1, "mean_depth": 5.0, "mean_rounds": 1.0, "expanded_queries": 0}
+        
+        adaptive.retrieve("ambiguous", top_k=5)
+        assert [call.kwargs["top_k"] for call in vector_retriever.retrieve.call_args_list] == [5, 5, 10, 20]
+        
+        batches = adaptive.retrieve_many(["easy", "ambiguous"], top_k=5)
+        assert [r.chunk_id for r in batches[1]] == [r.chunk_id for r in adaptive.retrieve("ambiguous", top_k=5)]
+        assert [len(call.args[0]) for call in bm25_retriever.retrieve_many.call_args_list] == [2, 1, 1]
+        stats = adaptive.depth_stats()
+        assert stats["queries"] == 5
+        assert stats["expanded_queries"] == 3
+        assert stats["mean_depth"] == pytest.approx((5 + 20 + 5 + 20 + 20) / 5)
+        adaptive.close()
+        
+        fixed = HybridRetriever(leg(False), leg(True))
+        fixed.retrieve("ambiguous", top_k=5)
+        assert fixed.depth_stats()["mean_depth"] == 10.0
+        fixed.close()
+    
+    def test_hybrid_legs_run_concurrently(self):
+        """Test hybrid latency is that of the slower leg and timings are recorded."""
+        import time
+        hybrid_retriever = HybridRetriever(self._slow_leg("b", 0.2), self._slow_leg("v", 0.2))
+        
+        start = time.perf_counter()
+        results = hybrid_retriever.retrieve("query", top_k=4)
+        elapsed = time.perf_counter() - start
+        hybrid_retriever.close()
+        
+        assert elapsed < 0.35
+        assert {r.chunk_id for r in results} <= {"b0", "b1", "b2", "v0", "v1", "v2"}
+        timings = results[0].metadata["retrieval_timings_ms"]
+        assert timings["bm25"] >= 200 and timings["vector"] >= 200
+        assert timings["total"] < 350
+        assert results[0].metadata["degraded_legs"] == []
+    
+    def test_hybrid_degrades_to_single_leg(self):
+        """Test a failing or slow leg is dropped and both failing raises."""
+        failing = HybridRetriever(self._slow_leg("b"), self._slow_leg("v", error=RuntimeError("db down")))
+        results = failing.retrieve("query", top_k=3)
+        assert [r.chunk_id for r in results] == ["b0", "b1", "b2"]
+        assert results[0].metadata["degraded_legs"] == ["vector"]
+        assert failing.degraded_count == 1
+        
+        slow = HybridRetriever(self._slow_leg("b", 1.0), self._slow_leg("v"), bm25_timeout_ms=50)
+        results = slow.retrieve("query", top_k=3)
+        assert [r.chunk_id for r in results] == ["v0", "v1", "v2"]
+        assert results[0].metadata["degraded_legs"] == ["bm25"]
+        assert results[0].metadata["retrieval_timings_ms"]["bm25"] < 500
+        
+        broken = HybridRetriever(
+            self._slow_leg("b", error=ValueError("no index")),
+            self._slow_leg("v", error=RuntimeError("db down")),
+            concurrent_legs=False
+        )
+        with pytest.raises(ValueError, match="no index"):
+            broken.retrieve("query")
+        for retriever in (failing, slow, broken):
+            retriever.close()
+    
     def test_hybrid_retrieval_rrf(self, embedder, vector_db, test_corpus_file, test_indices_dir):
         """Test hybrid retrieval with RRF fusion."""
         # First, ingest data
@@ -548,3 +1906,197 @@ class TestHybridRetriever:
         scores = [r.score for r in results]
         assert scores == sorted(scores, reverse=True)
 
+
+class TestCrossEncoderReranker:
+    """Test CrossEncoderReranker scoring, caching and latency budget."""
+    
+    @staticmethod
+    def _results(texts):
+        """Fused results with descending scores."""
+        return [
+            RetrievalResult(chunk_text=text, score=1.0 - i / 10, chunk_id=f"c{i}", metadata={"source": "x"})
+            for i, text in enumerate(texts)
+        ]
+    
+    TEXTS = ["the wizard", "frodo ring", "bree pony", "a ring", "gandalf the wizard", "the pony"]
+    
+    def test_rerank_orders_by_cross_encoder_score(self, cross_encoder_path):
+        """Test results are ordered by model score and keep the fused score as score."""
+        reranker = CrossEncoderReranker(cross_encoder_path, batch_size=4)
+        results = self._results(self.TEXTS)
+        
+        reranked = reranker.rerank("gandalf", results, top_k=4)
+        
+        scores = reranker.model.predict([("gandalf", text) for text in self.TEXTS], batch_size=4)
+        expected = sorted(range(len(self.TEXTS)), key=lambda i: -scores[i])[:4]
+        assert [r.chunk_id for r in reranked] == [f"c{i}" for i in expected]
+        for r, i in zip(reranked, expected):
+            assert r.metadata["rerank_score"] == pytest.approx(float(scores[i]), abs=1e-5)
+            assert r.score == r.metadata["fused_score"] == results[i].score
+            assert r.metadata["source"] == "x"
+        assert "rerank_score" not in results[0].metadata
+    
+    def test_rerank_scores_are_cached(self, cross_encoder_path):
+        """Test repeated (query, chunk) pairs are served from the cache."""
+        reranker = CrossEncoderReranker(cross_encoder_path, cache_size=4)
+        first = reranker.rerank("gandalf", self._results(self.TEXTS[:3]))
+        
+        with patch.object(reranker.model, "predict", wraps=reranker.model.predict) as predict:
+            again = reranker.rerank("  gandalf ", self._results(self.TEXTS[:3]))
+            assert predict.call_count == 0
+            reranker.rerank("gandalf", self._results(self.TEXTS))
+            assert len(predict.call_args.args[0]) == 3
+        
+        assert [r.chunk_id for r in again] == [r.chunk_id for r in first]
+        stats = reranker.stats()
+        assert stats["cache_hits"] == 6
+        assert stats["pairs_scored"] == 6
+        assert stats["cache_size"] == 4
+    
+    @staticmethod
+    @contextmanager
+    def _clocked_predict(reranker, *pair_ms):
+        """Run the reranker on a fake clock that each predict call advances.
+        
+        Successive calls cost successive ``pair_ms`` values per pair; the
+        last value repeats.
+        """
+        now = [0.0]
+        costs = list(pair_ms)
+        predict = reranker.model.predict
+        
+        def clocked_predict(pairs, **kwargs):
+            cost = costs.pop(0) if len(costs) > 1 else costs[0]
+            now[0] += len(pairs) * cost / 1000
+            return predict(pairs, **kwargs)
+        
+        with patch("src.rag.reranker.time", Mock(perf_counter=lambda: now[0])), \
+                patch.object(reranker.model, "predict", side_effect=clocked_predict) as mock:
+            yield mock
+    
+    @staticmethod
+    def _scored(reranked):
+        return sum(r.metadata["rerank_score"] is not None for r in reranked)
+    
+    def test_rerank_latency_budget(self, cross_encoder_path):
+        """Test scoring stops at the budget and the tail keeps its fused order."""
+        reranker = CrossEncoderReranker(cross_encoder_path, batch_size=2, max_latency_ms=60, cache_size=0)
+        
+        # Warm-up batch (unmeasured) and a probe batch use 100 ms of the 60 ms budget
+        with self._clocked_predict(reranker, 25):
+            reranked = reranker.rerank("gandalf", self._results(self.TEXTS))
+        
+        assert len(reranked) == len(self.TEXTS)
+        head, tail = reranked[:4], reranked[4:]
+        assert self._scored(head) == 4
+        assert {r.chunk_id for r in head} == {f"c{i}" for i in range(4)}
+        assert [r.chunk_id for r in tail] == ["c4", "c5"]
+        assert all(r.metadata["rerank_score"] is None for r in tail)
+        assert all(r.score == r.metadata["fused_score"] for r in reranked)
+        stats = reranker.stats()
+        assert stats["budget_exceeded"] == 1
+        assert stats["pair_latency_ms"] == pytest.approx(25)
+    
+    def test_rerank_latency_budget_with_default_config(self, cross_encoder_path):
+        """Test the default budget cuts scoring of the default candidate count."""
+        config = RetrievalConfig()
+        reranker = CrossEncoderReranker(
+            cross_encoder_path,
+            batch_size=config.reranker_batch_size,
+            max_latency_ms=config.reranker_max_latency_ms,
+            cache_size=0
+        )
+        texts = [f"{self.TEXTS[i % len(self.TEXTS)]} {i}" for i in range(config.reranker_candidates)]
+        
+        # 10 ms per pair: all candidates would take twice the budget
+        with self._clocked_predict(reranker, 10) as predict:
+            reranker.rerank("gandalf", self._results(texts))
+            reranked = reranker.rerank("gandalf", self._results(texts))
+        
+        # The first query spends warm-up and probe batches; the second fills the budget exactly
+        assert predict.call_count == 3
+        assert self._scored(reranked) == config.reranker_max_latency_ms // 10 < len(texts)
+        stats = reranker.stats()
+        assert stats["budget_exceeded"] == 2
+        assert stats["pair_latency_ms"] == pytest.approx(10)
+    
+    def test_rerank_budget_recovers_from_slow_batch(self, cross_encoder_path):
+        """Test one slow batch does not switch reranking off for later queries."""
+        reranker = CrossEncoderReranker(cross_encoder_path, batch_size=4, max_latency_ms=60, cache_size=0)
+        results = self._results(self.TEXTS)
+        
+        # The warm-up batch and the next one cost 500 ms per pair, later pairs 1 ms
+        with self._clocked_predict(reranker, 500, 500, 1):
+            reranker.rerank("gandalf", results)
+            assert reranker.pair_latency_ms is None
+            reranker.rerank("gandalf", results)
+            assert reranker.pair_latency_ms == pytest.approx(500)
+            counts = [self._scored(reranker.rerank("gandalf", results)) for _ in range(10)]
+        
+        assert all(count >= 1 for count in counts)
+        assert counts[-1] == len(self.TEXTS)
+        assert reranker.pair_latency_ms < 60
+    
+    def test_hybrid_retriever_reranks_fused_candidates(self, cross_encoder_path):
+        """Test hybrid retrieval reranks a wider fused list down to top_k."""
+        def leg(texts):
+            retriever = Mock()
+            retriever.retrieve.side_effect = lambda query, top_k=10, filters=None: [
+                RetrievalResult(chunk_text=text, score=1.0 - i / 10, chunk_id=text)
+                for i, text in enumerate(texts[:top_k])
+            ]
+            return retriever
+        
+        reranker = CrossEncoderReranker(cross_encoder_path)
+        hybrid_retriever = HybridRetriever(
+            leg(self.TEXTS[:4]), leg(self.TEXTS[2:]), reranker=reranker, rerank_candidates=6
+        )
+        
+        results = hybrid_retriever.retrieve("gandalf", top_k=2)
+        hybrid_retriever.close()
+        
+        # Compare with the scores the reranker computed for the fused batch (the tiny model may tie)
+        scores = {text: reranker._cache[("gandalf", text)] for text in self.TEXTS}
+        assert [r.metadata["rerank_score"] for r in results] == sorted(scores.values(), reverse=True)[:2]
+        assert all(r.score == r.metadata["fused_score"] for r in results)
+        assert "rerank" in results[0].metadata["retrieval_timings_ms"]
+        assert results[0].metadata["bm25_rank"] is not None or results[0].metadata["vector_rank"] is not None
+
+
+class TestEvaluateFusion:
+    """Smoke test of scripts/evaluate_fusion.py over the bundled labels."""
+    
+    def test_sweep_over_bundled_labels(self, sentence_transformer_path, tmp_path):
+        """Test the sweep reports quality and per-configuration leg latency."""
+        import json
+        import subprocess
+        import sys
+        root = Path(__file__).parent.parent
+        
+        labels = [
+            json.loads(line)
+            for line in (root / "data" / "test_data" / "fusion_labels.jsonl").read_text(encoding="utf-8").splitlines()
+        ]
+        subset = [label for label in labels if label["source"] in ("test_corpus.txt", "test_corpus2.txt")][:8]
+        labels_path = tmp_path / "labels.jsonl"
+        labels_path.write_text("".join(json.dumps(label) + "\n" for label in subset), encoding="utf-8")
+        output_path = tmp_path / "results.json"
+        
+        command = [
+            sys.executable, str(root / "scripts" / "evaluate_fusion.py"), "--data-dir", str(root / "data" / "test_data"), "--labels", str(labels_path),
+            "--model", sentence_transformer_path, "--top-k", "3", "5", "--rrf-k", "60", "--bm25-weights", "0.5",
+            "--adaptive", "--workers", "1", "--repeat", "1", "--output", str(output_path)
+        ]
+        completed = subprocess.run(command, cwd=root, capture_output=True, text=True, timeout=300)
+        assert completed.returncode == 0, completed.stderr
+        assert "legs ms" in completed.stdout
+        
+        results = json.loads(output_path.read_text(encoding="utf-8"))
+        assert len(results) == 8
+        for result in results:
+            assert 0.0 <= result["ndcg"] <= 1.0
+            assert 0.0 <= result["recall"] <= 1.0
+            assert result["legs_ms"] > 0
+            assert "leg_depths" not in result
+        fixed = {r["top_k"]: r for r in results if r["fusion_strategy"] == "rrf" and not r.get("adaptive_depth")}
+        assert fixed[3]["mean_depth"] == 6 and fixed[5]["mean_depth"] == 10